@@ -97,13 +97,14 @@ status_label.pack(pady=5)
 # Function to play audio using pygame
 def play_audio_pygame(filename):
     try:
-        pygame.mixer.init()
+        if not pygame.mixer.get_init():  # open the device once per session
+            pygame.mixer.init()
         pygame.mixer.music.load(filename)
         pygame.mixer.music.play()
         
         # Wait for audio to finish
         while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+            time.sleep(0.02)
         
         status_label.config(text="✓ Playback completed!")
     except Exception as e:
@@ -50,13 +50,14 @@ status_label.pack(pady=5)
 # Function to play audio using pygame
 def play_audio_pygame(filename):
     try:
-        pygame.mixer.init()
+        if not pygame.mixer.get_init():  # open the device once per session
+            pygame.mixer.init()
         pygame.mixer.music.load(filename)
         pygame.mixer.music.play()
         
         # Wait for audio to finish
         while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+            time.sleep(0.02)
     except Exception as e:
         messagebox.showerror("Playback Error", f"Error playing audio: {str(e)}")
 
@@ -97,14 +97,15 @@ def get_voices():
 # Function to play audio using pygame
 def play_audio_pygame(filename):
     try:
-        pygame.mixer.init()
+        if not pygame.mixer.get_init():  # open the device once per session
+            pygame.mixer.init()
         pygame.mixer.music.load(filename)
         # Note: pygame volume control doesn't work for all formats, use engine volume instead
         pygame.mixer.music.play()
         
         # Wait for audio to finish
         while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+            time.sleep(0.02)
     except Exception as e:
         messagebox.showerror("Playback Error", f"Error playing audio: {str(e)}\n\nTip: Make sure the file is a valid WAV or MP3 file.")
 
@@ -167,12 +167,13 @@ status_label.pack(pady=5)
 # Function to play audio
 def play_audio(filename):
     try:
-        pygame.mixer.init()
+        if not pygame.mixer.get_init():  # open the device once per session
+            pygame.mixer.init()
         pygame.mixer.music.load(filename)
         pygame.mixer.music.play()
         
         while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+            time.sleep(0.02)
         
         status_label.config(text="✓ Playback completed!", fg="#00FF00")
     except Exception as e:
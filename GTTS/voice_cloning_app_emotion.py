@@ -313,12 +313,13 @@ apply_gpu_btn.grid(row=6, column=2, padx=5, pady=5)
 def play_audio(filename):
     """Play audio file using pygame"""
     try:
-        pygame.mixer.init()
+        if not pygame.mixer.get_init():  # open the device once per session
+            pygame.mixer.init()
         pygame.mixer.music.load(filename)
         pygame.mixer.music.play()
         
         while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+            time.sleep(0.02)
         
         status_label.config(text="✓ Playback completed!", fg="#00FF00")
     except Exception as e:
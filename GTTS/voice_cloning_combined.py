@@ -362,12 +362,13 @@ play_btn2.pack(pady=5)
 # ============== UTILITY FUNCTIONS ==============
 def play_audio(filename):
     try:
-        pygame.mixer.init()
+        if not pygame.mixer.get_init():  # open the device once per session
+            pygame.mixer.init()
         pygame.mixer.music.load(filename)
         pygame.mixer.music.play()
         
         while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+            time.sleep(0.02)
     except Exception as e:
         messagebox.showerror("Playback Error", str(e))
 
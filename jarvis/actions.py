@@ -4,9 +4,105 @@ Handles laptop control commands and actions
 """
 
 import os
-import subprocess
-import webbrowser
+import sys
+import json
+import time
+import argparse
+import threading
+from functools import partial
+from collections import namedtuple
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 from config import Config
+from matcher import PhraseMatcher, tokenize
+from registry import ActionRegistry
+
+IntentCandidate = namedtuple('IntentCandidate', ['command', 'phrase', 'score'])
+
+
+class IntentIndex:
+    """
+    Fuzzy lookup of command phrases for misrecognized text
+    
+    Phrases are indexed by character trigrams of their letters with the
+    spaces removed (so "screen shot" and "screenshot" coincide) and by
+    their word tokens. A query only scores phrases sharing trigrams with
+    it: the best trigram Dice coefficient over windows of the query about
+    as many words long as the phrase (so extra words around a command
+    don't dilute it), plus a bonus for whole words in common. The
+    phrase's leading word (its verb, e.g. "open") must share a trigram
+    with some query word, so "close browser" doesn't score as "open
+    browser" on the strength of "browser" alone.
+    """
+    
+    TOKEN_WEIGHT = 0.2
+    MIN_BOUND = 0.3  # skip phrases that cannot reach this Dice score
+    
+    def __init__(self, phrases, ignore=()):
+        """
+        Args:
+            phrases: Iterable of (phrase, command) pairs
+            ignore: Words dropped from queries (e.g. the wake word)
+        """
+        self.ignore = set(ignore)
+        self.entries = []  # (phrase, command, token list, trigram set, leading word trigrams)
+        self.grams = {}  # trigram -> [entry ids]
+        for phrase, command in phrases:
+            tokens = tokenize(phrase)
+            grams = self._grams(tokens)
+            entry_id = len(self.entries)
+            self.entries.append((phrase, command, tokens, grams, self._grams(tokens[:1])))
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(entry_id)
+    
+    @staticmethod
+    def _grams(tokens):
+        text = '#' + ''.join(tokens) + '#'
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def search(self, text, limit=3):
+        """
+        Rank commands by similarity to text
+        
+        Returns:
+            list: Up to limit IntentCandidate (best phrase per command),
+            highest score first
+        """
+        tokens = [t for t in tokenize(text) if t not in self.ignore]
+        shared = {}
+        for gram in self._grams(tokens):
+            for entry_id in self.grams.get(gram, ()):
+                shared[entry_id] = shared.get(entry_id, 0) + 1
+        
+        windows = {}  # (start, length) -> trigram set
+        query_tokens = set(tokens)
+        word_grams = [self._grams([token]) for token in query_tokens]
+        best = {}
+        for entry_id, count in shared.items():
+            phrase, command, phrase_tokens, phrase_grams, lead_grams = self.entries[entry_id]
+            if not any(lead_grams & grams for grams in word_grams):
+                continue  # its verb (or only word) is nowhere in the query
+            size = len(phrase_grams)
+            count = min(count, size)
+            if 2 * count / (size + count) < self.MIN_BOUND:
+                continue
+            
+            dice = 0.0
+            k = len(phrase_tokens)
+            for length in range(max(1, k - 1), min(len(tokens), k + 1) + 1):
+                for start in range(len(tokens) - length + 1):
+                    grams = windows.get((start, length))
+                    if grams is None:
+                        grams = windows[(start, length)] = self._grams(tokens[start:start + length])
+                    dice = max(dice, 2 * len(grams & phrase_grams) / (len(grams) + size))
+            
+            words = len(query_tokens.intersection(phrase_tokens)) / k
+            score = round((1 - self.TOKEN_WEIGHT) * dice + self.TOKEN_WEIGHT * words, 3)
+            if command not in best or score > best[command].score:
+                best[command] = IntentCandidate(command, phrase, score)
+        return sorted(best.values(), key=lambda c: -c.score)[:limit]
 
 
 class Actions:
@@ -14,15 +110,156 @@ class Actions:
     
     def __init__(self):
         self.config = Config()
-        self.commands = {
-            'open browser': self.open_browser,
-            'play music': self.play_music,
-            'shutdown': self.shutdown,
-            'restart': self.restart,
-            'open': self.open_application,
-            'volume': self.control_volume,
-            'screenshot': self.take_screenshot,
-        }
+        self.registry = ActionRegistry(
+            package=self.config.ACTION_PLUGIN_PACKAGE,
+            group=self.config.ACTION_ENTRY_POINT_GROUP,
+            manifest_path=self.config.ACTION_MANIFEST
+        )
+        self.commands = {}
+        # Other ways of saying each command; {slot} expands to the values
+        # in self.slots (declared by the plugins). They are matched as
+        # aliases of the command and compiled into the grammar for
+        # constrained recognition.
+        self.variants = {}
+        self.slots = {}
+        # Fuzzy matches must score at least this; risky commands need more
+        self.fuzzy_min_score = {}
+        # Seconds each command may run off the GUI thread (default: ACTION_TIMEOUT)
+        self.timeouts = {}
+        # Commands that wait for everything before them in a compound command
+        self.exclusive = set()
+        
+        # Plugins are only described here; their code loads on first use
+        for spec in self.registry.discover():
+            self.commands[spec.name] = partial(self._run_plugin, spec.name)
+            if spec.phrases:
+                self.variants[spec.name] = spec.phrases
+            for slot, values in spec.slots.items():
+                known = self.slots.setdefault(slot, [])
+                known.extend(v for v in values if v not in known)
+            if spec.timeout is not None:
+                self.timeouts[spec.name] = spec.timeout
+            if spec.min_score is not None:
+                self.fuzzy_min_score[spec.name] = spec.min_score
+            if spec.exclusive:
+                self.exclusive.add(spec.name)
+        self._matcher = None
+        self._intents = None
+        self._apps = None
+        self._apps_lock = threading.Lock()
+    
+    def phrases(self):
+        """
+        Every phrase that triggers a command, with slots expanded
+        
+        Yields:
+            tuple: (phrase, command)
+        """
+        for command in self.commands:
+            yield command, command
+            for variant in self.variants.get(command, []):
+                expanded = [variant]
+                for slot, values in self.slots.items():
+                    marker = '{' + slot + '}'
+                    if marker in variant:
+                        expanded = [p.replace(marker, v) for p in expanded for v in values]
+                for phrase in expanded:
+                    yield phrase, command
+    
+    def grammar(self):
+        """
+        Phrases for a constrained recognizer grammar
+        
+        Returns:
+            list: Sorted unique phrases from phrases()
+        """
+        return sorted({phrase for phrase, _ in self.phrases()})
+    
+    def register_command(self, phrase, action, variants=None):
+        """
+        Add a command handler
+        
+        Args:
+            phrase: Command phrase, e.g. 'open browser'
+            action: Callable(text)
+            variants: Other phrases for it (may use {slot} markers)
+        """
+        self.commands[phrase] = action
+        if variants:
+            self.variants[phrase] = list(variants)
+        self._matcher = None
+        self._intents = None
+    
+    @property
+    def matcher(self):
+        """Phrase matcher over all commands and variants, compiled on first use"""
+        if self._matcher is None:
+            matcher = PhraseMatcher()
+            for phrase, command in self.phrases():
+                matcher.add(phrase, command)
+            matcher.compile()
+            self._matcher = matcher
+        return self._matcher
+    
+    @property
+    def intents(self):
+        """Fuzzy index over all commands and variants, built on first use"""
+        if self._intents is None:
+            self._intents = IntentIndex(self.phrases(), ignore=[self.config.WAKE_WORD])
+        return self._intents
+    
+    def suggest(self, text, limit=3):
+        """
+        Ranked fuzzy candidates for text that may have been misrecognized
+        
+        Returns:
+            list: IntentCandidate (command, phrase, score), best first
+        """
+        return self.intents.search(text, limit)
+    
+    def resolve(self, text):
+        """
+        Find the command in text
+        
+        An exact phrase match (longest wins) is used unless a fuzzy
+        candidate that clears its score threshold (at least
+        INTENT_OVERRIDE_SCORE) spans more words: for "open brouser" the
+        exact hit is just "open", but the intent is "open browser".
+        
+        Returns:
+            tuple: (command or None, IntentCandidate when resolved fuzzily)
+        """
+        match = self.matcher.match(text)
+        exact_words = match.end - match.start if match else 0
+        
+        fuzzy = None
+        for candidate in self.suggest(text, limit=5):
+            threshold = self.fuzzy_min_score.get(candidate.command, self.config.INTENT_MIN_SCORE)
+            if match:
+                threshold = max(threshold, self.config.INTENT_OVERRIDE_SCORE)
+            if candidate.score < threshold:
+                continue
+            words = len(tokenize(candidate.phrase))
+            if words > exact_words and (fuzzy is None or words > len(tokenize(fuzzy.phrase))):
+                fuzzy = candidate
+        
+        if fuzzy and not (match and match.value == fuzzy.command):
+            return fuzzy.command, fuzzy
+        if match:
+            return match.value, None
+        return None, None
+    
+    def match_command(self, text):
+        """
+        Command for text (see resolve)
+        
+        Returns:
+            str: Command phrase (key of self.commands), or None
+        """
+        command, fuzzy = self.resolve(text)
+        if fuzzy:
+            print(f"Interpreting '{text}' as '{fuzzy.phrase}' ({fuzzy.score:.2f})")
+        return command
     
     def process_command(self, text):
         """
@@ -30,58 +267,119 @@ class Actions:
         
         Args:
             text: Voice command text
+            
+        Returns:
+            str: The command that ran, or None if text wasn't recognized
         """
-        for command, action in self.commands.items():
-            if command in text:
-                action(text)
-                return
+        command = self.match_command(text)
+        if command:
+            self.commands[command](text)
+            return command
         
         print("Command not recognized")
+        self._log_unrecognized(text)
+        return None
+    
+    def _log_unrecognized(self, text):
+        """Append to LOG_DIR/unrecognized_commands.jsonl, raw material for the intent error corpus"""
+        record = {'time': time.time(), 'text': text,
+                  'candidates': [c._asdict() for c in self.suggest(text)]}
+        try:
+            with open(os.path.join(self.config.LOG_DIR, 'unrecognized_commands.jsonl'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError:
+            pass
+    
+    @property
+    def apps(self):
+        """Index of launchable applications, loaded from its cache on first use"""
+        with self._apps_lock:
+            if self._apps is None:
+                from app_index import AppIndex
+                self._apps = AppIndex(
+                    cache_path=self.config.APP_INDEX_CACHE,
+                    refresh_interval=self.config.APP_INDEX_REFRESH_INTERVAL,
+                    min_score=self.config.APP_MIN_SCORE
+                )
+            return self._apps
     
-    def open_browser(self, text):
-        """Open web browser"""
-        url = self.config.DEFAULT_SEARCH_URL
-        if 'google' in text:
-            webbrowser.open('https://www.google.com')
-        else:
-            webbrowser.open(url)
-        print("🌐 Opening browser...")
-    
-    def play_music(self, text):
-        """Play music"""
-        print("🎵 Playing music...")
-        # Implementation depends on media player
-    
-    def shutdown(self, text):
-        """Shutdown the system"""
-        print("⏻️  Shutting down system in 30 seconds...")
-        if os.name == 'nt':
-            os.system('shutdown /s /t 30')
-        else:
-            os.system('shutdown -h +1')
-    
-    def restart(self, text):
-        """Restart the system"""
-        print("🔄 Restarting system...")
-        if os.name == 'nt':
-            os.system('shutdown /r /t 30')
-        else:
-            os.system('shutdown -r +1')
-    
-    def open_application(self, text):
-        """Open an application"""
-        print(f"Opening application from command: {text}")
-        # Extract app name and open it
-    
-    def control_volume(self, text):
-        """Control system volume"""
-        print("🔊 Adjusting volume...")
-    
-    def take_screenshot(self, text):
-        """Take a screenshot"""
-        print("📸 Screenshot taken")
+    def warm_up(self):
+        """Import heavy plugins and load the app index in the background once startup has settled"""
+        return self.registry.warm_up(self.config.ACTION_WARMUP_DELAY, tasks=[lambda: self.apps])
+    
+    def _run_plugin(self, name, text):
+        """
+        Call a plugin action, loading it first if needed
+        
+        Raises:
+            ImportError: A module the action requires is not installed (so the
+                executor reports the step FAILED rather than DONE)
+        """
         try:
-            import pyautogui
-            pyautogui.screenshot(f'screenshot_{os.getpid()}.png')
-        except ImportError:
-            print("pyautogui not installed")
+            handler = self.registry.handler(name)
+        except ImportError as e:
+            print(f"[ERROR] {name}: {e.name or e} not installed")
+            raise
+        handler(self, text)
+
+
+def evaluate_intents(corpus_path, actions=None, repeat=20):
+    """
+    Score fuzzy resolution on recorded recognition errors
+    
+    Args:
+        corpus_path: JSONL of {"heard": <recognized text>, "intent": <command>}
+            (intent null for utterances that should match nothing)
+        repeat: Timed resolve calls per case
+        
+    Returns:
+        dict: cases, accuracy (resolved command == intent, including
+        correct rejections), top3 (intent among the candidates), and
+        resolve latency mean/p99 in microseconds
+    """
+    actions = actions or Actions()
+    cases = []
+    with open(corpus_path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                cases.append(json.loads(line))
+    
+    actions.resolve('')  # build the matcher and index outside the timings
+    correct = top3 = 0
+    timings = []
+    for case in cases:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            command, _ = actions.resolve(case['heard'])
+            timings.append(time.perf_counter() - started)
+        
+        candidates = actions.suggest(case['heard'])
+        correct += command == case['intent']
+        top3 += case['intent'] is None or case['intent'] in [c.command for c in candidates]
+    
+    timings.sort()
+    return {
+        'cases': len(cases),
+        'accuracy': round(correct / len(cases), 3) if cases else None,
+        'top3': round(top3 / len(cases), 3) if cases else None,
+        'mean_us': round(sum(timings) / len(timings) * 1e6, 1) if timings else None,
+        'p99_us': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e6, 1) if timings else None,
+    }
+
+
+def main(argv=None):
+    """Command line entry point: python -m jarvis.actions eval [corpus.jsonl]"""
+    parser = argparse.ArgumentParser(prog='python -m jarvis.actions', description='Jarvis action tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    evaluate = commands.add_parser('eval', help='Evaluate fuzzy intent resolution on a recognition-error corpus')
+    evaluate.add_argument('corpus', nargs='?',
+                          default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'intent_errors.jsonl'))
+    
+    args = parser.parse_args(argv)
+    print(json.dumps(evaluate_intents(args.corpus), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
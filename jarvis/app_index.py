@@ -0,0 +1,446 @@
+"""
+App Index Module
+Persistent index of launchable applications (XDG .desktop entries and
+PATH executables), refreshed per directory by mtime, with exact, prefix
+and fuzzy lookup of spoken application names
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import bisect
+import fnmatch
+import argparse
+import threading
+import subprocess
+from collections import namedtuple
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from matcher import tokenize
+
+AppEntry = namedtuple('AppEntry', ['name', 'command', 'source'])  # command: argv list
+
+DESKTOP = 'desktop'
+PATH = 'path'
+
+# Desktop Exec field codes (file/URL arguments, icon, etc.) dropped when launching
+_FIELD_CODES = {'%f', '%F', '%u', '%U', '%d', '%D', '%n', '%N', '%i', '%c', '%k', '%v', '%m'}
+
+# Never launched by voice: power and destructive commands (shutdown and
+# restart have their own guarded actions), whatever entry points at them
+DENIED = ['shutdown', 'reboot', 'poweroff', 'halt', 'init', 'telinit', 'systemctl', 'loginctl',
+          'rm', 'rmdir', 'dd', 'shred', 'wipefs', 'fdisk', 'sfdisk', 'parted', 'mkfs*', 'mkswap',
+          'kill*', 'pkill', 'xkill', 'sudo', 'su', 'doas', 'pkexec']
+# Also refused as PATH executables (desktop entries may legitimately run through them)
+DENIED_ON_PATH = ['python*', 'pypy*', 'perl*', 'ruby*', 'node', 'nodejs', 'deno', 'bun', 'php*', 'lua*',
+                  'java', 'osascript', 'sh', 'bash', 'dash', 'zsh', 'ksh', 'csh', 'tcsh', 'fish',
+                  'busybox', 'env', 'xargs', 'nohup', 'setsid', 'exec', 'eval', 'cmd', 'powershell', 'pwsh']
+
+MIN_PARTIAL = 3  # shortest spoken key allowed a prefix or fuzzy match
+
+
+def app_key(name):
+    """Lookup key of a name: lower-case letters and digits only ("Fire Fox" -> "firefox")"""
+    return ''.join(tokenize(name.replace('-', ' ').replace('_', ' ')))
+
+
+def is_denied(entry, source):
+    """Whether an entry (by executable or display name) must not be launched by voice"""
+    command = entry['command']
+    executable = os.path.basename(command[0]).lower() if command else ''
+    if executable.endswith('.exe'):
+        executable = executable[:-4]
+    patterns = DENIED + DENIED_ON_PATH if source == PATH else DENIED
+    names = [executable, app_key(entry['name'])]
+    return any(fnmatch.fnmatchcase(name, pattern) for name in names for pattern in patterns)
+
+
+def desktop_dirs():
+    """XDG application directories, most specific first"""
+    data_home = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    data_dirs = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    roots = [data_home] + [d for d in data_dirs.split(':') if d]
+    roots += ['/var/lib/flatpak/exports/share', os.path.join(os.path.expanduser('~'), '.local/share/flatpak/exports/share')]
+    seen = []
+    for root in roots:
+        path = os.path.join(root, 'applications')
+        if path not in seen:
+            seen.append(path)
+    return seen
+
+
+def path_dirs():
+    """Directories on PATH, in search order"""
+    seen = []
+    for path in os.environ.get('PATH', '').split(os.pathsep):
+        if path and path not in seen:
+            seen.append(path)
+    return seen
+
+
+def parse_desktop_file(path):
+    """
+    Read the launch details of a .desktop file
+    
+    Returns:
+        dict: name, command (argv), aliases, or None for hidden, non-app
+        or unreadable entries
+    """
+    fields = {}
+    section = None
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('['):
+                    section = line
+                    continue
+                if section != '[Desktop Entry]' or '=' not in line or line.startswith('#'):
+                    continue
+                key, value = line.split('=', 1)
+                fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+    
+    if fields.get('Type', 'Application') != 'Application' or 'Exec' not in fields:
+        return None
+    if fields.get('NoDisplay') == 'true' or fields.get('Hidden') == 'true':
+        return None
+    try:
+        argv = [arg.replace('%%', '%') for arg in shlex.split(fields['Exec']) if arg not in _FIELD_CODES]
+    except ValueError:
+        return None
+    if not argv:
+        return None
+    
+    name = fields.get('Name') or os.path.splitext(os.path.basename(path))[0]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    aliases = [stem.split('.')[-1], os.path.basename(argv[0])]
+    if fields.get('GenericName'):
+        aliases.append(fields['GenericName'])
+    return {'name': name, 'command': argv, 'aliases': aliases}
+
+
+def scan_directory(path, source):
+    """
+    Launchable entries of one directory
+    
+    Returns:
+        list: dicts with name, command, aliases
+    """
+    entries = []
+    try:
+        with os.scandir(path) as it:
+            for item in it:
+                if source == DESKTOP:
+                    if item.name.endswith('.desktop'):
+                        entry = parse_desktop_file(item.path)
+                        if entry:
+                            entries.append(entry)
+                elif not item.name.startswith('.'):
+                    try:
+                        if item.is_file() and os.access(item.path, os.X_OK):
+                            entries.append({'name': item.name, 'command': [item.path], 'aliases': []})
+                    except OSError:
+                        continue
+    except OSError:
+        pass
+    return entries
+
+
+class AppIndex:
+    """
+    Launchable applications by spoken name
+    
+    Each scanned directory is stored with its mtime in a JSON cache. A
+    refresh only stats the directories and rescans those whose mtime
+    changed (files added, removed or renamed), so lookups never crawl
+    the filesystem. Lookup order: exact key ("fire fox" == "Firefox"),
+    then the shortest desktop entry starting with the key, then the best
+    trigram match among desktop entries. PATH executables only match
+    exactly, and desktop entries win over them. Power, destructive and
+    (on PATH) interpreter executables are never indexed (see DENIED).
+    
+    Safe to use from several threads: one refresh runs at a time, and
+    lookups read the lookup tables as one snapshot, so they never see a
+    half-built index.
+    """
+    
+    def __init__(self, cache_path=None, desktop=None, path=None, refresh_interval=5.0, min_score=0.5):
+        """
+        Args:
+            cache_path: JSON file persisting the index (None: memory only)
+            desktop: .desktop directories (default: XDG data dirs)
+            path: Executable directories (default: PATH)
+            refresh_interval: Minimum seconds between mtime checks on lookup
+            min_score: Trigram Dice score needed for a fuzzy match
+        """
+        self.cache_path = cache_path
+        self.sources = [(d, DESKTOP) for d in (desktop_dirs() if desktop is None else desktop)]
+        self.sources += [(d, PATH) for d in (path_dirs() if path is None else path)]
+        self.refresh_interval = refresh_interval
+        self.min_score = min_score
+        self.rescans = 0
+        
+        self._lock = threading.Lock()  # held by refresh, rebuild and save
+        self._tables_lock = threading.Lock()  # guards swapping/reading _tables
+        self._dirs = self._load()  # directory -> {'mtime': ns, 'source': ..., 'entries': [...]}
+        self._checked = 0.0
+        # (key -> AppEntry, sorted desktop keys for prefix lookup,
+        #  trigram -> [keys], key -> trigram count), replaced as a whole
+        self._tables = ({}, [], {}, {})
+        self.refresh(force=True)
+    
+    def refresh(self, force=False):
+        """
+        Rescan directories whose mtime changed
+        
+        Args:
+            force: Check now even if refresh_interval hasn't passed, and
+                wait for a refresh already running on another thread
+        
+        Returns:
+            int: Directories rescanned (0 when another thread is refreshing)
+        """
+        if not self._lock.acquire(blocking=force):
+            return 0  # lookups meanwhile use the current tables
+        try:
+            return self._refresh(force)
+        finally:
+            self._lock.release()
+    
+    def _refresh(self, force):
+        """refresh() with the lock held"""
+        now = time.monotonic()
+        if not force and now - self._checked < self.refresh_interval:
+            return 0
+        self._checked = now
+        
+        changed = 0
+        for directory, source in self.sources:
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                mtime = None
+            cached = self._dirs.get(directory)
+            if cached and cached['mtime'] == mtime and cached['source'] == source:
+                continue
+            entries = scan_directory(directory, source) if mtime is not None else []
+            self._dirs[directory] = {'mtime': mtime, 'source': source, 'entries': entries}
+            changed += 1
+        stale = set(self._dirs) - {d for d, _ in self.sources}
+        for directory in stale:
+            del self._dirs[directory]
+        
+        if changed or stale or not self._snapshot()[0]:
+            self.rescans += changed
+            self._build()
+            if changed or stale:
+                self._save()
+        return changed
+    
+    def find(self, spoken):
+        """
+        Best application for a spoken name
+        
+        Returns:
+            AppEntry, or None
+        """
+        results = self.search(spoken, limit=1)
+        return results[0][0] if results else None
+    
+    def search(self, spoken, limit=5):
+        """
+        Applications matching a spoken name
+        
+        Returns:
+            list: (AppEntry, score) best first; exact 1.0, prefix 0.9,
+            fuzzy the trigram Dice score (at least min_score). Prefix and
+            fuzzy matches are desktop entries only, for keys of at least
+            MIN_PARTIAL characters.
+        """
+        self.refresh()
+        keys, partial, grams_index, sizes = self._snapshot()
+        key = app_key(spoken)
+        if not key:
+            return []
+        if key in keys:
+            return [(keys[key], 1.0)]
+        if len(key) < MIN_PARTIAL:
+            return []
+        
+        start = bisect.bisect_left(partial, key)
+        prefixed = []
+        for candidate in partial[start:start + 50]:
+            if not candidate.startswith(key):
+                break
+            prefixed.append(candidate)
+        if prefixed:
+            prefixed.sort(key=len)
+            return [(keys[k], 0.9) for k in prefixed[:limit]]
+        
+        grams = self._trigrams(key)
+        shared = {}
+        for gram in grams:
+            for candidate in grams_index.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        scored = []
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + sizes[candidate])
+            if score >= self.min_score:
+                scored.append((score, candidate))
+        scored.sort(key=lambda item: (-item[0], len(item[1])))
+        return [(keys[k], round(score, 3)) for score, k in scored[:limit]]
+    
+    def names(self, source=None):
+        """Display names of indexed applications (optionally one source only)"""
+        return sorted({e.name for e in self._snapshot()[0].values() if source is None or e.source == source})
+    
+    def stats(self):
+        """
+        Index size and refresh work
+        
+        Returns:
+            dict: directories, entries (unique keys), rescans
+        """
+        return {'directories': len(self._dirs), 'entries': len(self._snapshot()[0]), 'rescans': self.rescans}
+    
+    def _snapshot(self):
+        """The current lookup tables (consistent with each other)"""
+        with self._tables_lock:
+            return self._tables
+    
+    @staticmethod
+    def _trigrams(key):
+        padded = f'#{key}#'
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def _build(self):
+        """Rebuild the lookup tables (lock held); earlier directories and desktop entries win"""
+        keys = {}
+        for directory, source in sorted(self.sources, key=lambda s: s[1] != DESKTOP):
+            for entry in self._dirs.get(directory, {}).get('entries', []):
+                if is_denied(entry, source):
+                    continue
+                app = AppEntry(entry['name'], entry['command'], source)
+                for name in [entry['name']] + entry['aliases']:
+                    key = app_key(name)
+                    if key and key not in keys:
+                        keys[key] = app
+        # Prefix and fuzzy tables hold desktop entries only
+        partial = sorted(key for key, app in keys.items() if app.source == DESKTOP)
+        grams = {}
+        sizes = {}
+        for key in partial:
+            key_grams = self._trigrams(key)
+            sizes[key] = len(key_grams)
+            for gram in key_grams:
+                grams.setdefault(gram, []).append(key)
+        with self._tables_lock:
+            self._tables = (keys, partial, grams, sizes)
+    
+    def _load(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                return json.load(f).get('directories', {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+    
+    def _save(self):
+        """Persist the scanned directories (lock held)"""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp = self.cache_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'updated': time.time(), 'directories': self._dirs}, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f"[WARNING] Could not write app index: {e}")
+
+
+def launch(entry):
+    """
+    Start an application detached from Jarvis
+    
+    Returns:
+        subprocess.Popen
+    """
+    kwargs = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS
+    else:
+        kwargs['start_new_session'] = True
+    return subprocess.Popen(entry.command, **kwargs)
+
+
+def benchmark(index, queries, repeat=200):
+    """
+    Time lookups
+    
+    Returns:
+        dict: build_ms (cold index from scratch), warm_load_ms (from the
+        cache), per-query result and mean/p99 lookup microseconds
+    """
+    report = {}
+    started = time.perf_counter()
+    AppIndex(cache_path=None, desktop=[d for d, s in index.sources if s == DESKTOP],
+             path=[d for d, s in index.sources if s == PATH])
+    report['build_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    if index.cache_path:
+        started = time.perf_counter()
+        AppIndex(cache_path=index.cache_path)
+        report['warm_load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    report.update(index.stats())
+    
+    timings = []
+    results = {}
+    for query in queries:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = index.search(query, limit=1)
+            timings.append(time.perf_counter() - started)
+        results[query] = [found[0][0].name, found[0][1]] if found else None
+    timings.sort()
+    report['lookup_mean_us'] = round(sum(timings) / len(timings) * 1e6, 1) if timings else None
+    report['lookup_p99_us'] = round(timings[int(len(timings) * 0.99)] * 1e6, 1) if timings else None
+    report['results'] = results
+    return report
+
+
+def main(argv=None):
+    """Command line entry point: python -m jarvis.app_index {list,find,bench}"""
+    from config import Config
+    config = Config()
+    
+    parser = argparse.ArgumentParser(prog='python -m jarvis.app_index', description='Jarvis application index tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    listing = commands.add_parser('list', help='List indexed applications')
+    listing.add_argument('--source', choices=[DESKTOP, PATH])
+    find = commands.add_parser('find', help='Look up a spoken application name')
+    find.add_argument('name')
+    bench = commands.add_parser('bench', help='Time index builds and lookups')
+    bench.add_argument('queries', nargs='*', default=['firefox', 'fire fox', 'calculator', 'terminal', 'pyth', 'vimm'])
+    
+    args = parser.parse_args(argv)
+    index = AppIndex(config.APP_INDEX_CACHE, refresh_interval=config.APP_INDEX_REFRESH_INTERVAL,
+                     min_score=config.APP_MIN_SCORE)
+    if args.command == 'list':
+        print('\n'.join(index.names(args.source)))
+    elif args.command == 'find':
+        print(json.dumps([{'name': e.name, 'command': e.command, 'source': e.source, 'score': s}
+                          for e, s in index.search(args.name)], indent=2))
+    else:
+        print(json.dumps(benchmark(index, args.queries), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
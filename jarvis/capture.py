@@ -0,0 +1,474 @@
+"""
+Audio Capture Module
+Keeps the input stream open on a dedicated thread, writes fixed-size
+frames into a ring buffer and cuts utterances out of it with a
+voice-activity detector
+"""
+
+import os
+import math
+import time
+import queue
+import array
+import threading
+from collections import deque
+
+import speech_recognition as sr
+
+
+class Segment(sr.AudioData):
+    """Captured utterance, stamped with when its endpoint was detected"""
+    
+    def __init__(self, frame_data, sample_rate, sample_width, endpoint_at=None):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self.endpoint_at = endpoint_at  # time.perf_counter()
+
+
+class FileSource(sr.AudioSource):
+    """
+    Recorded audio as an input device
+    
+    WAV/AIFF/FLAC files (or directories of them) are converted to mono
+    16-bit PCM at sample_rate and played back to back with silence in
+    between, so SpeechToText and AudioCapture run without a microphone.
+    """
+    
+    EXTENSIONS = ('.wav', '.aif', '.aiff', '.flac')
+    
+    def __init__(self, paths, sample_rate=16000, gap_ms=1000, realtime=False, chunk_size=1024):
+        """
+        Args:
+            paths: File or directory path, or a list of them
+            sample_rate: Output rate (16 kHz suits webrtcvad and the recognizers)
+            gap_ms: Silence before each file and after the last
+            realtime: Pace reads at playback speed, like a live device
+            chunk_size: Samples per read for sr.Recognizer.listen()
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = []
+        for path in paths:
+            if os.path.isdir(path):
+                self.paths.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                         if name.lower().endswith(self.EXTENSIONS)))
+            else:
+                self.paths.append(path)
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size
+        self.gap_ms = gap_ms
+        self.realtime = realtime
+        self.spans = []  # (path, start seconds, end seconds) within the stream
+        self.stream = None
+    
+    def __enter__(self):
+        recognizer = sr.Recognizer()
+        gap = b'\0\0' * (self.SAMPLE_RATE * self.gap_ms // 1000)
+        parts = []
+        offset = 0
+        self.spans = []
+        for path in self.paths:
+            with sr.AudioFile(path) as f:
+                audio = recognizer.record(f)
+            pcm = audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2)
+            parts += [gap, pcm]
+            start = offset + len(gap)
+            offset = start + len(pcm)
+            self.spans.append((path, start / 2 / self.SAMPLE_RATE, offset / 2 / self.SAMPLE_RATE))
+        parts.append(gap)
+        self.stream = _PCMStream(b''.join(parts), self.SAMPLE_RATE, self.realtime)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+class _PCMStream:
+    """read(n) over in-memory int16 PCM, optionally paced at real time"""
+    
+    def __init__(self, pcm, sample_rate, realtime):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.position = 0
+        self.started = None
+    
+    def read(self, size):
+        if self.started is None:
+            self.started = time.perf_counter()
+        data = self.pcm[self.position:self.position + size * 2]
+        self.position += len(data)
+        if self.realtime:
+            due = self.started + self.position / 2 / self.sample_rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+
+class RingBuffer:
+    """Fixed-capacity store of audio frames addressed by absolute frame index"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._frames = [None] * capacity
+        self._next = 0  # absolute index of the next frame to be written
+        self._lock = threading.Lock()
+    
+    def append(self, frame):
+        """
+        Store a frame, overwriting the oldest once full
+        
+        Returns:
+            int: Absolute index of the stored frame
+        """
+        with self._lock:
+            index = self._next
+            self._frames[index % self.capacity] = frame
+            self._next += 1
+            return index
+    
+    def end(self):
+        """Absolute index one past the newest frame"""
+        with self._lock:
+            return self._next
+    
+    def oldest(self):
+        """Absolute index of the oldest frame still held"""
+        with self._lock:
+            return max(0, self._next - self.capacity)
+    
+    def slice(self, start, end):
+        """
+        Concatenate frames [start, end); frames already overwritten are skipped
+        
+        Returns:
+            bytes: Raw PCM
+        """
+        with self._lock:
+            start = max(start, self._next - self.capacity, 0)
+            end = min(end, self._next)
+            return b''.join(self._frames[i % self.capacity] for i in range(start, end))
+
+
+def frame_rms(frame, sample_width=2):
+    """Root-mean-square energy of a little-endian int16 frame"""
+    if sample_width != 2 or not frame:
+        return 0.0
+    samples = array.array('h', frame[:len(frame) - len(frame) % 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class EnergyVAD:
+    """Voice activity by frame energy against the recognizer's energy threshold"""
+    
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+    
+    def is_speech(self, frame, sample_rate, sample_width):
+        return frame_rms(frame, sample_width) > self.recognizer.energy_threshold
+
+
+class WebRTCVAD:
+    """Voice activity via webrtcvad (10/20/30 ms int16 frames at 8/16/32/48 kHz)"""
+    
+    def __init__(self, aggressiveness=2):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+    
+    def is_speech(self, frame, sample_rate, sample_width):
+        return self.vad.is_speech(frame, sample_rate)
+
+
+def make_vad(recognizer, aggressiveness=2):
+    """webrtcvad when installed, else the energy detector"""
+    try:
+        return WebRTCVAD(aggressiveness)
+    except ImportError:
+        return EnergyVAD(recognizer)
+
+
+class NoiseFloorTracker:
+    """
+    Background ambient-noise estimate driving recognizer.energy_threshold
+    
+    The floor is a low percentile of RMS energy over a sliding window of
+    all frames, smoothed with an exponential moving average; the threshold
+    is floor * ratio. Speech comes in bursts with pauses, so the low
+    percentile follows the background without needing a VAD verdict: an
+    energy VAD judges frames against the very threshold this sets, so
+    learning only from its non-speech frames would never adapt to noise
+    that starts out above the threshold. This replaces the ~1 s
+    adjust_for_ambient_noise() calibration before every listen().
+    """
+    
+    def __init__(self, recognizer, alpha=0.05, ratio=1.5, min_threshold=50.0,
+                 warmup_frames=10, window_frames=166, percentile=0.1, history=600):
+        """
+        Args:
+            recognizer: sr.Recognizer whose energy_threshold is updated
+            alpha: EMA weight of each new percentile estimate
+            ratio: Threshold multiple of the noise floor
+            min_threshold: Lower bound so digital silence doesn't trigger on hiss
+            warmup_frames: Frames seen before the first estimate
+            window_frames: Frames the percentile is taken over (~5 s of 30 ms frames)
+            percentile: Fraction of the window expected to be background at least
+            history: Threshold trajectory points kept
+        """
+        self.recognizer = recognizer
+        self.alpha = alpha
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self.warmup_frames = warmup_frames
+        self.percentile = percentile
+        self.floor = None
+        self.frames = 0
+        self.update_seconds = 0.0  # CPU time spent estimating
+        self.warmed_at = None  # perf_counter when the first estimate was ready
+        self.trajectory = deque(maxlen=history)  # (unix time, threshold)
+        self._started = time.perf_counter()
+        self._window = deque(maxlen=window_frames)
+    
+    def update(self, frame, sample_width=2):
+        """Fold one frame (speech or not) into the estimate"""
+        started = time.perf_counter()
+        self._window.append(frame_rms(frame, sample_width))
+        self.frames += 1
+        
+        if len(self._window) >= self.warmup_frames:
+            energies = sorted(self._window)
+            estimate = energies[int(self.percentile * (len(energies) - 1))]
+            if self.floor is None:
+                self.floor = estimate
+                self.warmed_at = time.perf_counter()
+                self._apply(force=True)
+            else:
+                self.floor += self.alpha * (estimate - self.floor)
+                self._apply()
+        
+        self.update_seconds += time.perf_counter() - started
+    
+    def _apply(self, force=False):
+        threshold = max(self.floor * self.ratio, self.min_threshold)
+        previous = self.recognizer.energy_threshold
+        self.recognizer.energy_threshold = threshold
+        # Keep the trajectory compact: only record moves of more than 5%
+        if force or not previous or abs(threshold - previous) / previous > 0.05:
+            self.trajectory.append((time.time(), round(threshold, 1)))
+    
+    def stats(self):
+        """
+        Calibration cost and threshold trajectory
+        
+        Returns:
+            dict: noise_floor, energy_threshold, warmup_ms (time to first
+            estimate), cpu_us_per_frame, frames, trajectory
+        """
+        return {
+            'noise_floor': None if self.floor is None else round(self.floor, 1),
+            'energy_threshold': round(self.recognizer.energy_threshold, 1),
+            'warmup_ms': None if self.warmed_at is None
+            else round((self.warmed_at - self._started) * 1000, 1),
+            'cpu_us_per_frame': round(self.update_seconds / self.frames * 1e6, 1) if self.frames else None,
+            'frames': self.frames,
+            'trajectory': list(self.trajectory),
+        }
+
+
+class AudioCapture:
+    """
+    Continuous capture with VAD-based utterance segmentation
+    
+    Completed utterances are put on `segments` as Segment (sr.AudioData).
+    Nothing said between listen() calls is lost, and the device is opened
+    once.
+    """
+    
+    def __init__(self, source, vad, frame_ms=30, ring_seconds=30,
+                 pre_roll_ms=300, start_ms=90, end_silence_ms=800,
+                 max_utterance_s=15, max_segments=8, noise=None, gate=None):
+        """
+        Args:
+            source: sr.AudioSource (e.g. sr.Microphone) opened once by the capture thread
+            vad: Object with is_speech(frame, sample_rate, sample_width)
+            noise: Optional NoiseFloorTracker fed with every frame; no
+                utterance opens before its warmup estimate is ready
+            gate: Optional listener (e.g. WakeWordGate) whose
+                passes_utterance() decides whether a segment is kept
+            frame_ms: Frame length read from the device
+            ring_seconds: Audio history kept in the ring buffer
+            pre_roll_ms: Audio kept before the detected speech start
+            start_ms: Continuous speech needed to open an utterance
+            end_silence_ms: Silence that closes an utterance
+            max_utterance_s: Utterances are cut at this length
+            max_segments: Queue bound; the oldest segment is dropped when full
+        """
+        self.source = source
+        self.vad = vad
+        self.noise = noise
+        self.frame_ms = frame_ms
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000 // frame_ms)
+        ring_frames = max(int(ring_seconds * 1000 // frame_ms),
+                          self.max_frames + self.pre_roll_frames + 1)
+        
+        self.ring = RingBuffer(ring_frames)
+        self.segments = queue.Queue(maxsize=max_segments)
+        self.sample_rate = None
+        self.sample_width = None
+        
+        self.frames_read = 0
+        self.segments_emitted = 0
+        self.segments_dropped = 0
+        self.segments_gated = 0
+        
+        self.gate = gate
+        self.listeners = [gate] if gate is not None else []
+        
+        self._running = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Open the input stream and start capturing (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=2.0):
+        """Stop capturing and close the input stream"""
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def add_listener(self, listener):
+        """
+        Stream utterances to a listener as they are spoken
+        
+        The listener gets speech_started(audio, sample_rate, sample_width)
+        with the pre-roll and opening frames, speech_frame(frame) for each
+        later frame, and speech_ended() when the segment is cut. Callbacks
+        run on the capture thread and must not block.
+        """
+        self.listeners.append(listener)
+    
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def wait(self, timeout=None):
+        """Block until capture ends (e.g. a file source is exhausted)"""
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def clear(self):
+        """Discard utterances captured but not yet consumed"""
+        while True:
+            try:
+                self.segments.get_nowait()
+            except queue.Empty:
+                return
+    
+    def get_segment(self, timeout=None):
+        """
+        Next completed utterance
+        
+        Returns:
+            Segment, or None if none arrived within timeout
+        """
+        try:
+            return self.segments.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def stats(self):
+        return {
+            'frames_read': self.frames_read,
+            'segments_emitted': self.segments_emitted,
+            'segments_dropped': self.segments_dropped,
+            'segments_gated': self.segments_gated,
+            'segments_pending': self.segments.qsize(),
+        }
+    
+    def _run(self):
+        try:
+            with self.source as source:
+                self.sample_rate = source.SAMPLE_RATE
+                self.sample_width = source.SAMPLE_WIDTH
+                frame_samples = int(self.sample_rate * self.frame_ms / 1000)
+                self._capture_loop(source.stream, frame_samples)
+        except Exception as e:
+            print(f"[ERROR] Audio capture stopped: {e}")
+        finally:
+            self._running.clear()
+    
+    def _capture_loop(self, stream, frame_samples):
+        """Read frames, track speech state and emit utterances"""
+        frame_bytes = frame_samples * self.sample_width
+        voiced_run = 0
+        silent_run = 0
+        start = None  # absolute frame index where the current utterance begins
+        
+        while self._running.is_set():
+            frame = stream.read(frame_samples)
+            if not frame:
+                break
+            index = self.ring.append(frame)
+            self.frames_read += 1
+            complete = len(frame) == frame_bytes
+            if self.noise and complete:
+                self.noise.update(frame, self.sample_width)
+            # No utterance opens until the first noise estimate (warmup) is in
+            calibrated = self.noise is None or self.noise.floor is not None
+            speech = complete and calibrated and self.vad.is_speech(frame, self.sample_rate, self.sample_width)
+            
+            if start is None:
+                voiced_run = voiced_run + 1 if speech else 0
+                if voiced_run >= self.start_frames:
+                    start = max(index - voiced_run + 1 - self.pre_roll_frames, self.ring.oldest())
+                    silent_run = 0
+                    self._notify('speech_started', self.ring.slice(start, index + 1),
+                                 self.sample_rate, self.sample_width)
+            else:
+                self._notify('speech_frame', frame)
+                silent_run = 0 if speech else silent_run + 1
+                if silent_run >= self.end_frames or index + 1 - start >= self.max_frames:
+                    self._emit(start, index + 1)
+                    start = None
+                    voiced_run = 0
+            
+            if not complete:
+                break  # a finite source ran out
+        
+        if start is not None:
+            self._emit(start, self.ring.end())  # source ended mid-utterance
+    
+    def _notify(self, event, *args):
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(*args)
+            except Exception as e:
+                print(f"[ERROR] Capture listener error: {e}")
+    
+    def _emit(self, start, end):
+        self._notify('speech_ended')
+        if self.gate is not None and not self.gate.passes_utterance():
+            self.segments_gated += 1
+            return
+        audio = Segment(self.ring.slice(start, end), self.sample_rate, self.sample_width,
+                        endpoint_at=time.perf_counter())
+        while True:
+            try:
+                self.segments.put_nowait(audio)
+                break
+            except queue.Full:
+                try:
+                    self.segments.get_nowait()
+                    self.segments_dropped += 1
+                except queue.Empty:
+                    pass
+        self.segments_emitted += 1
@@ -20,6 +20,35 @@ class Config:
     # Speech Recognition
     LANGUAGE = 'en-US'
     SPEECH_TIMEOUT = 10  # seconds
+    STT_SAMPLE_RATE = 16000  # Hz; webrtcvad accepts 8/16/32/48 kHz
+    STT_FRAME_MS = 30  # capture frame length
+    STT_RING_SECONDS = 30  # audio history kept by continuous capture
+    STT_PRE_ROLL_MS = 300  # audio kept before detected speech
+    STT_END_SILENCE_MS = 800  # silence that ends an utterance
+    STT_MAX_UTTERANCE_S = 15
+    STT_GOOGLE_URL = None  # alternative Speech API v2 endpoint, e.g. a local stand-in
+    STT_HEDGE = True  # race Google against the offline recognizer (when its model is present)
+    STT_HEDGE_DEADLINE = 3.0  # seconds to wait for a confident result
+    STT_HEDGE_MIN_CONFIDENCE = 0.6
+    STT_NOISE_ALPHA = 0.05  # EMA weight of each frame's low-percentile energy in the noise floor
+    STT_NOISE_RATIO = 1.5  # energy threshold = noise floor * ratio
+    
+    # Wake word (gates recognition in the main.py loop)
+    WAKE_WORD = 'jarvis'
+    WAKE_WORD_ACCESS_KEY = os.environ.get('PICOVOICE_ACCESS_KEY')  # enables Porcupine; else Vosk
+    WAKE_WORD_SENSITIVITY = 0.5  # Porcupine: higher = fewer misses, more false accepts
+    WAKE_WORD_WINDOW = 5.0  # seconds after a bare "Jarvis" to give the command
+    PIPELINE_MAX_PENDING = 4  # recognized commands waiting for dispatch in main.py
+    
+    # Commands
+    INTENT_MIN_SCORE = 0.58  # fuzzy score needed to act on a misrecognized command
+    INTENT_OVERRIDE_SCORE = 0.65  # ... and to override an exact but shorter match ("open <app>")
+    ACTION_WORKERS = 2  # threads running actions off the GUI thread
+    ACTION_MAX_PENDING = 8  # queued actions beyond this are rejected
+    ACTION_TIMEOUT = 30.0  # seconds before an action is reported timed out
+    ACTION_PLUGIN_PACKAGE = 'plugins'  # modules declaring actions (see registry.py)
+    ACTION_ENTRY_POINT_GROUP = 'jarvis.actions'  # installed packages can add actions here
+    ACTION_WARMUP_DELAY = 2.0  # seconds after startup before heavy plugins are imported
     
     # Browser
     DEFAULT_SEARCH_URL = 'https://www.google.com'
@@ -34,13 +63,53 @@ class Config:
     VOICES_DIR = os.path.join(PROJECT_ROOT, 'voices')
     DEFAULT_VOICE = os.path.join(VOICES_DIR, 'brade_clone.wav')
     
+    # Offline speech recognition (Vosk model directory, used by listen_offline)
+    STT_OFFLINE_MODEL = os.path.join(PROJECT_ROOT, 'models', 'vosk-model-small-en-us-0.15')
+    STT_GRAMMAR_MIN_CONFIDENCE = 0.7  # command-grammar results below this use open vocabulary
+    
     # TTS Settings (Piper - Lightweight)
     TTS_LANGUAGE = 'en'
     TTS_SPEED = 1.0
     TTS_USE_GPU = False  # Piper doesn't need GPU
+    PIPER_MODEL = os.path.join(VOICES_DIR, 'piper', 'en_US-lessac-medium.onnx')
+    
+    # TTS backend health
+    TTS_NETWORK_TIMEOUT = 5.0  # seconds per network synthesis request
+    TTS_BREAKER_FAILURES = 3  # consecutive failures that open a backend's circuit
+    TTS_BREAKER_COOLDOWN = 30.0  # seconds a failing backend is skipped
+    TTS_HEDGE_AFTER = None  # e.g. 1.5: start an offline engine if the primary is slower
+    TTS_HTTP_URL = None  # optional remote server, e.g. 'http://localhost:5000' (piper.http_server)
+    
+    # Audio output (one mixer opened for the whole session)
+    AUDIO_SAMPLE_RATE = 24000
+    AUDIO_BUFFER_SIZE = 512  # samples; smaller = lower latency
+    
+    # Decoded clips in the mixer's canonical format (AUDIO_SAMPLE_RATE, mono,
+    # int16), read back on replay so repeats skip decoding
+    AUDIO_PCM_DIR = os.path.join(PROJECT_ROOT, 'cache', 'pcm')
+    AUDIO_PCM_MAX_MB = 200
+    
+    # Speech cache (rendered clips reused across runs); when disabled,
+    # synthesis never touches the filesystem unless output_file is given
+    TTS_CACHE_ENABLED = True
+    TTS_CACHE_DIR = os.path.join(PROJECT_ROOT, 'cache', 'speech')
+    TTS_CACHE_MAX_MB = 200
+    
+    # Action plugin specs, cached so startup doesn't import every plugin
+    ACTION_MANIFEST = os.path.join(PROJECT_ROOT, 'cache', 'actions_manifest.json')
+    
+    # Launchable applications (XDG .desktop entries and PATH) for "open <app>"
+    APP_INDEX_CACHE = os.path.join(PROJECT_ROOT, 'cache', 'app_index.json')
+    APP_INDEX_REFRESH_INTERVAL = 5.0  # minimum seconds between directory mtime checks
+    APP_MIN_SCORE = 0.5  # fuzzy score needed to launch a misheard app name
+    
+    # Speech queue (serializes speech requests from all threads)
+    TTS_QUEUE_MAX_PENDING = 8
+    TTS_QUEUE_STALE_AFTER = 10.0  # seconds before a queued non-alert is dropped
     
     # Logging
     DEBUG = True
+    METRICS_DUMP_INTERVAL = 60.0  # seconds between latency histogram dumps to LOG_DIR
     
     def __init__(self):
         """Initialize configuration"""
@@ -50,6 +119,7 @@ class Config:
         """Ensure required directories exist"""
         os.makedirs(self.LOG_DIR, exist_ok=True)
         os.makedirs(self.VOICES_DIR, exist_ok=True)
+        os.makedirs(self.TTS_CACHE_DIR, exist_ok=True)
     
     @staticmethod
     def get_config():
@@ -0,0 +1,298 @@
+"""
+Executor Module
+Runs actions off the UI thread on a bounded worker pool, with per-action
+timeouts, cancellation and completion callbacks delivered through a
+caller-supplied dispatcher (e.g. Tk's root.after)
+"""
+
+import time
+import threading
+
+from metrics import Metrics
+
+# Task states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TIMED_OUT = 'timed_out'
+REJECTED = 'rejected'
+
+
+class ActionTask:
+    """Handle for a submitted action"""
+    
+    def __init__(self, name, fn, args, timeout, callback, seq):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.timeout = timeout
+        self.callback = callback
+        self.seq = seq
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted = time.monotonic()
+        self.started = None
+        self.deadline = None
+        self.finished = None
+        self.done = threading.Event()
+        self._executor = None
+        self._replaced = False  # its worker slot went to a new thread on timeout
+    
+    def wait(self, timeout=None):
+        """
+        Block until the task finished, failed, timed out or was cancelled
+        
+        Returns:
+            bool: True if it completed successfully
+        """
+        self.done.wait(timeout)
+        return self.state == DONE
+    
+    def cancel(self):
+        """
+        Cancel the task
+        
+        A queued task never runs. A running one can't be interrupted (it is
+        plain Python on a worker thread): it is reported cancelled now and
+        whatever it returns later is discarded.
+        
+        Returns:
+            bool: False if it had already finished
+        """
+        if self._executor is None:
+            return False
+        return self._executor._cancel(self)
+    
+    @property
+    def elapsed(self):
+        """Seconds the action ran (so far), or None if it never started"""
+        if self.started is None:
+            return None
+        return (self.finished or time.monotonic()) - self.started
+
+
+class ActionExecutor:
+    """
+    Bounded pool of worker threads running actions in submission order
+    
+    Python threads can't be killed, so a timeout finishes the task's
+    handle (state timed_out, callback fired) and hands its worker slot to
+    a replacement thread; the stuck action keeps running to completion on
+    the abandoned thread and its result is dropped. At most `workers`
+    threads may be abandoned at once, after which timed-out actions keep
+    their slot until they return.
+    """
+    
+    def __init__(self, workers=2, max_pending=8, timeout=30.0, dispatcher=None, metrics=None):
+        """
+        Args:
+            workers: Worker threads (started on first submit)
+            max_pending: Queue bound; submits beyond it are rejected
+                rather than blocking the caller (the UI thread)
+            timeout: Default seconds an action may run (None = no limit)
+            dispatcher: Callable(fn) that runs fn on the thread that wants
+                the completion callbacks, e.g. lambda fn: root.after(0, fn);
+                by default callbacks run on the worker thread
+            metrics: Metrics for 'queue_wait' and per-action 'execute'
+                latencies (default: a new 'actions' set)
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.dispatcher = dispatcher
+        self.metrics = metrics or Metrics('actions')
+        
+        self._pending = []
+        self._running = set()
+        self._threads = []
+        self._abandoned = 0
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._watchdog = None
+        self._shutdown = False
+        self._max_depth = 0
+        self._counts = {DONE: 0, FAILED: 0, CANCELLED: 0, TIMED_OUT: 0, REJECTED: 0}
+    
+    def submit(self, fn, *args, name=None, timeout=None, callback=None):
+        """
+        Queue fn(*args) to run on a worker
+        
+        Args:
+            fn: The action
+            name: Label for metrics and logs (default: fn's name)
+            timeout: Seconds this action may run (default: the executor's)
+            callback: Callable(task) invoked through the dispatcher once
+                the task is done, failed, timed out, cancelled or rejected
+        
+        Returns:
+            ActionTask: Handle (already finished if rejected)
+        """
+        name = name or getattr(fn, '__name__', 'action')
+        with self._cond:
+            self._seq += 1
+            task = ActionTask(name, fn, args, self.timeout if timeout is None else timeout, callback, self._seq)
+            if self._shutdown or len(self._pending) >= self.max_pending:
+                task.state = REJECTED
+                rejected = True
+            else:
+                rejected = False
+                task._executor = self
+                self._pending.append(task)
+                self._max_depth = max(self._max_depth, len(self._pending))
+                self._ensure_threads()
+                self._cond.notify_all()
+        if rejected:
+            self._finish(task, REJECTED)
+        return task
+    
+    def cancel_all(self):
+        """Cancel every queued and running task"""
+        with self._cond:
+            tasks = list(self._pending) + list(self._running)
+        for task in tasks:
+            self._cancel(task)
+    
+    def shutdown(self, cancel=True, timeout=2.0):
+        """Stop accepting work, optionally cancel what's left, and let the workers exit"""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if cancel:
+            self.cancel_all()
+        for thread in list(self._threads):
+            thread.join(timeout)
+    
+    def stats(self):
+        """
+        Queue depth, counters and latencies
+        
+        Returns:
+            dict: pending, running, max_pending_seen, abandoned (threads
+            still stuck in timed-out actions), per-state counts, and
+            latency (queue_wait, and execute per action name, in ms)
+        """
+        with self._cond:
+            stats = dict(self._counts, pending=len(self._pending), running=len(self._running),
+                         max_pending_seen=self._max_depth, abandoned=self._abandoned)
+        stats['latency'] = self.metrics.snapshot()
+        return stats
+    
+    def _ensure_threads(self):
+        """Top the pool up to `workers` live threads (caller holds the lock)"""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) - self._abandoned < self.workers:
+            thread = threading.Thread(target=self._run, name=f'jarvis-action-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(target=self._watch, name='jarvis-action-watchdog', daemon=True)
+            self._watchdog.start()
+    
+    def _cancel(self, task):
+        with self._cond:
+            if task.state == QUEUED:
+                self._pending.remove(task)
+            elif task.state == RUNNING:
+                self._running.discard(task)
+            else:
+                return False
+            task.state = CANCELLED
+            self._cond.notify_all()
+        self._finish(task, CANCELLED)
+        return True
+    
+    def _run(self):
+        """Worker loop: run the oldest pending task"""
+        while True:
+            with self._cond:
+                while not self._pending and not self._shutdown:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                task = self._pending.pop(0)
+                task.state = RUNNING
+                task.started = time.monotonic()
+                if task.timeout:
+                    task.deadline = task.started + task.timeout
+                self._running.add(task)
+                self._cond.notify_all()  # wake the watchdog for the new deadline
+            self.metrics.observe('queue_wait', task.started - task.submitted)
+            
+            result = error = None
+            try:
+                result = task.fn(*task.args)
+            except Exception as e:
+                error = e
+            elapsed = time.monotonic() - task.started
+            self.metrics.observe('execute', elapsed, task.name)
+            
+            with self._cond:
+                owned = task.state == RUNNING
+                if owned:
+                    self._running.discard(task)
+                    task.state = FAILED if error is not None else DONE
+                abandoned = task._replaced
+                if abandoned:
+                    # A replacement took this slot; bow out
+                    self._abandoned -= 1
+                    if threading.current_thread() in self._threads:
+                        self._threads.remove(threading.current_thread())
+            if owned:
+                if error is not None:
+                    print(f"[ERROR] Action '{task.name}' failed: {error}")
+                    self._finish(task, FAILED, error=error)
+                else:
+                    self._finish(task, DONE, result=result)
+            if task.state == TIMED_OUT:
+                print(f"[WARNING] Timed-out action '{task.name}' returned after {elapsed:.1f}s")
+            if abandoned:
+                return
+    
+    def _watch(self):
+        """Watchdog: time out running tasks that pass their deadline"""
+        while True:
+            expired = []
+            with self._cond:
+                if self._shutdown and not self._running:
+                    return
+                now = time.monotonic()
+                deadlines = [t.deadline for t in self._running if t.deadline]
+                for task in [t for t in self._running if t.deadline and t.deadline <= now]:
+                    self._running.discard(task)
+                    task.state = TIMED_OUT
+                    if self._abandoned < self.workers:
+                        task._replaced = True
+                        self._abandoned += 1
+                        self._ensure_threads()
+                    expired.append(task)
+                if not expired:
+                    upcoming = [d for d in deadlines if d > now]
+                    self._cond.wait(min(upcoming) - now if upcoming else None)
+            for task in expired:
+                print(f"[WARNING] Action '{task.name}' timed out after {task.timeout:.1f}s")
+                self._finish(task, TIMED_OUT)
+    
+    def _finish(self, task, state, result=None, error=None):
+        """Complete a task whose state was already set under the lock"""
+        task.result = result
+        task.error = error
+        task.finished = time.monotonic()
+        with self._cond:
+            self._counts[state] += 1
+        task.done.set()
+        if task.callback:
+            self._deliver(task)
+    
+    def _deliver(self, task):
+        def run():
+            try:
+                task.callback(task)
+            except Exception as e:
+                print(f"[ERROR] Action callback error: {e}")
+        if self.dispatcher:
+            self.dispatcher(run)
+        else:
+            run()
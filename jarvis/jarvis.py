@@ -10,8 +10,11 @@ import sys
 import os
 from stt import SpeechToText
 from actions import Actions
-from tts import TextToSpeech
+from tts import TextToSpeech, ALERT, RESPONSE, CHATTER
 from config import Config
+from executor import ActionExecutor, DONE, FAILED, TIMED_OUT, REJECTED
+from planner import CommandPlanner, SKIPPED, UNRECOGNIZED
+from phrases import PHRASES
 
 
 class JarvisGUI:
@@ -25,12 +28,22 @@ class JarvisGUI:
         
         # Initialize modules
         self.config = Config()
-        self.stt = SpeechToText()
+        self.stt = SpeechToText(continuous=True)
         self.actions = Actions()
         self.tts = TextToSpeech(
             voice_sample_path=self.config.DEFAULT_VOICE,
             use_gpu=self.config.TTS_USE_GPU
         )
+        self.tts.prerender(PHRASES.values())
+        
+        # Actions run on worker threads; results come back via root.after
+        self.executor = ActionExecutor(
+            workers=self.config.ACTION_WORKERS,
+            max_pending=self.config.ACTION_MAX_PENDING,
+            timeout=self.config.ACTION_TIMEOUT,
+            dispatcher=lambda fn: self.root.after(0, fn)
+        )
+        self.planner = CommandPlanner(self.actions, self.executor)
         
         # State variables
         self.listening = False
@@ -42,6 +55,7 @@ class JarvisGUI:
         
         # Introduce Jarvis with voice
         self.root.after(500, self.introduce_jarvis)
+        self.actions.warm_up()
         
     def setup_styles(self):
         """Setup custom styles for tkinter"""
@@ -184,6 +198,7 @@ class JarvisGUI:
         )
         self.input_entry.pack(fill=tk.X)
         self.input_entry.bind("<Return>", lambda e: self.execute_text_command())
+        self.root.bind("<Escape>", lambda e: self.cancel_actions())
         
         # Button frame
         button_frame = tk.Frame(content_frame, bg="#1e1e2e")
@@ -330,7 +345,7 @@ class JarvisGUI:
     
     def introduce_jarvis(self):
         """Jarvis introduces itself using voice cloning"""
-        introduction = "Hello! I am Jarvis, your personal AI assistant. I am ready to help you with voice commands and laptop control. Click the listen button to get started."
+        introduction = PHRASES['introduction']
         
         self.log_output("[JARVIS] " + introduction)
         self.status_var.set("Introducing myself...")
@@ -349,16 +364,19 @@ class JarvisGUI:
             # Wait for TTS model to be ready
             if not self.tts.is_ready():
                 self.log_output("[TTS] Waiting for voice engine to initialize...")
-                self.tts.wait_for_model(timeout=120)
+            loaded = self.tts.wait_for_model(timeout=120)
+            if loaded and not self.tts.is_ready():
+                self.log_output("[TTS] Piper voice unavailable, using fallback engines")
             
-            if self.tts.is_ready():
+            if loaded:
                 self.status_var.set("Speaking introduction...")
-                self.tts.speak(
-                    text=text,
+                self.tts.say(
+                    text,
+                    priority=RESPONSE,
                     language='en',
                     speed=1.0,
-                    auto_play=True
-                )
+                    stream=True
+                ).wait()
                 self.status_var.set("Ready to listen!")
             else:
                 self.log_output("[WARNING] Voice engine not ready. Running in text mode.")
@@ -367,11 +385,16 @@ class JarvisGUI:
         except Exception as e:
             self.log_output(f"[ERROR] Voice introduction failed: {str(e)}")
             self.status_var.set("Ready (voice unavailable)")
+    
+    def speak_phrase(self, key, priority=CHATTER):
+        """Queue a phrase-bank entry (pre-rendered, so near-instant) without blocking"""
+        self.tts.say(PHRASES[key], priority=priority, timeout=0)
         
     def start_listening(self):
         """Start voice listening in a separate thread"""
         if not self.listening:
             self.listening = True
+            self.tts.stop()  # don't talk over the user
             self.listen_btn.config(state=tk.DISABLED, text="🎤 Listening...", bg="#ff9800")
             self.status_var.set("Listening...")
             self.log_output("[INFO] Listening for voice command...")
@@ -384,7 +407,7 @@ class JarvisGUI:
     def _listen_thread(self):
         """Thread function for listening"""
         try:
-            text = self.stt.listen()
+            text = self.stt.listen(discard_pending=True)
             
             if text:
                 self.input_entry.delete(0, tk.END)
@@ -397,6 +420,7 @@ class JarvisGUI:
             else:
                 self.log_output("[ERROR] Could not recognize speech")
                 self.status_var.set("Speech not recognized")
+                self.speak_phrase('not_understood', RESPONSE)
                 
         except Exception as e:
             self.log_output(f"[ERROR] {str(e)}")
@@ -417,16 +441,59 @@ class JarvisGUI:
             self.log_output(f"[COMMAND] Executing: {command}")
             self.status_var.set(f"Executing: {command[:30]}...")
             
-            try:
-                self.actions.process_command(command)
-                self.log_output(f"[SUCCESS] Command executed")
-                self.status_var.set("Command executed")
-            except Exception as e:
-                self.log_output(f"[ERROR] {str(e)}")
-                self.status_var.set("Error occurred")
+            # Run off the Tk thread so slow actions don't freeze the window;
+            # "X and Y then Z" becomes a plan whose independent steps overlap
+            plan = self.planner.plan(command)
+            if len(plan.steps) > 1:
+                self.log_output(f"[PLAN] {len(plan.steps)} steps: " +
+                                " | ".join(step.command for step in plan.steps))
+            self.planner.run(plan, on_step=self._step_finished, on_done=self._plan_finished)
             
             self.input_entry.delete(0, tk.END)
     
+    def _step_finished(self, step):
+        """Planner callback for each step (on the Tk thread via root.after)"""
+        task = step.task
+        if step.state == DONE:
+            self.log_output(f"[SUCCESS] {step.command} executed ({task.elapsed * 1000:.0f} ms)")
+        elif step.state == FAILED:
+            self.log_output(f"[ERROR] {step.text}: {task.error}")
+        elif step.state == TIMED_OUT:
+            self.log_output(f"[ERROR] '{step.text}' timed out after {task.timeout:.0f}s")
+        elif step.state == REJECTED:
+            self.log_output(f"[WARNING] Too many commands pending, dropped: {step.text}")
+        elif step.state == UNRECOGNIZED:
+            self.log_output(f"[WARNING] Command not recognized: {step.text}")
+        elif step.state == SKIPPED:
+            self.log_output(f"[INFO] Skipped: {step.text}")
+        else:
+            self.log_output(f"[INFO] Cancelled: {step.text}")
+    
+    def _plan_finished(self, plan):
+        """Planner callback once every step has finished"""
+        states = {step.state for step in plan.steps}
+        if plan.succeeded:
+            self.status_var.set("Command executed")
+            self.speak_phrase('done')
+        elif states & {FAILED, TIMED_OUT}:
+            self.status_var.set("Error occurred")
+            self.speak_phrase('error', ALERT)
+        elif UNRECOGNIZED in states:
+            self.status_var.set("Command not recognized")
+            self.speak_phrase('not_understood', RESPONSE)
+        elif REJECTED in states:
+            self.status_var.set("Busy")
+        else:
+            self.status_var.set("Command cancelled")
+        if len(plan.steps) > 1:
+            report = plan.report()
+            self.log_output(f"[PLAN] Done in {report['total_ms']:.0f} ms "
+                            f"(one by one: {report['serial_ms']:.0f} ms)")
+    
+    def cancel_actions(self):
+        """Cancel queued and running commands (Escape)"""
+        self.executor.cancel_all()
+    
     def clear_output(self):
         """Clear output text area"""
         self.output_text.delete(1.0, tk.END)
@@ -436,6 +503,7 @@ class JarvisGUI:
         """Exit the application"""
         if messagebox.askyesno("Exit", "Are you sure you want to exit Jarvis?"):
             self.running = False
+            self.executor.shutdown(timeout=0.5)
             self.root.quit()
 
 
@@ -4,32 +4,52 @@ Entry point for the application
 """
 
 import sys
+import json
+import time
 from stt import SpeechToText
 from actions import Actions
 from config import Config
+from pipeline import ListenPipeline
+from executor import ActionExecutor
+from planner import CommandPlanner
 
 
 def main():
     """Main entry point for Jarvis"""
     config = Config()
-    stt = SpeechToText()
+    stt = SpeechToText(continuous=True, wake_word=True)
     actions = Actions()
+    stt.use_command_grammar(actions.grammar())
+    executor = ActionExecutor(
+        workers=config.ACTION_WORKERS,
+        max_pending=config.ACTION_MAX_PENDING,
+        timeout=config.ACTION_TIMEOUT
+    )
+    planner = CommandPlanner(actions, executor)
     
-    print("🎤 Jarvis initialized. Listening...")
+    # Capture, recognition and dispatch overlap: you can give the next
+    # command while the previous one is still being recognized or run.
+    # Compound commands ("... and ... then ...") run as a plan.
+    pipeline = ListenPipeline(stt, planner.execute, max_pending=config.PIPELINE_MAX_PENDING)
+    pipeline.metrics.start_periodic_dump(config.LOG_DIR, config.METRICS_DUMP_INTERVAL)
+    pipeline.start()
+    actions.warm_up()
+    
+    print(f"🎤 Jarvis initialized. Say '{config.WAKE_WORD}' followed by a command...")
     
     try:
         while True:
-            # Listen for speech input
-            text = stt.listen()
-            
-            if text:
-                print(f"You said: {text}")
-                
-                # Process the command
-                actions.process_command(text)
+            time.sleep(1)
                 
     except KeyboardInterrupt:
         print("\n👋 Jarvis shutting down...")
+        pipeline.stop()
+        executor.shutdown()
+        print(json.dumps(pipeline.stats(), indent=2))
+        print(json.dumps({'actions': executor.stats(), 'plans': planner.stats()}, indent=2))
+        if stt.hedge_stats():
+            print(json.dumps({'recognizers': stt.hedge_stats()}, indent=2))
+        pipeline.metrics.dump(config.LOG_DIR)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
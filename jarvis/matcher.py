@@ -0,0 +1,210 @@
+"""
+Matcher Module
+Compiled multi-pattern phrase matcher (Aho-Corasick over word tokens)
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from collections import deque, namedtuple
+
+Match = namedtuple('Match', ['phrase', 'value', 'start', 'end'])  # token offsets [start, end)
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Lower-cased word tokens; punctuation and spacing are ignored"""
+    return _TOKEN.findall(text.lower())
+
+
+class PhraseMatcher:
+    """
+    Finds registered phrases in text in a single pass
+    
+    Phrases match on whole tokens ("open" does not match "reopen"). When
+    several phrases occur, the longest wins, then the leftmost, so
+    "open browser" beats "open" regardless of registration order. The
+    automaton is compiled lazily after additions, so registering
+    thousands of phrases costs one build.
+    """
+    
+    def __init__(self):
+        self._phrases = {}  # normalized phrase -> (phrase, value)
+        self._compiled = False
+        self._goto = None
+        self._fail = None
+        self._out = None  # node -> phrase key ending here (longest), or None
+        self._dict_link = None  # node -> nearest fail-chain node with an output
+    
+    def __len__(self):
+        return len(self._phrases)
+    
+    def add(self, phrase, value):
+        """Register a phrase (a later add of the same phrase replaces it)"""
+        key = tuple(tokenize(phrase))
+        if not key:
+            raise ValueError(f"empty phrase: {phrase!r}")
+        self._phrases[key] = (phrase, value)
+        self._compiled = False
+    
+    def remove(self, phrase):
+        self._phrases.pop(tuple(tokenize(phrase)), None)
+        self._compiled = False
+    
+    def compile(self):
+        """Build the automaton (done automatically on first match after changes)"""
+        goto = [{}]
+        out = [None]
+        for key in self._phrases:
+            node = 0
+            for token in key:
+                nxt = goto[node].get(token)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][token] = nxt
+                    goto.append({})
+                    out.append(None)
+                node = nxt
+            out[node] = key
+        
+        fail = [0] * len(goto)
+        dict_link = [None] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in goto[node].items():
+                state = fail[node]
+                while state and token not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(token, 0)
+                fail[child] = target if target != child else 0
+                dict_link[child] = fail[child] if out[fail[child]] else dict_link[fail[child]]
+                queue.append(child)
+        
+        self._goto, self._fail, self._out, self._dict_link = goto, fail, out, dict_link
+        self._compiled = True
+    
+    def find_all(self, text):
+        """
+        Every registered phrase occurring in text
+        
+        Returns:
+            list: Match tuples in order of their end position
+        """
+        matches = []
+        for end, key in self._scan(tokenize(text)):
+            phrase, value = self._phrases[key]
+            matches.append(Match(phrase, value, end - len(key), end))
+        return matches
+    
+    def match(self, text):
+        """
+        Longest (then leftmost) phrase occurring in text
+        
+        Returns:
+            Match, or None
+        """
+        best = None
+        for end, key in self._scan(tokenize(text), longest_only=True):
+            start = end - len(key)
+            if best is None or len(key) > best[1] - best[0] or \
+                    (len(key) == best[1] - best[0] and start < best[0]):
+                best = (start, end, key)
+        if best is None:
+            return None
+        phrase, value = self._phrases[best[2]]
+        return Match(phrase, value, best[0], best[1])
+    
+    def _scan(self, tokens, longest_only=False):
+        """Yield (end offset, phrase key) for phrase occurrences"""
+        if not self._compiled:
+            self.compile()
+        goto, fail, out, dict_link = self._goto, self._fail, self._out, self._dict_link
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            # The node's own phrase is the longest one ending here
+            hit = node if out[node] else dict_link[node]
+            while hit:
+                yield i + 1, out[hit]
+                if longest_only:
+                    break
+                hit = dict_link[hit]
+
+
+def _linear_match(commands, text):
+    """The original Actions.process_command scan: first substring hit in dict order"""
+    for command, action in commands.items():
+        if command in text:
+            return command
+    return None
+
+
+def benchmark(sizes=(10, 100, 1000, 5000), queries=2000, seed=7):
+    """
+    Compare the compiled matcher with the linear substring scan
+    
+    Returns:
+        dict: size -> build_ms, linear_us and compiled_us per query
+    """
+    rng = random.Random(seed)
+    verbs = ['open', 'close', 'start', 'stop', 'play', 'show', 'take', 'turn']
+    report = {}
+    for size in sizes:
+        phrases = {f"{rng.choice(verbs)} item{i}": i for i in range(size)}
+        words = [p.split() for p in phrases]
+        texts = []
+        for _ in range(queries):
+            filler = ['please', 'jarvis', 'now', 'the', 'could', 'you']
+            if rng.random() < 0.7:
+                texts.append(' '.join(rng.sample(filler, 3) + rng.choice(words) + rng.sample(filler, 2)))
+            else:
+                texts.append(' '.join(rng.sample(filler, 5)))
+        
+        started = time.perf_counter()
+        matcher = PhraseMatcher()
+        for phrase, value in phrases.items():
+            matcher.add(phrase, value)
+        matcher.compile()
+        build = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        for text in texts:
+            _linear_match(phrases, text)
+        linear = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        for text in texts:
+            matcher.match(text)
+        compiled = time.perf_counter() - started
+        
+        report[size] = {
+            'build_ms': round(build * 1000, 2),
+            'linear_us': round(linear / queries * 1e6, 2),
+            'compiled_us': round(compiled / queries * 1e6, 2),
+        }
+    return report
+
+
+def main(argv=None):
+    """Command line entry point: python -m jarvis.matcher bench"""
+    parser = argparse.ArgumentParser(prog='python -m jarvis.matcher', description='Jarvis command matcher tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    bench = commands.add_parser('bench', help='Compare the compiled matcher with a linear scan')
+    bench.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    bench.add_argument('--queries', type=int, default=2000)
+    
+    args = parser.parse_args(argv)
+    print(json.dumps(benchmark(args.sizes, args.queries), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
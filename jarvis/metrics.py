@@ -0,0 +1,147 @@
+"""
+Metrics Module
+In-process latency histograms per pipeline stage, with periodic JSON dumps
+"""
+
+import os
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (~5% relative error) with exact min/max"""
+    
+    MIN_SECONDS = 1e-4
+    GROWTH = 1.1
+    
+    def __init__(self):
+        self.buckets = {}  # bucket index -> count
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+    
+    def observe(self, seconds):
+        seconds = max(seconds, 0.0)
+        index = 0
+        if seconds > self.MIN_SECONDS:
+            index = int(math.log(seconds / self.MIN_SECONDS, self.GROWTH)) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+    
+    def percentile(self, q):
+        """
+        Approximate q-quantile (0 < q <= 1) in seconds
+        
+        Returns:
+            float: Geometric midpoint of the bucket holding the quantile, or None
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                if index == 0:
+                    return self.min
+                low = self.MIN_SECONDS * self.GROWTH ** (index - 1)
+                value = low * math.sqrt(self.GROWTH)
+                return min(max(value, self.min), self.max)
+        return self.max
+    
+    def summary(self):
+        """Count, mean, p50/p95/p99 and max in milliseconds"""
+        def ms(value):
+            return None if value is None else round(value * 1000, 2)
+        
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total / self.count) if self.count else None,
+            'p50_ms': ms(self.percentile(0.50)),
+            'p95_ms': ms(self.percentile(0.95)),
+            'p99_ms': ms(self.percentile(0.99)),
+            'max_ms': ms(self.max),
+        }
+
+
+class Metrics:
+    """Named set of stage histograms, each optionally split by backend"""
+    
+    def __init__(self, name):
+        self.name = name
+        self._histograms = {}  # (stage, backend) -> LatencyHistogram
+        self._lock = threading.Lock()
+        self._dump_thread = None
+    
+    def observe(self, stage, seconds, backend=None):
+        """Record one latency sample for a stage"""
+        with self._lock:
+            histogram = self._histograms.get((stage, backend))
+            if histogram is None:
+                histogram = self._histograms[(stage, backend)] = LatencyHistogram()
+            histogram.observe(seconds)
+    
+    @contextmanager
+    def timer(self, stage, backend=None):
+        """Time the enclosed block into a stage histogram"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, backend)
+    
+    def snapshot(self):
+        """
+        Current summaries
+        
+        Returns:
+            dict: stage -> backend (or 'all') -> count/mean/p50/p95/p99/max in ms
+        """
+        with self._lock:
+            items = [(key, h.summary()) for key, h in self._histograms.items()]
+        result = {}
+        for (stage, backend), summary in sorted(items, key=lambda item: (item[0][0], str(item[0][1]))):
+            result.setdefault(stage, {})[backend or 'all'] = summary
+        return result
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+    
+    def dump(self, directory):
+        """
+        Write the snapshot to <directory>/<name>_metrics.json
+        
+        Returns:
+            str: Path written
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.name}_metrics.json")
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'updated': time.time(), 'stages': self.snapshot()}, f, indent=2)
+        os.replace(tmp, path)
+        return path
+    
+    def start_periodic_dump(self, directory, interval=60.0):
+        """Dump to directory every interval seconds from a daemon thread (idempotent)"""
+        if self._dump_thread is not None or not directory or not interval:
+            return
+        
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump(directory)
+                except OSError as e:
+                    print(f"[WARNING] Metrics dump failed: {e}")
+        
+        self._dump_thread = threading.Thread(target=run, daemon=True)
+        self._dump_thread.start()
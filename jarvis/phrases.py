@@ -0,0 +1,16 @@
+"""
+Phrase Bank
+Fixed phrases Jarvis speaks on every run; pre-rendered into the speech
+cache at startup so they play without waiting on synthesis
+"""
+
+PHRASES = {
+    'introduction': (
+        "Hello! I am Jarvis, your personal AI assistant. I am ready to help you "
+        "with voice commands and laptop control. Click the listen button to get started."
+    ),
+    'ready': "Ready to listen.",
+    'done': "Done.",
+    'not_understood': "Sorry, I didn't catch that.",
+    'error': "Sorry, something went wrong.",
+}
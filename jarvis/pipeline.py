@@ -0,0 +1,130 @@
+"""
+Pipeline Module
+Overlapped capture -> recognition -> dispatch stages joined by bounded
+queues, so the microphone keeps listening while earlier commands are
+still being recognized or executed
+"""
+
+import time
+import queue
+import threading
+
+from metrics import Metrics
+
+
+class ListenPipeline:
+    """
+    Three-stage command loop
+    
+    Capture is SpeechToText's continuous AudioCapture thread (its bounded
+    segment queue is the first stage queue). A recognition worker turns
+    segments into text and a dispatch worker runs the commands, each
+    with its own bounded queue, so a slow action never makes Jarvis deaf.
+    """
+    
+    def __init__(self, stt, dispatch, max_pending=4, metrics=None):
+        """
+        Args:
+            stt: SpeechToText running in continuous mode
+            dispatch: Callable(text) executing a command (e.g. Actions.process_command)
+            max_pending: Bound of the recognized-command queue; when full,
+                recognition waits and capture drops its oldest segment
+            metrics: Metrics for stage latencies (default: a new 'pipeline' set)
+        """
+        self.stt = stt
+        self.dispatch = dispatch
+        self.metrics = metrics or Metrics('pipeline')
+        self.commands = queue.Queue(maxsize=max_pending)
+        
+        self.recognized = 0
+        self.dispatched = 0
+        self.max_depth = {'segments': 0, 'commands': 0}
+        
+        self._running = threading.Event()
+        self._workers = []
+    
+    def start(self):
+        """Start capture and both workers (idempotent)"""
+        if self._running.is_set():
+            return
+        self.stt.start_continuous()
+        self._running.set()
+        self._workers = [
+            threading.Thread(target=self._recognize_loop, name='jarvis-recognize', daemon=True),
+            threading.Thread(target=self._dispatch_loop, name='jarvis-dispatch', daemon=True),
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    def stop(self, timeout=2.0):
+        """Stop the workers and close the input stream"""
+        self._running.clear()
+        for worker in self._workers:
+            worker.join(timeout)
+        self.stt.stop_continuous()
+    
+    def stats(self):
+        """
+        Queue depths and stage latencies
+        
+        Returns:
+            dict: depth (current per stage queue), max_depth, recognized,
+            dispatched, and latency (stage -> p50/p95/p99 summary in ms):
+            capture_wait (endpoint to recognition start), recognize,
+            dispatch_wait, dispatch, end_to_end (endpoint to action done)
+        """
+        return {
+            'depth': {
+                'segments': self.stt.capture.segments.qsize() if self.stt.capture else 0,
+                'commands': self.commands.qsize(),
+            },
+            'max_depth': dict(self.max_depth),
+            'recognized': self.recognized,
+            'dispatched': self.dispatched,
+            'latency': self.metrics.snapshot(),
+        }
+    
+    def _track_depth(self, stage, depth):
+        if depth > self.max_depth[stage]:
+            self.max_depth[stage] = depth
+    
+    def _recognize_loop(self):
+        capture = self.stt.capture
+        while self._running.is_set():
+            audio = capture.get_segment(timeout=0.5)
+            if audio is None:
+                continue
+            self._track_depth('segments', capture.segments.qsize() + 1)
+            endpoint = getattr(audio, 'endpoint_at', None) or time.perf_counter()
+            self.metrics.observe('capture_wait', time.perf_counter() - endpoint)
+            
+            with self.metrics.timer('recognize'):
+                text = self.stt.recognize(audio)
+            if not text:
+                continue
+            self.recognized += 1
+            
+            item = (text, endpoint, time.perf_counter())
+            while self._running.is_set():
+                try:
+                    self.commands.put(item, timeout=0.5)
+                    self._track_depth('commands', self.commands.qsize())
+                    break
+                except queue.Full:
+                    continue
+    
+    def _dispatch_loop(self):
+        while self._running.is_set():
+            try:
+                text, endpoint, queued = self.commands.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.metrics.observe('dispatch_wait', time.perf_counter() - queued)
+            print(f"You said: {text}")
+            try:
+                with self.metrics.timer('dispatch'):
+                    self.dispatch(text)
+            except Exception as e:
+                print(f"[ERROR] Command failed: {e}")
+            self.dispatched += 1
+            self.metrics.observe('end_to_end', time.perf_counter() - endpoint)
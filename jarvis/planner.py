@@ -0,0 +1,288 @@
+"""
+Planner Module
+Splits compound commands ("open browser and take a screenshot then turn
+the volume up") into an ordered plan of steps with dependencies, and
+runs independent steps concurrently on the ActionExecutor
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import Metrics
+from executor import QUEUED, DONE
+
+# Separators between steps: "then" orders, "and" doesn't
+_SEPARATOR = re.compile(r"\s*(?:\b(and then|after that|then|and|also)\b|[,;])\s*", re.IGNORECASE)
+_SEQUENTIAL = {'then', 'and then', 'after that'}
+
+# Step states: PLANNED, QUEUED once submitted, then the task's final state
+# (executor.DONE, FAILED, ...), UNRECOGNIZED or SKIPPED
+PLANNED = 'planned'
+UNRECOGNIZED = 'unrecognized'  # ran, but process_command matched no command
+SKIPPED = 'skipped'  # a step it depends on did not succeed
+
+
+class PlanStep:
+    """One action of a plan"""
+    
+    def __init__(self, index, text, command, depends_on):
+        self.index = index
+        self.text = text
+        self.command = command  # None: unrecognized (reported by process_command)
+        self.depends_on = sorted(depends_on)
+        self.state = PLANNED
+        self.task = None
+
+
+class Plan:
+    """Steps of one utterance and their progress"""
+    
+    def __init__(self, text, steps):
+        self.text = text
+        self.steps = steps
+        self.started = None  # time.monotonic(), the clock of ActionTask.started
+        self.finished = None
+        self.done = threading.Event()
+    
+    def wait(self, timeout=None):
+        """
+        Block until every step finished or was skipped
+        
+        Returns:
+            bool: True if all steps succeeded
+        """
+        self.done.wait(timeout)
+        return self.succeeded
+    
+    @property
+    def succeeded(self):
+        return self.done.is_set() and all(step.state == DONE for step in self.steps)
+    
+    def report(self):
+        """
+        Latency report
+        
+        Returns:
+            dict: text, total_ms (first submit to last step done),
+            serial_ms (sum of step run times, i.e. one-by-one cost),
+            and per step its command, dependencies, state, and start/run
+            times in ms (start relative to the plan's)
+        """
+        steps = []
+        serial = 0.0
+        for step in self.steps:
+            task = step.task
+            entry = {'command': step.command, 'text': step.text,
+                     'depends_on': step.depends_on, 'state': step.state}
+            if task is not None and task.started is not None:
+                run = task.elapsed
+                serial += run
+                entry['start_ms'] = round((task.started - self.started) * 1000, 1)
+                entry['run_ms'] = round(run * 1000, 1)
+            steps.append(entry)
+        total = (self.finished - self.started) if self.finished and self.started else None
+        return {
+            'text': self.text,
+            'total_ms': None if total is None else round(total * 1000, 1),
+            'serial_ms': round(serial * 1000, 1),
+            'steps': steps,
+        }
+
+
+class CommandPlanner:
+    """
+    Turns utterances into plans and runs them on an ActionExecutor
+    
+    Splitting happens at "and", "then", "after that", "also", commas and
+    semicolons. A step after "then" depends on every step before it; steps
+    joined by "and" are independent and run concurrently. A step also
+    waits for an earlier step with the same command (two volume changes
+    shouldn't race), and exclusive commands (Actions.exclusive, e.g.
+    shutdown) wait for every earlier step. A part that doesn't resolve to
+    a command stays attached to the step before it ("open browser and
+    google" is one step).
+    """
+    
+    def __init__(self, actions, executor, metrics=None):
+        """
+        Args:
+            actions: Actions (resolves steps and runs them)
+            executor: ActionExecutor running the steps
+            metrics: Metrics for per-plan 'plan' latency (default: a new 'plans' set)
+        """
+        self.actions = actions
+        self.executor = executor
+        self.metrics = metrics or Metrics('plans')
+    
+    def plan(self, text):
+        """
+        Split text into steps
+        
+        Returns:
+            Plan: Steps in utterance order, not yet running
+        """
+        spans = []  # (start, end, sequential) of each non-empty part
+        sequential = False
+        last = 0
+        for separator in list(_SEPARATOR.finditer(text)) + [None]:
+            end = separator.start() if separator else len(text)
+            if text[last:end].strip():
+                spans.append((last, end, sequential))
+                sequential = False
+            if separator:
+                sequential = sequential or (separator.group(1) or '').lower() in _SEQUENTIAL
+                last = separator.end()
+        
+        # A part that isn't a command on its own continues its neighbour
+        # ("open browser and google"), rather than being a step
+        parts = []  # [start, end, sequential, command]
+        orphan = None
+        for start, end, seq in spans:
+            command = self.actions.resolve(text[start:end])[0]
+            if command is None:
+                if parts:
+                    parts[-1][1] = end
+                elif orphan is None:
+                    orphan = (start, seq)
+                continue
+            if orphan is not None:
+                start, seq = orphan
+                orphan = None
+            parts.append([start, end, seq, command])
+        if len(parts) < 2:
+            return Plan(text, [PlanStep(0, text.strip(), self.actions.resolve(text)[0], [])])
+        
+        steps = []
+        barrier = []  # every step before the latest "then"
+        for index, (start, end, seq, command) in enumerate(parts):
+            if seq:
+                barrier = list(range(index))
+            depends_on = set(barrier)
+            if command in self.actions.exclusive:
+                depends_on.update(range(index))
+            for earlier in steps:
+                if earlier.command == command or earlier.command in self.actions.exclusive:
+                    depends_on.add(earlier.index)
+            steps.append(PlanStep(index, text[start:end].strip(), command, depends_on))
+        return Plan(text, steps)
+    
+    def run(self, plan, on_step=None, on_done=None):
+        """
+        Submit a plan's steps as their dependencies complete
+        
+        Args:
+            plan: Plan from plan()
+            on_step: Callable(step) after each step finishes or is skipped
+            on_done: Callable(plan) once all steps have
+        
+        Returns:
+            Plan: The same plan (wait() on it to block)
+        """
+        lock = threading.Lock()
+        
+        def settle():
+            """Queue steps whose dependencies succeeded, skip those with a failed one"""
+            runnable, skipped = [], []
+            for step in plan.steps:
+                if step.state != PLANNED:
+                    continue
+                states = [plan.steps[i].state for i in step.depends_on]
+                if any(state not in (PLANNED, QUEUED, DONE) for state in states):
+                    step.state = SKIPPED
+                    skipped.append(step)
+                elif all(state == DONE for state in states):
+                    step.state = QUEUED
+                    runnable.append(step)
+            return runnable, skipped
+        
+        def advance(runnable, skipped):
+            for step in skipped:
+                report(step)
+            for step in runnable:
+                # process_command re-resolves the part, keeping its fuzzy-match
+                # notice and unrecognized-command log
+                step.task = self.executor.submit(
+                    self.actions.process_command, step.text, name=step.command or 'unrecognized',
+                    timeout=self.actions.timeouts.get(step.command),
+                    callback=lambda task, step=step: finished(step, task)
+                )
+        
+        def finished(step, task):
+            with lock:
+                step.task = task  # may not be assigned yet if it finished fast
+                # process_command returns None when nothing matched
+                step.state = UNRECOGNIZED if task.state == DONE and task.result is None else task.state
+                settled = settle()
+            report(step)
+            advance(*settled)
+        
+        def report(step):
+            if on_step:
+                try:
+                    on_step(step)
+                except Exception as e:
+                    print(f"[ERROR] Plan step callback error: {e}")
+            with lock:
+                complete = not plan.done.is_set() and \
+                    all(s.state not in (PLANNED, QUEUED) for s in plan.steps)
+                if complete:
+                    plan.finished = time.monotonic()
+                    plan.done.set()
+            if complete:
+                self.metrics.observe('plan', plan.finished - plan.started)
+                if on_done:
+                    try:
+                        on_done(plan)
+                    except Exception as e:
+                        print(f"[ERROR] Plan callback error: {e}")
+        
+        plan.started = time.monotonic()
+        with lock:
+            settled = settle()
+        advance(*settled)
+        return plan
+    
+    def execute(self, text, timeout=None):
+        """
+        Plan and run text, blocking until it is done (for the voice loop)
+        
+        Returns:
+            Plan: The finished plan
+        """
+        plan = self.run(self.plan(text))
+        plan.wait(timeout)
+        if len(plan.steps) > 1:
+            print(json.dumps({'plan': plan.report()}))
+        return plan
+    
+    def stats(self):
+        """Plan latency summary (see Metrics.snapshot)"""
+        return self.metrics.snapshot()
+
+
+def main(argv=None):
+    """Command line entry point: python -m jarvis.planner plan "<utterance>" """
+    parser = argparse.ArgumentParser(prog='python -m jarvis.planner', description='Jarvis command planner tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    show = commands.add_parser('plan', help='Show the plan for an utterance without running it')
+    show.add_argument('text')
+    
+    args = parser.parse_args(argv)
+    from actions import Actions
+    plan = CommandPlanner(Actions(), executor=None).plan(args.text)
+    print(json.dumps([{'command': s.command, 'text': s.text, 'depends_on': s.depends_on}
+                      for s in plan.steps], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Audio Playback Module
+Long-lived playback service: one open output device and an utterance queue
+
+Clips are decoded once into the mixer's canonical PCM format (fixed
+sample rate, mono, int16) and kept in an on-disk store of raw .pcm
+files. A replay reads the file and copies the samples into a mixer
+Sound (pygame makes its own copy of the buffer), so repeat playback
+never decodes, but it is not zero-copy.
+"""
+
+import io
+import os
+import time
+import queue
+import threading
+
+from speech_cache import SpeechCache
+
+
+class Utterance:
+    """Handle for a queued clip; callers wait on it instead of polling the mixer"""
+    
+    def __init__(self, source, on_done=None, generation=0, key=None):
+        self.source = source
+        self.on_done = on_done
+        self.generation = generation
+        self.key = key
+        self.cancelled = False
+        self.done = threading.Event()
+        # Timing (perf_counter): filled in by the player for instrumentation
+        self.decode_seconds = None
+        self.started_at = None
+        self.finished_at = None
+    
+    def wait(self, timeout=None):
+        """
+        Block until the clip finished playing or was cancelled
+        
+        Returns:
+            bool: True if the clip played to the end
+        """
+        self.done.wait(timeout)
+        return self.done.is_set() and not self.cancelled
+    
+    def _finish(self, cancelled=False):
+        self.cancelled = cancelled
+        self.done.set()
+        if self.on_done:
+            try:
+                self.on_done(self)
+            except Exception as e:
+                print(f"[ERROR] Playback callback error: {e}")
+
+
+class AudioPlayer:
+    """Plays queued clips on a single pygame mixer channel from a worker thread"""
+    
+    def __init__(self, frequency=24000, channels=1, buffer=512,
+                 pcm_dir=None, pcm_max_bytes=200 * 1024 * 1024):
+        """
+        Initialize the player (the output device opens on first use)
+        
+        Args:
+            frequency: Mixer sample rate (the canonical PCM rate)
+            channels: Mixer channel count
+            buffer: Mixer buffer size in samples (smaller = lower latency)
+            pcm_dir: Root of the decoded-PCM store (None disables it)
+            pcm_max_bytes: Size budget of the PCM store
+        """
+        self.frequency = frequency
+        self.channels = channels
+        self.buffer = buffer
+        self.pcm_dir = pcm_dir
+        self.pcm_max_bytes = pcm_max_bytes
+        self.pcm_store = None
+        self.decodes = 0
+        self.pcm_plays = 0
+        
+        self._queue = queue.Queue()
+        self._interrupt = threading.Event()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._channel = None
+        self._current = None
+        self._generation = 0  # bumped by stop() to invalidate queued clips
+    
+    def start(self):
+        """Open the output device and start the playback thread (idempotent)"""
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            import pygame
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(
+                    frequency=self.frequency,
+                    size=-16,
+                    channels=self.channels,
+                    buffer=self.buffer
+                )
+            # Stored PCM is only valid for the format the device really opened with
+            self.frequency, size, self.channels = pygame.mixer.get_init()
+            if self.pcm_dir and self.pcm_store is None:
+                self.pcm_store = SpeechCache(
+                    os.path.join(self.pcm_dir, f"{self.frequency}hz_{self.channels}ch_s{abs(size)}"),
+                    max_bytes=self.pcm_max_bytes
+                )
+            self._channel = pygame.mixer.Channel(0)
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+    
+    def enqueue(self, source, on_done=None, key=None):
+        """
+        Queue a clip for playback without blocking
+        
+        Args:
+            source: Audio file path, or encoded audio bytes (MP3/WAV) decoded in memory
+            on_done: Optional callback(utterance) run when the clip ends or is cancelled
+            key: Stable clip id (e.g. the speech cache key); keyed clips are
+                decoded once and replayed from the PCM store
+        
+        Returns:
+            Utterance: Handle to wait on
+        """
+        self.start()
+        with self._lock:
+            utterance = Utterance(source, on_done, self._generation, key)
+            self._queue.put(utterance)
+        return utterance
+    
+    def play(self, source, blocking=True, key=None):
+        """Queue a clip and optionally wait for it to finish"""
+        utterance = self.enqueue(source, key=key)
+        if blocking:
+            utterance.wait()
+        return utterance
+    
+    def preload(self, source, key):
+        """
+        Decode a clip into the PCM store without playing it
+        
+        Returns:
+            bool: True if the clip is now stored as canonical PCM
+        """
+        self.start()
+        if self.pcm_store is None:
+            return False
+        if not self.pcm_store.contains(key):
+            sound, decoded = self._load_sound(source, key)
+            if decoded:
+                self._store(key, sound)
+        return self.pcm_store.contains(key)
+    
+    def stats(self):
+        """Decode counters: decodes (codec work) vs pcm_plays (zero-decode replays)"""
+        stats = {'decodes': self.decodes, 'pcm_plays': self.pcm_plays}
+        if self.pcm_store:
+            stats['pcm_store'] = self.pcm_store.stats()
+        return stats
+    
+    def _load_sound(self, source, key=None):
+        """
+        Build a mixer Sound, from the PCM store when possible
+        
+        Otherwise the clip is decoded (and resampled to the mixer format)
+        by SDL; the caller writes it to the store with _store().
+        
+        Returns:
+            tuple: (Sound, or None if the source is missing; True if it was decoded)
+        """
+        import pygame
+        
+        if key and self.pcm_store:
+            path = self.pcm_store.get(key)
+            if path and os.path.getsize(path):
+                with open(path, 'rb') as f:
+                    pcm = f.read()
+                self.pcm_plays += 1
+                return pygame.mixer.Sound(buffer=pcm), False
+        
+        if isinstance(source, (bytes, bytearray)):
+            sound = pygame.mixer.Sound(file=io.BytesIO(source))
+        elif os.path.exists(source):
+            sound = pygame.mixer.Sound(source)
+        else:
+            return None, False
+        self.decodes += 1
+        return sound, True
+    
+    def _store(self, key, sound):
+        """Write a decoded clip's raw samples to the PCM store"""
+        if not key or self.pcm_store is None:
+            return
+        try:
+            self.pcm_store.put(key, sound.get_raw(), '.pcm')
+        except Exception as e:
+            print(f"[WARNING] Could not store decoded clip: {e}")
+    
+    def stop(self):
+        """Stop the current clip immediately and drop everything queued"""
+        with self._lock:
+            self._generation += 1
+            self._interrupt.set()
+            if self._channel is not None:
+                self._channel.stop()
+        while True:
+            try:
+                self._queue.get_nowait()._finish(cancelled=True)
+            except queue.Empty:
+                break
+    
+    def is_busy(self):
+        """True while a clip is playing or waiting in the queue"""
+        return self._current is not None or not self._queue.empty()
+    
+    def _run(self):
+        """Worker loop: play queued clips back to back"""
+        while True:
+            utterance = self._queue.get()
+            self._current = utterance
+            self._interrupt.clear()
+            cancelled = False
+            try:
+                if utterance.generation != self._generation:
+                    cancelled = True
+                    continue
+                loading = time.perf_counter()
+                sound, decoded = self._load_sound(utterance.source, utterance.key)
+                utterance.decode_seconds = time.perf_counter() - loading
+                if sound is None:
+                    print(f"[ERROR] Audio file not found: {utterance.source}")
+                    cancelled = True
+                    continue
+                
+                self._channel.play(sound)
+                utterance.started_at = time.perf_counter()
+                if decoded:
+                    # Off the time-to-first-audio path: the clip is already playing
+                    self._store(utterance.key, sound)
+                
+                # Sleep for the rest of the clip; stop() wakes us immediately.
+                # The short tail wait covers the mixer's final buffer.
+                remaining = max(0.0, sound.get_length() - (time.perf_counter() - utterance.started_at))
+                while not self._interrupt.wait(remaining):
+                    if not self._channel.get_busy():
+                        break
+                    remaining = self.buffer / self.frequency
+                
+                cancelled = utterance.generation != self._generation
+                if cancelled:
+                    self._channel.stop()
+            except Exception as e:
+                print(f"[ERROR] Playback error: {e}")
+                cancelled = True
+            finally:
+                self._current = None
+                utterance.finished_at = time.perf_counter()
+                utterance._finish(cancelled)
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def get_player():
+    """Shared process-wide player so the output device is opened only once"""
+    global _player
+    with _player_lock:
+        if _player is None:
+            try:
+                from config import Config
+                config = Config()
+                _player = AudioPlayer(
+                    frequency=config.AUDIO_SAMPLE_RATE,
+                    buffer=config.AUDIO_BUFFER_SIZE,
+                    pcm_dir=config.AUDIO_PCM_DIR if config.TTS_CACHE_ENABLED else None,
+                    pcm_max_bytes=config.AUDIO_PCM_MAX_MB * 1024 * 1024
+                )
+            except (ImportError, AttributeError):
+                _player = AudioPlayer()
+        return _player
@@ -0,0 +1,5 @@
+"""
+Action Plugins
+Each module declares actions with registry.action; they are discovered by
+ActionRegistry and imported on first use
+"""
@@ -0,0 +1,58 @@
+"""
+Application Actions
+Browser, applications and music
+"""
+
+import webbrowser
+
+from registry import action
+from matcher import tokenize
+
+
+@action('open browser', ['open the browser', 'open browser google'], timeout=15.0)
+def open_browser(actions, text):
+    """Open web browser"""
+    url = actions.config.DEFAULT_SEARCH_URL
+    if 'google' in text:
+        webbrowser.open('https://www.google.com')
+    else:
+        webbrowser.open(url)
+    print("🌐 Opening browser...")
+
+
+@action('play music', ['play music please'])
+def play_music(actions, text):
+    """Play music"""
+    print("🎵 Playing music...")
+    # Implementation depends on media player
+
+
+# Words around an app name that aren't part of it ("open the calculator app please")
+_FILLER = {'the', 'a', 'an', 'my', 'app', 'application', 'program', 'please', 'up', 'for', 'me', 'now'}
+
+
+# Names the grammar and fuzzy matcher know for "open {app}"; anything in
+# the app index can still be opened when recognized as free text
+APP_NAMES = ['firefox', 'chrome', 'terminal', 'calculator', 'files', 'settings', 'spotify', 'code']
+
+
+@action('open', ['open {app}'], requires=['app_index'], slots={'app': APP_NAMES})
+def open_application(actions, text):
+    """Open an application found in the app index"""
+    from app_index import launch
+    
+    tokens = tokenize(text)
+    if 'open' in tokens:
+        tokens = tokens[len(tokens) - tokens[::-1].index('open'):]  # after the last "open"
+    tokens = [t for t in tokens if t not in _FILLER and t != actions.config.WAKE_WORD]
+    if not tokens:
+        print("Which application should I open?")
+        return
+    
+    spoken = ' '.join(tokens)
+    entry = actions.apps.find(spoken)
+    if entry is None:
+        print(f"Application not found: {spoken}")
+        return
+    print(f"🚀 Opening {entry.name}...")
+    launch(entry)
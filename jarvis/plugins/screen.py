@@ -0,0 +1,16 @@
+"""
+Screen Actions
+"""
+
+import os
+
+from registry import action, HEAVY
+
+
+@action('screenshot', ['take a screenshot', 'take screenshot'],
+        requires=['pyautogui'], cost=HEAVY, timeout=10.0)
+def take_screenshot(actions, text):
+    """Take a screenshot"""
+    import pyautogui  # imported by the registry before the first call
+    pyautogui.screenshot(f'screenshot_{os.getpid()}.png')
+    print("📸 Screenshot taken")
@@ -0,0 +1,34 @@
+"""
+System Actions
+Power and volume
+"""
+
+import os
+
+from registry import action
+
+
+@action('shutdown', timeout=10.0, min_score=0.85, exclusive=True)
+def shutdown(actions, text):
+    """Shutdown the system"""
+    print("⏻️  Shutting down system in 30 seconds...")
+    if os.name == 'nt':
+        os.system('shutdown /s /t 30')
+    else:
+        os.system('shutdown -h +1')
+
+
+@action('restart', timeout=10.0, min_score=0.85, exclusive=True)
+def restart(actions, text):
+    """Restart the system"""
+    print("🔄 Restarting system...")
+    if os.name == 'nt':
+        os.system('shutdown /r /t 30')
+    else:
+        os.system('shutdown -r +1')
+
+
+@action('volume', ['volume up', 'volume down', 'turn the volume up', 'turn the volume down'])
+def control_volume(actions, text):
+    """Control system volume"""
+    print("🔊 Adjusting volume...")
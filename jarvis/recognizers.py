@@ -0,0 +1,552 @@
+"""
+Recognizers Module
+Pluggable speech recognition backends, including streaming local
+recognizers that decode audio while the user is still speaking
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# text is lower-cased; confidence is 0..1 (None when the engine gives none)
+RecognitionResult = namedtuple('RecognitionResult', ['text', 'confidence', 'backend'])
+
+
+class STTBackend:
+    """A speech recognition engine"""
+    
+    name = None
+    offline = True  # no network round trip
+    streaming = False  # supports session() for frame-by-frame decoding
+    
+    def is_available(self):
+        """False while the engine cannot be used at all (e.g. model not loaded)"""
+        return True
+    
+    def recognize(self, audio):
+        """
+        Recognize a complete utterance
+        
+        Args:
+            audio: sr.AudioData
+        
+        Returns:
+            RecognitionResult, or None if nothing was recognized
+        """
+        if not self.streaming:
+            raise NotImplementedError
+        session = self.session(audio.sample_rate)
+        data = audio.get_raw_data(convert_width=2)
+        step = audio.sample_rate // 10 * 2  # 100 ms of int16
+        for offset in range(0, len(data), step):
+            session.accept(data[offset:offset + step])
+        return session.finish()
+    
+    def session(self, sample_rate):
+        """
+        Start decoding one utterance
+        
+        Returns:
+            Object with accept(frame) -> partial text or None (int16 mono
+            PCM frames, in order) and finish() -> RecognitionResult or None
+        """
+        raise NotImplementedError
+
+
+class GoogleBackend(STTBackend):
+    """
+    Google Speech API v2 (the endpoint behind recognize_google)
+    
+    With a url, requests go to that server instead, speaking the same
+    wire protocol; this is how benchmarks run against a local stand-in.
+    """
+    
+    name = 'google'
+    offline = False
+    
+    def __init__(self, recognizer, language='en-US', url=None, key=None):
+        """
+        Args:
+            recognizer: sr.Recognizer (its operation_timeout bounds requests)
+            language: Recognition language
+            url: Alternative endpoint, e.g. 'http://127.0.0.1:8765/recognize'
+            key: API key (None = the library's default key)
+        """
+        self.recognizer = recognizer
+        self.language = language
+        self.url = url
+        self.key = key
+    
+    def recognize(self, audio):
+        if self.url is None:
+            result = self.recognizer.recognize_google(audio, key=self.key, language=self.language, show_all=True)
+        else:
+            result = self._request(audio)
+        alternatives = result.get('alternative') if isinstance(result, dict) else None
+        if not alternatives:
+            return None
+        best = alternatives[0]
+        return RecognitionResult(best['transcript'].lower(), best.get('confidence'), self.name)
+    
+    def _request(self, audio):
+        """POST FLAC to the custom url the way recognize_google does"""
+        import speech_recognition as sr
+        
+        rate = audio.sample_rate if audio.sample_rate >= 8000 else 8000
+        flac = audio.get_flac_data(convert_rate=rate, convert_width=2)
+        params = {'client': 'chromium', 'lang': self.language}
+        if self.key:
+            params['key'] = self.key
+        query = urllib.parse.urlencode(params)
+        request = urllib.request.Request(
+            f"{self.url}?{query}", data=flac,
+            headers={'Content-Type': f'audio/x-flac; rate={rate}'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.recognizer.operation_timeout) as response:
+                body = response.read().decode('utf-8')
+        except (urllib.error.URLError, OSError) as e:
+            raise sr.RequestError(f"recognition connection failed: {e}")
+        
+        # One JSON object per line; the first is usually an empty result
+        for line in body.split('\n'):
+            if line:
+                results = json.loads(line).get('result')
+                if results:
+                    return results[0]
+        return []
+
+
+class VoskBackend(STTBackend):
+    """Vosk/Kaldi model kept resident in-process, decoding frames as they arrive"""
+    
+    name = 'vosk'
+    streaming = True
+    
+    def __init__(self, model_path, grammar=None, shared=None, name='vosk'):
+        """
+        Args:
+            model_path: Unpacked Vosk model directory (e.g. vosk-model-small-en-us-0.15)
+            grammar: Optional list of phrases restricting the vocabulary
+            shared: Another VoskBackend whose model is reused instead of
+                loading a second copy
+            name: Backend name in results and metrics
+        """
+        self.model_path = model_path
+        self.grammar = grammar
+        self.shared = shared
+        self.name = name
+        self.model = None
+        self._lock = threading.Lock()
+    
+    def load(self):
+        """Load the model (slow; call from a background thread)"""
+        if self.shared is not None:
+            if self.shared.load():
+                self.model = self.shared.model
+            return self.model is not None
+        with self._lock:
+            if self.model is not None:
+                return True
+            try:
+                if not self.model_path or not os.path.isdir(self.model_path):
+                    print(f"[STT] Vosk model not found ({self.model_path})")
+                    return False
+                
+                import vosk
+                vosk.SetLogLevel(-1)
+                started = time.perf_counter()
+                self.model = vosk.Model(self.model_path)
+                elapsed = time.perf_counter() - started
+                print(f"[STT] ✅ Offline recognizer ready ({os.path.basename(self.model_path)}, loaded in {elapsed:.1f}s)")
+                return True
+            
+            except ImportError:
+                print("[STT] vosk not installed, offline recognition unavailable")
+            except Exception as e:
+                print(f"[WARNING] Vosk model failed to load: {e}")
+            return False
+    
+    def is_available(self):
+        if self.shared is not None:
+            return self.shared.is_available()
+        return self.model is not None
+    
+    def session(self, sample_rate):
+        import vosk
+        if self.model is None and not self.load():
+            raise RuntimeError("Vosk model not loaded")
+        if self.grammar:
+            recognizer = vosk.KaldiRecognizer(self.model, sample_rate, json.dumps(self.grammar))
+        else:
+            recognizer = vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.SetWords(True)
+        return _VoskSession(recognizer, self.name)
+
+
+class _VoskSession:
+    """One utterance on a KaldiRecognizer"""
+    
+    def __init__(self, recognizer, backend):
+        self.recognizer = recognizer
+        self.backend = backend
+        self.words = []  # (word, conf) from segments Kaldi already finalized
+        self.partial = ''
+    
+    def accept(self, frame):
+        if self.recognizer.AcceptWaveform(frame):
+            # Kaldi's own endpointer closed a segment mid-utterance
+            self._collect(self.recognizer.Result())
+            return None
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        if partial and partial != self.partial:
+            self.partial = partial
+            return ' '.join([w for w, _ in self.words] + [partial])
+        return None
+    
+    def finish(self):
+        self._collect(self.recognizer.FinalResult())
+        if not self.words:
+            return None
+        text = ' '.join(w for w, _ in self.words)
+        confidence = sum(c for _, c in self.words) / len(self.words)
+        return RecognitionResult(text.lower(), confidence, self.backend)
+    
+    def _collect(self, result):
+        for word in json.loads(result).get('result', []):
+            self.words.append((word['word'], word.get('conf', 1.0)))
+
+
+class GrammarBackend(STTBackend):
+    """
+    Constrained pass first, open vocabulary only when it is unsure
+    
+    The constrained backend (e.g. a Vosk grammar of the command phrases)
+    is fast and robust on the utterances we expect. Its result is used
+    unless it is empty, contains [unk] or falls below min_confidence, in
+    which case the fallback recognizes the same audio. A streaming
+    fallback is fed in parallel so falling back adds no decode time.
+    """
+    
+    def __init__(self, constrained, fallback=None, min_confidence=0.7, name='grammar'):
+        """
+        Args:
+            constrained: STTBackend restricted to the command grammar
+            fallback: Open-vocabulary STTBackend (None = no fallback)
+            min_confidence: Constrained results below this fall back
+            name: Backend name in metrics
+        """
+        self.constrained = constrained
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.name = name
+        self.streaming = constrained.streaming
+        self.offline = constrained.offline and (fallback is None or fallback.offline)
+        self.accepted = 0
+        self.fallbacks = 0
+    
+    def is_available(self):
+        return self.constrained.is_available() or (self.fallback is not None and self.fallback.is_available())
+    
+    def accepts(self, result):
+        """Whether a constrained result is trusted"""
+        if result is None or not result.text or '[unk]' in result.text.split():
+            return False
+        return result.confidence is None or result.confidence >= self.min_confidence
+    
+    def recognize(self, audio):
+        result = None
+        if self.constrained.is_available():  # e.g. model still loading: fall back
+            try:
+                result = self.constrained.recognize(audio)
+            except Exception as e:
+                print(f"[WARNING] Constrained recognition failed: {e}")
+        return self._choose(result, lambda: self.fallback.recognize(audio))
+    
+    def session(self, sample_rate):
+        return _GrammarSession(self, sample_rate)
+    
+    def stats(self):
+        """
+        Returns:
+            dict: accepted (constrained results used), fallbacks
+        """
+        return {'accepted': self.accepted, 'fallbacks': self.fallbacks}
+    
+    def _choose(self, result, fall_back):
+        if self.accepts(result):
+            self.accepted += 1
+            return result
+        self.fallbacks += 1
+        return fall_back() if self.fallback is not None else None
+
+
+class _GrammarSession:
+    """Constrained session plus either a parallel fallback session or buffered audio"""
+    
+    def __init__(self, owner, sample_rate):
+        self.owner = owner
+        self.sample_rate = sample_rate
+        self.frames = []
+        self.fallback = None
+        self.constrained = None
+        if owner.constrained.is_available():
+            self.constrained = owner.constrained.session(sample_rate)
+        if owner.fallback is not None and owner.fallback.streaming:
+            self.fallback = owner.fallback.session(sample_rate)
+    
+    def accept(self, frame):
+        if self.fallback is not None:
+            self.fallback.accept(frame)
+        elif self.owner.fallback is not None:
+            self.frames.append(frame)
+        if self.constrained is not None:
+            return self.constrained.accept(frame)
+        return None
+    
+    def finish(self):
+        result = self.constrained.finish() if self.constrained is not None else None
+        return self.owner._choose(result, self._fall_back)
+    
+    def _fall_back(self):
+        if self.fallback is not None:
+            return self.fallback.finish()
+        import speech_recognition as sr
+        return self.owner.fallback.recognize(sr.AudioData(b''.join(self.frames), self.sample_rate, 2))
+
+
+class RecognitionCoordinator(STTBackend):
+    """
+    Hedged recognition: the same audio goes to several backends at once
+    
+    The first result at or above min_confidence wins and the rest are
+    cancelled (calls not yet started are dropped; running ones finish in
+    the background and are ignored). If nothing confident arrives before
+    the deadline, the most confident result so far is used; if no backend
+    has answered by then, the first answer is waited for. A lone available
+    backend is called directly, without a deadline.
+    """
+    
+    name = 'hedged'
+    
+    def __init__(self, backends, deadline=3.0, min_confidence=0.6, metrics=None):
+        """
+        Args:
+            backends: STTBackends to race, e.g. [GoogleBackend, VoskBackend]
+            deadline: Seconds to wait for a confident result (longer if no
+                backend has answered by then)
+            min_confidence: Results below this only win by default;
+                a result without a confidence counts as confident
+            metrics: Optional Metrics receiving per-backend 'hedge' latencies
+        """
+        self.backends = list(backends)
+        self.deadline = deadline
+        self.min_confidence = min_confidence
+        self.metrics = metrics
+        self.offline = all(b.offline for b in self.backends)
+        self._pool = ThreadPoolExecutor(max_workers=2 * len(self.backends), thread_name_prefix='stt-hedge')
+        self._lock = threading.Lock()
+        self._counts = {b.name: {'calls': 0, 'wins': 0, 'errors': 0} for b in self.backends}
+    
+    def is_available(self):
+        return any(b.is_available() for b in self.backends)
+    
+    def recognize(self, audio):
+        backends = [b for b in self.backends if b.is_available()]
+        if not backends:
+            return None
+        if len(backends) == 1:
+            # Nothing to race: no deadline, no thread hop
+            with self._lock:
+                self._counts[backends[0].name]['calls'] += 1
+            result = self._call(backends[0], audio)
+            if result is not None:
+                with self._lock:
+                    self._counts[backends[0].name]['wins'] += 1
+            return result
+        started = time.perf_counter()
+        futures = {self._pool.submit(self._call, b, audio): b for b in backends}
+        pending = set(futures)
+        winner = best = None  # (result, backend)
+        errors = []
+        answered = 0  # backends that returned or raised
+        
+        while pending and winner is None:
+            remaining = started + self.deadline - time.perf_counter()
+            if remaining <= 0:
+                if answered:
+                    print(f"[STT] No confident recognition within {self.deadline:g}s")
+                    break
+                remaining = None  # nothing back yet: wait for the first answer
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                answered += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if result is None:
+                    continue
+                if result.confidence is None or result.confidence >= self.min_confidence:
+                    winner = (result, futures[future])
+                    break
+                if best is None or result.confidence > best[0].confidence:
+                    best = (result, futures[future])
+        
+        for future in pending:
+            future.cancel()
+        
+        chosen = winner or best
+        with self._lock:
+            for backend in backends:
+                self._counts[backend.name]['calls'] += 1
+            if chosen:
+                self._counts[chosen[1].name]['wins'] += 1
+        if chosen is None and errors and len(errors) == len(backends):
+            raise errors[-1]
+        return chosen[0] if chosen else None
+    
+    def stats(self):
+        """
+        Per-backend outcome for tuning the policy
+        
+        Returns:
+            dict: name -> calls, wins, win_rate, errors, and the backend's
+            own latency (p50/p95/p99 ms, including calls that lost)
+        """
+        latency = self.metrics.snapshot().get('hedge', {}) if self.metrics else {}
+        with self._lock:
+            return {
+                name: dict(counts,
+                           win_rate=round(counts['wins'] / counts['calls'], 3) if counts['calls'] else None,
+                           latency=latency.get(name))
+                for name, counts in self._counts.items()
+            }
+    
+    def _call(self, backend, audio):
+        started = time.perf_counter()
+        try:
+            result = backend.recognize(audio)
+        except Exception as e:
+            with self._lock:
+                self._counts[backend.name]['errors'] += 1
+            print(f"[WARNING] {backend.name} recognition failed: {e}")
+            raise
+        if self.metrics:
+            self.metrics.observe('hedge', time.perf_counter() - started, backend.name)
+        return result
+
+
+class StreamingDecoder:
+    """
+    Runs a streaming backend alongside AudioCapture
+    
+    Registered as a capture listener, it receives an utterance's frames
+    while it is being spoken and feeds them to the recognizer on its own
+    thread, so only the final flush remains once the endpoint is detected.
+    """
+    
+    def __init__(self, backend, on_partial=None, max_results=8, metrics=None):
+        """
+        Args:
+            backend: STTBackend with streaming = True
+            on_partial: Optional callback(text) for interim hypotheses
+            max_results: Finished results kept; the oldest is dropped when full
+            metrics: Optional Metrics receiving 'finalize' (endpoint to final
+                text) and 'decode' (per-frame) samples
+        """
+        self.backend = backend
+        self.on_partial = on_partial
+        self.metrics = metrics
+        self.results = queue.Queue(maxsize=max_results)
+        self.utterances = 0  # utterances fully processed (recognized or not)
+        
+        self._events = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+    
+    # Capture listener interface (called on the capture thread; never blocks)
+    
+    def speech_started(self, audio, sample_rate, sample_width):
+        self._events.put(('start', audio, sample_rate))
+    
+    def speech_frame(self, frame):
+        self._events.put(('frame', frame, None))
+    
+    def speech_ended(self):
+        self._events.put(('end', None, time.perf_counter()))
+    
+    def get_result(self, timeout=None):
+        """
+        Next final result
+        
+        Returns:
+            RecognitionResult, or None if none arrived within timeout
+        """
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def clear(self):
+        """Discard results not yet consumed"""
+        while True:
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                return
+    
+    def _run(self):
+        session = None
+        while True:
+            kind, payload, extra = self._events.get()
+            try:
+                if kind == 'start':
+                    session = self.backend.session(extra)
+                    self._accept(session, payload)
+                elif session is None:
+                    pass  # the session failed to start; skip this utterance
+                elif kind == 'frame':
+                    self._accept(session, payload)
+                else:
+                    result = session.finish()
+                    if self.metrics:
+                        self.metrics.observe('finalize', time.perf_counter() - extra, self.backend.name)
+                    if result and result.text:
+                        self._publish(result)
+            except Exception as e:
+                print(f"[ERROR] Streaming recognition failed: {e}")
+                session = None
+            if kind == 'end':
+                session = None
+                self.utterances += 1
+    
+    def _accept(self, session, frame):
+        started = time.perf_counter()
+        partial = session.accept(frame)
+        if self.metrics:
+            self.metrics.observe('decode', time.perf_counter() - started, self.backend.name)
+        if partial and self.on_partial:
+            try:
+                self.on_partial(partial)
+            except Exception as e:
+                print(f"[ERROR] Partial result callback error: {e}")
+    
+    def _publish(self, result):
+        while True:
+            try:
+                self.results.put_nowait(result)
+                return
+            except queue.Full:
+                try:
+                    self.results.get_nowait()
+                except queue.Empty:
+                    pass
@@ -0,0 +1,294 @@
+"""
+Registry Module
+Action plugins declared with metadata, discovered without importing them,
+and loaded (with their heavy dependencies) on first use or by a
+background warm-up, whichever comes first
+"""
+
+import os
+import sys
+import json
+import time
+import pkgutil
+import importlib
+import importlib.util
+import threading
+
+# Cost hints: heavy actions have their modules imported by warm_up()
+LIGHT = 'light'
+HEAVY = 'heavy'
+
+
+class ActionSpec:
+    """Metadata of one plugin action"""
+    
+    FIELDS = ('name', 'phrases', 'slots', 'requires', 'cost', 'timeout', 'min_score', 'exclusive',
+              'module', 'function')
+    
+    def __init__(self, name, phrases=(), slots=None, requires=(), cost=LIGHT, timeout=None, min_score=None,
+                 exclusive=False, module=None, function=None):
+        """
+        Args:
+            name: Command phrase (key of Actions.commands)
+            phrases: Other phrases for it (may use {slot} markers)
+            slots: Values of the slots its phrases use, e.g. {'app': ['firefox']}
+            requires: Modules the handler needs (e.g. 'pyautogui')
+            cost: LIGHT, or HEAVY when importing `requires` is slow
+            timeout: Seconds the action may run (None = ACTION_TIMEOUT)
+            min_score: Fuzzy score needed to run it from misrecognized text
+                (None = INTENT_MIN_SCORE); set higher for risky actions
+            exclusive: In a compound command, run only after every earlier
+                step has finished (e.g. shutdown)
+            module, function: Where the handler lives
+        """
+        self.name = name
+        self.phrases = list(phrases)
+        self.slots = {slot: list(values) for slot, values in (slots or {}).items()}
+        self.requires = list(requires)
+        self.cost = cost
+        self.timeout = timeout
+        self.min_score = min_score
+        self.exclusive = bool(exclusive)
+        self.module = module
+        self.function = function
+    
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in cls.FIELDS if field in data})
+
+
+def action(name, phrases=(), requires=(), cost=LIGHT, timeout=None, min_score=None, exclusive=False, slots=None):
+    """
+    Declare a plugin action
+    
+    The handler is called as handler(actions, text), where actions is the
+    Actions instance (for config and slots). Modules in `requires` are
+    imported before the first call, so the handler's own import of them
+    is free.
+    
+    Example:
+        @action('screenshot', ['take a screenshot'], requires=['pyautogui'], cost=HEAVY)
+        def take_screenshot(actions, text):
+            ...
+    """
+    def decorate(fn):
+        fn.action_spec = ActionSpec(name, phrases, slots, requires, cost, timeout, min_score, exclusive,
+                                    fn.__module__, fn.__name__)
+        return fn
+    return decorate
+
+
+def specs_in(module):
+    """ActionSpecs declared in an imported module, in definition order"""
+    return [value.action_spec for value in vars(module).values()
+            if callable(value) and hasattr(value, 'action_spec')]
+
+
+class ActionRegistry:
+    """
+    Plugin actions from a package and from installed entry points
+    
+    Discovery reads a JSON manifest of every plugin's specs, keyed by the
+    module file's mtime and size (or the distribution version for entry
+    points), so startup imports nothing but changed plugins and stays flat
+    as actions are added. Handlers and their required modules are
+    imported on first call or by warm_up(), whichever comes first.
+    """
+    
+    def __init__(self, package='plugins', group='jarvis.actions', manifest_path=None):
+        """
+        Args:
+            package: Package whose modules declare actions (None to skip)
+            group: Entry point group; each entry point names a module
+                declaring actions (None to skip)
+            manifest_path: JSON spec cache (None: always import plugins)
+        """
+        self.package = package
+        self.group = group
+        self.manifest_path = manifest_path
+        self.specs = {}  # name -> ActionSpec, in discovery order
+        self.manifest_hits = 0
+        self.manifest_misses = 0
+        self.import_seconds = {}  # module -> seconds its first import took
+        
+        self._handlers = {}
+        self._missing = {}  # module -> ImportError
+        self._lock = threading.Lock()
+        self._warmer = None
+    
+    def discover(self):
+        """
+        Find every plugin action
+        
+        Returns:
+            list: ActionSpec in discovery order (package modules by name,
+            then entry points); later specs with the same name replace
+            earlier ones
+        """
+        manifest = self._load_manifest()
+        updated = {}
+        for module_name, fingerprint in self._sources():
+            entry = manifest.get(module_name)
+            if entry and entry.get('fingerprint') == fingerprint:
+                self.manifest_hits += 1
+                specs = [ActionSpec.from_dict(d) for d in entry['specs']]
+            else:
+                self.manifest_misses += 1
+                try:
+                    specs = specs_in(self._import(module_name))
+                except Exception as e:
+                    print(f"[WARNING] Action plugin {module_name} failed to load: {e}")
+                    continue
+            updated[module_name] = {'fingerprint': fingerprint, 'specs': [s.to_dict() for s in specs]}
+            for spec in specs:
+                self.specs[spec.name] = spec
+        
+        if updated != manifest:
+            self._save_manifest(updated)
+        return list(self.specs.values())
+    
+    def handler(self, name):
+        """
+        The handler of an action, importing it (and what it requires) if needed
+        
+        Returns:
+            callable: handler(actions, text)
+        
+        Raises:
+            ImportError: A required module is not installed
+        """
+        handler = self._handlers.get(name)
+        if handler is not None:
+            return handler
+        spec = self.specs[name]
+        for module_name in spec.requires:
+            self.require(module_name)
+        handler = getattr(self._import(spec.module), spec.function)
+        self._handlers[name] = handler
+        return handler
+    
+    def require(self, module_name):
+        """
+        Import a module once (concurrent callers wait for the same import)
+        
+        Raises:
+            ImportError: If it is not installed (remembered, not retried)
+        """
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+        if module_name in self._missing:
+            raise self._missing[module_name]
+        try:
+            return self._import(module_name)
+        except ImportError as e:
+            self._missing[module_name] = e
+            raise
+    
+    def warm_up(self, delay=0.0, tasks=()):
+        """
+        Import heavy actions' modules on a background thread (idempotent)
+        
+        Args:
+            delay: Seconds to wait first, so startup work goes ahead of it
+            tasks: Callables run after the imports (e.g. loading caches)
+        
+        Returns:
+            threading.Thread: The warm-up thread
+        """
+        with self._lock:
+            if self._warmer is None:
+                self._warmer = threading.Thread(target=self._warm, args=(delay, tasks),
+                                                name='jarvis-action-warmup', daemon=True)
+                self._warmer.start()
+            return self._warmer
+    
+    def stats(self):
+        """
+        Discovery and import costs
+        
+        Returns:
+            dict: actions, manifest_hits, manifest_misses, loaded (handlers
+            imported so far), missing (required modules not installed),
+            import_ms per module
+        """
+        return {
+            'actions': len(self.specs),
+            'manifest_hits': self.manifest_hits,
+            'manifest_misses': self.manifest_misses,
+            'loaded': sorted(self._handlers),
+            'missing': sorted(self._missing),
+            'import_ms': {name: round(s * 1000, 1) for name, s in self.import_seconds.items()},
+        }
+    
+    def _warm(self, delay, tasks):
+        if delay:
+            time.sleep(delay)
+        specs = sorted(self.specs.values(), key=lambda s: s.cost != HEAVY)
+        for spec in specs:
+            try:
+                self.handler(spec.name)
+            except ImportError:
+                pass  # reported when the action is used
+            except Exception as e:
+                print(f"[WARNING] Warming up action '{spec.name}' failed: {e}")
+        for task in tasks:
+            try:
+                task()
+            except Exception as e:
+                print(f"[WARNING] Warm-up task failed: {e}")
+    
+    def _import(self, module_name):
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.import_seconds.setdefault(module_name, time.perf_counter() - started)
+        return module
+    
+    def _sources(self):
+        """Yield (module name, fingerprint) of every plugin module"""
+        if self.package:
+            spec = importlib.util.find_spec(self.package)
+            locations = spec.submodule_search_locations if spec else None
+            for info in pkgutil.iter_modules(locations or []):
+                if info.ispkg or info.name.startswith('_'):
+                    continue
+                path = os.path.join(info.module_finder.path, info.name + '.py')
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield f"{self.package}.{info.name}", [st.st_mtime_ns, st.st_size]
+        
+        if self.group:
+            from importlib import metadata
+            try:
+                entry_points = metadata.entry_points(group=self.group)
+            except Exception as e:
+                print(f"[WARNING] Could not read '{self.group}' entry points: {e}")
+                return
+            for entry_point in entry_points:
+                version = entry_point.dist.version if entry_point.dist else None
+                yield entry_point.module, [entry_point.name, version]
+    
+    def _load_manifest(self):
+        if not self.manifest_path:
+            return {}
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_manifest(self, manifest):
+        if not self.manifest_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            tmp = self.manifest_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp, self.manifest_path)
+        except OSError as e:
+            print(f"[WARNING] Could not write action manifest: {e}")
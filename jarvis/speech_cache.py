@@ -0,0 +1,230 @@
+"""
+Speech Cache Module
+Content-addressed on-disk cache of synthesized speech clips
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class SpeechCache:
+    """Size-bounded LRU cache of rendered audio, keyed by synthesis parameters"""
+    
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024):
+        """
+        Initialize the cache
+        
+        Args:
+            cache_dir: Directory holding cached clips (created if missing)
+            max_bytes: Total size budget; least recently used clips are evicted past it
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (path, size), oldest first
+        self._total_bytes = 0
+        self._inflight = {}  # key -> threading.Event
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+    
+    @staticmethod
+    def make_key(text, language='en', voice=None, engine='gtts', speed=1.0):
+        """
+        Build the cache key for a synthesis request
+        
+        Returns:
+            str: Hex digest identifying the rendered clip
+        """
+        voice_id = os.path.basename(voice) if voice else ''
+        material = '\x1f'.join([engine, language, voice_id, f"{float(speed):.3f}", text])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def _load_index(self):
+        """Rebuild the LRU order from files already on disk (by mtime)"""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith('.'):
+                # Partial render left behind by an interrupted run
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            key, _ = os.path.splitext(name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            found.append((st.st_mtime, key, path, st.st_size))
+        
+        for _, key, path, size in sorted(found):
+            self._entries[key] = (path, size)
+            self._total_bytes += size
+    
+    def get(self, key):
+        """
+        Look up a clip and mark it as recently used
+        
+        Returns:
+            str: Path to the cached clip, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(entry[0]):
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        
+        try:
+            os.utime(entry[0])  # persist recency across restarts
+        except OSError:
+            pass
+        return entry[0]
+    
+    def contains(self, key):
+        """Check for a clip without touching counters or recency"""
+        with self._lock:
+            return key in self._entries
+    
+    def load(self, key):
+        """
+        Look up a clip and read its encoded bytes
+        
+        Returns:
+            tuple: (path, bytes), or (None, None) on a miss
+        """
+        path = self.get(key)
+        if path:
+            try:
+                with open(path, 'rb') as f:
+                    return path, f.read()
+            except OSError:
+                pass
+        return None, None
+    
+    def put(self, key, data, ext):
+        """
+        Store rendered audio bytes in the cache
+        
+        Args:
+            key: Cache key from make_key()
+            data: Encoded audio (e.g. MP3 or WAV bytes)
+            ext: File extension including the dot
+        
+        Returns:
+            str: Path of the cached clip
+        """
+        dest = os.path.join(self.cache_dir, key + ext)
+        tmp = os.path.join(self.cache_dir, f".{key}.{threading.get_ident()}{ext}")
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, dest)  # readers never see a partial clip
+        
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (dest, len(data))
+            self._total_bytes += len(data)
+            self._evict()
+        return dest
+    
+    def get_or_create(self, key, render, ext):
+        """
+        Return a cached clip, rendering it at most once across threads
+        
+        Concurrent callers asking for the same key wait for the first
+        caller's render instead of synthesizing the phrase again.
+        
+        Args:
+            key: Cache key from make_key()
+            render: Callable returning encoded audio bytes, or None on failure
+            ext: File extension for the rendered format
+        
+        Returns:
+            tuple: (path, bytes), or (None, None) if rendering failed
+        """
+        while True:
+            path, data = self.load(key)
+            if path:
+                return path, data
+            
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    owner = True
+                else:
+                    owner = False
+            
+            if not owner:
+                event.wait()
+                with self._lock:
+                    if key not in self._entries:
+                        return None, None  # the owner's render failed
+                continue
+            
+            try:
+                data = render()
+                if not data:
+                    return None, None
+                return self.put(key, data, ext), data
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+    
+    def _drop(self, key):
+        """Forget an entry (caller holds the lock)"""
+        path, size = self._entries.pop(key)
+        self._total_bytes -= size
+        return path
+    
+    def _evict(self):
+        """Remove least recently used clips until under budget (caller holds the lock)"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            path = self._drop(key)
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def clear(self):
+        """Delete every cached clip"""
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    os.remove(self._drop(key))
+                except OSError:
+                    pass
+    
+    def stats(self):
+        """
+        Hit/miss counters for tuning the cache size
+        
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries, bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+            }
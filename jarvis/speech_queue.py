@@ -0,0 +1,195 @@
+"""
+Speech Queue Module
+Serializes speak() calls from any thread with priorities, coalescing,
+stale-item dropping and bounded backpressure
+"""
+
+import time
+import threading
+
+# Priorities: lower value is spoken first
+ALERT = 0
+RESPONSE = 1
+CHATTER = 2
+
+
+class SpeechRequest:
+    """Handle for a submitted utterance"""
+    
+    def __init__(self, text, priority, kwargs, seq):
+        self.text = text
+        self.priority = priority
+        self.kwargs = kwargs
+        self.seq = seq
+        self.created = time.monotonic()
+        self.dropped = False
+        self.result = None
+        self.done = threading.Event()
+        self.cancelled = threading.Event()  # set when a more urgent request preempts it
+    
+    def wait(self, timeout=None):
+        """
+        Block until the request was spoken or dropped
+        
+        Returns:
+            bool: True if it was spoken
+        """
+        self.done.wait(timeout)
+        return self.done.is_set() and not self.dropped
+    
+    def _finish(self, result=None, dropped=False):
+        self.result = result
+        self.dropped = dropped
+        self.done.set()
+
+
+class SpeechScheduler:
+    """Single worker that speaks queued requests in priority order"""
+    
+    def __init__(self, speak, interrupt=None, max_pending=8, stale_after=10.0, metrics=None):
+        """
+        Initialize the scheduler (the worker starts on first submit)
+        
+        Args:
+            speak: Callable(text, cancelled=..., **kwargs) doing the actual
+                synthesis + playback; cancelled() turns True once the request
+                is preempted, and speak should check it before starting playback
+            interrupt: Optional callable that cuts off the utterance playing now;
+                used when an alert arrives during lower-priority speech
+            max_pending: Queue bound; beyond it submitters block or low-priority
+                items are evicted
+            stale_after: Seconds after which a queued non-alert request is dropped
+            metrics: Optional Metrics receiving 'queue_wait' samples
+        """
+        self.speak = speak
+        self.interrupt = interrupt
+        self.max_pending = max_pending
+        self.stale_after = stale_after
+        self.metrics = metrics
+        
+        self._pending = []
+        self._current = None
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._worker = None
+        self._counts = {'spoken': 0, 'interrupted': 0, 'failed': 0, 'coalesced': 0, 'dropped': 0, 'rejected': 0}
+    
+    def submit(self, text, priority=RESPONSE, timeout=None, **kwargs):
+        """
+        Queue text to be spoken
+        
+        Identical pending requests are coalesced (keeping the higher
+        priority), and any new request supersedes pending chatter. When the
+        queue is full, a lower-priority pending item is evicted if there is
+        one; otherwise the caller blocks until there is room.
+        
+        Args:
+            text: Text to speak
+            priority: ALERT, RESPONSE or CHATTER
+            timeout: Max seconds to block on a full queue (None = wait, 0 = don't)
+            **kwargs: Passed through to speak()
+        
+        Returns:
+            SpeechRequest: Handle to wait on (already finished if rejected)
+        """
+        with self._cond:
+            self._ensure_worker()
+            
+            for request in self._pending:
+                if request.text == text and request.kwargs == kwargs:
+                    request.priority = min(request.priority, priority)
+                    self._counts['coalesced'] += 1
+                    return request
+            
+            for request in [r for r in self._pending if r.priority == CHATTER]:
+                self._drop(request)
+            
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while len(self._pending) >= self.max_pending:
+                worst = max(self._pending, key=lambda r: (r.priority, -r.seq))
+                if worst.priority > priority:
+                    self._drop(worst)
+                    continue
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._counts['rejected'] += 1
+                    request = SpeechRequest(text, priority, kwargs, -1)
+                    request._finish(dropped=True)
+                    return request
+                self._cond.wait(remaining)
+            
+            self._seq += 1
+            request = SpeechRequest(text, priority, kwargs, self._seq)
+            self._pending.append(request)
+            self._cond.notify_all()
+            
+            current = self._current
+            preempt = current is not None and priority < current.priority
+            if preempt:
+                current.cancelled.set()  # in case it is still synthesizing
+        
+        if preempt and self.interrupt:
+            self.interrupt()
+        return request
+    
+    def clear(self):
+        """Drop everything still waiting to be spoken"""
+        with self._cond:
+            for request in list(self._pending):
+                self._drop(request)
+            self._cond.notify_all()
+    
+    def stats(self):
+        """
+        Queue depth and counters
+        
+        Returns:
+            dict: pending, spoken, interrupted (preempted by a more urgent
+            request), failed (speak raised), coalesced, dropped, rejected
+        """
+        with self._cond:
+            return dict(self._counts, pending=len(self._pending))
+    
+    def _drop(self, request):
+        """Remove a pending request (caller holds the lock)"""
+        self._pending.remove(request)
+        self._counts['dropped'] += 1
+        request._finish(dropped=True)
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+    
+    def _run(self):
+        """Worker loop: speak the most urgent pending request"""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                request = min(self._pending, key=lambda r: (r.priority, r.seq))
+                self._pending.remove(request)
+                self._cond.notify_all()  # room for blocked submitters
+                
+                age = time.monotonic() - request.created
+                if self.metrics:
+                    self.metrics.observe('queue_wait', age)
+                if request.priority != ALERT and age > self.stale_after:
+                    self._counts['dropped'] += 1
+                    request._finish(dropped=True)
+                    continue
+                self._current = request
+            
+            result = None
+            outcome = 'spoken'
+            try:
+                result = self.speak(request.text, cancelled=request.cancelled.is_set, **request.kwargs)
+            except Exception as e:
+                outcome = 'failed'
+                print(f"[ERROR] Speech queue error: {e}")
+            if outcome == 'spoken' and request.cancelled.is_set():
+                outcome = 'interrupted'
+            with self._cond:
+                self._current = None
+                self._counts[outcome] += 1
+            request._finish(result)
@@ -3,40 +3,168 @@ Speech-to-Text Module
 Offline speech recognition using available libraries
 """
 
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+
 import speech_recognition as sr
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 from config import Config
+from capture import AudioCapture, FileSource, NoiseFloorTracker, make_vad
+from metrics import Metrics
+from recognizers import GoogleBackend, GrammarBackend, RecognitionCoordinator, StreamingDecoder, VoskBackend
+from wakeword import WakeWordGate, make_detector
 
 
 class SpeechToText:
     """Handles offline speech-to-text conversion"""
     
-    def __init__(self):
+    def __init__(self, continuous=False, offline_backend=None, wake_word=False, source=None):
+        """
+        Initialize STT
+        
+        Args:
+            continuous: Keep the microphone open and segment utterances in
+                the background (see start_continuous)
+            offline_backend: Streaming STTBackend for listen_offline
+                (default: Vosk model at Config.STT_OFFLINE_MODEL)
+            wake_word: Continuous mode: only recognize utterances addressed
+                with Config.WAKE_WORD (see WakeWordGate)
+            source: sr.AudioSource to listen on instead of the microphone
+                (e.g. capture.FileSource for recorded audio)
+        """
         self.recognizer = sr.Recognizer()
         self.config = Config()
-        self.microphone = sr.Microphone()
+        frame_samples = self.config.STT_SAMPLE_RATE * self.config.STT_FRAME_MS // 1000
+        self.microphone = source or sr.Microphone(
+            sample_rate=self.config.STT_SAMPLE_RATE,
+            chunk_size=frame_samples
+        )
+        self.google = GoogleBackend(self.recognizer, self.config.LANGUAGE, url=self.config.STT_GOOGLE_URL)
+        self.capture = None
+        self.noise = NoiseFloorTracker(
+            self.recognizer,
+            alpha=self.config.STT_NOISE_ALPHA,
+            ratio=self.config.STT_NOISE_RATIO
+        )
+        self.calibrated = False
+        self.offline = offline_backend or VoskBackend(self.config.STT_OFFLINE_MODEL)
+        self.decoder = None
+        self.wake_word = wake_word
+        self.gate = None
+        self.metrics = Metrics('stt')
+        self.metrics.start_periodic_dump(self.config.LOG_DIR, self.config.METRICS_DUMP_INTERVAL)
+        self.hedging = False
+        self.online = None  # backend used by recognize(), see _build_online
+        if self.config.STT_HEDGE:
+            self.enable_hedging()
+        else:
+            self._build_online()
+        if continuous:
+            self.start_continuous()
+    
+    def start_continuous(self):
+        """
+        Keep the input stream open on a capture thread
         
-    def listen(self, timeout=10):
+        Frames go into a ring buffer and a voice-activity detector cuts
+        utterances out of it, so there is no device open/close per command
+        and speech between listen() calls is queued rather than lost. The
+        noise floor is tracked continuously on the same stream, so no
+        per-listen calibration is needed. With a wake word, utterances
+        without it are dropped here, before any recognizer runs.
+        """
+        if self.capture is None:
+            if self.wake_word:
+                detector = make_detector(self.config, self.offline)
+                if detector:
+                    self.gate = WakeWordGate(detector, window=self.config.WAKE_WORD_WINDOW)
+                    print(f"[STT] Wake word '{self.config.WAKE_WORD}' enabled ({detector.name})")
+                else:
+                    print("[STT] No wake word engine available, recognizing every utterance")
+            self.capture = AudioCapture(
+                self.microphone,
+                make_vad(self.recognizer),
+                frame_ms=self.config.STT_FRAME_MS,
+                ring_seconds=self.config.STT_RING_SECONDS,
+                pre_roll_ms=self.config.STT_PRE_ROLL_MS,
+                end_silence_ms=self.config.STT_END_SILENCE_MS,
+                max_utterance_s=self.config.STT_MAX_UTTERANCE_S,
+                noise=self.noise,
+                gate=self.gate
+            )
+        self.capture.start()
+    
+    def stop_continuous(self):
+        """Close the input stream opened by start_continuous"""
+        if self.capture:
+            self.capture.stop()
+    
+    def listen(self, timeout=10, discard_pending=False):
         """
         Listen to microphone input and convert to text
         
+        In continuous mode this takes the next utterance segmented by the
+        capture thread instead of opening the microphone. Otherwise the
+        ambient noise is calibrated on the first call only; after that
+        the recognizer's dynamic threshold keeps adapting while listening.
+        
         Args:
             timeout: Timeout in seconds for listening
+            discard_pending: Continuous mode: drop utterances captured before
+                this call (e.g. when the user has just clicked Listen)
             
         Returns:
             str: Recognized text or None if recognition failed
         """
         try:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source)
-                audio = self.recognizer.listen(source, timeout=timeout)
+            if self.capture and self.capture.is_running():
+                if discard_pending:
+                    self.capture.clear()
+                audio = self.capture.get_segment(timeout=timeout)
+                if audio is None:
+                    return None
+            else:
+                with self.microphone as source:
+                    if not self.calibrated:
+                        with self.metrics.timer('calibration'):
+                            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                        self.calibrated = True
+                    audio = self.recognizer.listen(source, timeout=timeout)
             
-            # Try to recognize using Google Speech Recognition
-            text = self.recognizer.recognize_google(audio, language='en-US')
-            return text.lower()
-            
-        except sr.UnknownValueError:
-            print("Could not understand the audio")
+        except Exception as e:
+            print(f"Error: {e}")
             return None
+        
+        return self.recognize(audio)
+    
+    def recognize(self, audio):
+        """
+        Convert a captured utterance to text
+        
+        Args:
+            audio: sr.AudioData (e.g. a segment from continuous capture)
+            
+        Returns:
+            str: Recognized text or None if recognition failed
+        """
+        try:
+            # Google Speech Recognition, or the command grammar first
+            # when use_command_grammar() is on
+            with self.metrics.timer('recognize', self.online.name):
+                result = self.online.recognize(audio)
+            if result is None:
+                print("Could not understand the audio")
+                return None
+            return result.text
+            
         except sr.RequestError as e:
             print(f"Error with speech recognition service: {e}")
             return None
@@ -44,9 +172,381 @@ class SpeechToText:
             print(f"Error: {e}")
             return None
     
-    def listen_offline(self):
+    def noise_stats(self):
+        """
+        Noise-floor metrics: current floor/threshold, warm-up and per-frame
+        cost of the background estimator, threshold trajectory, and time
+        spent in one-off calibration
+        """
+        stats = self.noise.stats()
+        stats['calibration'] = self.metrics.snapshot().get('calibration', {}).get('all')
+        return stats
+    
+    def use_command_grammar(self, phrases):
+        """
+        Recognize against the command phrases first, locally
+        
+        The phrases (e.g. Actions.grammar()) are compiled into a Vosk
+        grammar sharing the offline model. Constrained results that are
+        confident are used directly; otherwise the same audio goes to open
+        vocabulary recognition: Google for recognize()/listen() (or, when
+        hedging, the open Vosk pass raced against Google), the open Vosk
+        pass (decoded in parallel) for listen_offline().
+        
+        Args:
+            phrases: Command phrases the constrained pass may output
+        """
+        base = self.offline.fallback if isinstance(self.offline, GrammarBackend) else self.offline
+        if not isinstance(base, VoskBackend):
+            print("[STT] Command grammar needs the Vosk offline backend")
+            return
+        
+        grammar = sorted(set(phrases) | {self.config.WAKE_WORD, '[unk]'})
+        constrained = VoskBackend(base.model_path, grammar=grammar, shared=base, name='vosk-grammar')
+        min_confidence = self.config.STT_GRAMMAR_MIN_CONFIDENCE
+        self.offline = GrammarBackend(constrained, base, min_confidence)
+        if self.decoder:
+            self.decoder.backend = self.offline
+        self._build_online()
+        threading.Thread(target=constrained.load, daemon=True).start()
+    
+    def enable_hedging(self, deadline=None, min_confidence=None):
+        """
+        Race Google and the offline recognizer on every recognize()/listen()
+        
+        Both get the same audio; the first confident result wins and a
+        slow or failing network no longer means a lost command. See
+        hedge_stats() for per-backend win rates and latencies.
+        
+        Args:
+            deadline: Seconds to wait for a confident result (default Config.STT_HEDGE_DEADLINE)
+            min_confidence: Default Config.STT_HEDGE_MIN_CONFIDENCE
+        """
+        self.hedging = True
+        self.hedge_deadline = deadline or self.config.STT_HEDGE_DEADLINE
+        self.hedge_min_confidence = min_confidence or self.config.STT_HEDGE_MIN_CONFIDENCE
+        load = getattr(self.offline, 'load', None)
+        if load:
+            threading.Thread(target=load, daemon=True).start()
+        self._build_online()
+    
+    def hedge_stats(self):
+        """Per-backend calls, wins, win rate, errors and latency (None unless hedging)"""
+        if isinstance(self.online, RecognitionCoordinator):
+            return self.online.stats()
+        return None
+    
+    def _build_online(self):
+        """
+        Pick the recognize() backend: Google, the command grammar with
+        Google as fallback, or (hedging) Google raced against the offline
+        backend, which includes the command grammar when enabled
         """
-        Offline speech-to-text (requires local model)
-        Placeholder for offline implementation
+        if self.hedging:
+            self.online = RecognitionCoordinator(
+                [self.google, self.offline],
+                deadline=self.hedge_deadline,
+                min_confidence=self.hedge_min_confidence,
+                metrics=self.metrics
+            )
+        elif isinstance(self.offline, GrammarBackend):
+            self.online = GrammarBackend(self.offline.constrained, self.google, self.offline.min_confidence)
+        else:
+            self.online = self.google
+    
+    def start_offline(self):
         """
-        pass
+        Decode continuous-capture audio with the offline recognizer while
+        it is being spoken
+        
+        The model is loaded in the background; once an utterance ends
+        only the recognizer's final flush is left to do.
+        """
+        if self.decoder is None:
+            load = getattr(self.offline, 'load', None)
+            if load:
+                threading.Thread(target=load, daemon=True).start()
+            self.decoder = StreamingDecoder(self.offline, metrics=self.metrics)
+            self.start_continuous()
+            (self.gate or self.capture).add_listener(self.decoder)
+    
+    def listen_offline(self, timeout=10, on_partial=None, discard_pending=False):
+        """
+        Offline speech-to-text with the local recognizer (no network)
+        
+        In continuous mode the next utterance is decoded frame by frame
+        as it arrives and on_partial receives interim hypotheses.
+        Otherwise one utterance is recorded and then decoded.
+        
+        Args:
+            timeout: Timeout in seconds for listening
+            on_partial: Optional callback(text) for interim hypotheses
+            discard_pending: Continuous mode: drop utterances recognized
+                before this call
+            
+        Returns:
+            str: Recognized text or None if recognition failed
+        """
+        try:
+            if self.capture and self.capture.is_running():
+                self.start_offline()
+                if discard_pending:
+                    self.decoder.clear()
+                self.decoder.on_partial = on_partial
+                result = self.decoder.get_result(timeout=timeout)
+            else:
+                with self.microphone as source:
+                    if not self.calibrated:
+                        with self.metrics.timer('calibration'):
+                            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                        self.calibrated = True
+                    audio = self.recognizer.listen(source, timeout=timeout)
+                with self.metrics.timer('recognize', self.offline.name):
+                    result = self.offline.recognize(audio)
+            
+            return result.text if result else None
+            
+        except Exception as e:
+            print(f"Error: {e}")
+            return None
+
+
+class _TimedBackend:
+    """Wraps an STTBackend and accumulates the time spent inside it"""
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.streaming = backend.streaming
+        self.busy = 0.0
+    
+    def recognize(self, audio):
+        started = time.perf_counter()
+        try:
+            return self.backend.recognize(audio)
+        finally:
+            self.busy += time.perf_counter() - started
+    
+    def session(self, sample_rate):
+        started = time.perf_counter()
+        session = self.backend.session(sample_rate)
+        self.busy += time.perf_counter() - started
+        return _TimedSession(session, self)
+
+
+class _TimedSession:
+    def __init__(self, session, owner):
+        self.session = session
+        self.owner = owner
+    
+    def accept(self, frame):
+        started = time.perf_counter()
+        try:
+            return self.session.accept(frame)
+        finally:
+            self.owner.busy += time.perf_counter() - started
+    
+    def finish(self):
+        started = time.perf_counter()
+        try:
+            return self.session.finish()
+        finally:
+            self.owner.busy += time.perf_counter() - started
+
+
+def _words(text):
+    return re.sub(r"[^\w' ]+", ' ', (text or '').lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """
+    Word-level edit distance
+    
+    Returns:
+        tuple: (substitutions + deletions + insertions, reference word count)
+    """
+    ref, hyp = _words(reference), _words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, other in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (word != other))
+    return row[-1], len(ref)
+
+
+def load_corpus(path):
+    """
+    Labelled recordings for benchmarking
+    
+    Args:
+        path: Directory of audio files with same-named .txt transcripts, or
+            a .jsonl manifest of {"audio": ..., "text": ...} (paths
+            relative to the manifest)
+        
+    Returns:
+        list: {'audio': path, 'text': reference} dicts
+    """
+    items = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            stem, ext = os.path.splitext(name)
+            label = os.path.join(path, stem + '.txt')
+            if ext.lower() in FileSource.EXTENSIONS and os.path.exists(label):
+                with open(label, encoding='utf-8') as f:
+                    items.append({'audio': os.path.join(path, name), 'text': f.read().strip()})
+    else:
+        base = os.path.dirname(os.path.abspath(path))
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    items.append({'audio': os.path.join(base, item['audio']), 'text': item['text']})
+    return items
+
+
+def _bench_backend(backend, items, config, realtime=False, before_item=None):
+    """Feed each recording through capture + backend and score the result"""
+    timed = _TimedBackend(backend)
+    metrics = Metrics('stt_bench')  # 'finalize': endpoint to final text
+    decoder = StreamingDecoder(timed, metrics=metrics) if backend.streaming else None
+    edits = words = errors = 0
+    audio_seconds = 0.0
+    ended = 0
+    
+    for item in items:
+        if before_item:
+            before_item(item)
+        source = FileSource(item['audio'], sample_rate=config.STT_SAMPLE_RATE, realtime=realtime)
+        capture = AudioCapture(
+            source, make_vad(sr.Recognizer()),
+            frame_ms=config.STT_FRAME_MS,
+            pre_roll_ms=config.STT_PRE_ROLL_MS,
+            end_silence_ms=config.STT_END_SILENCE_MS,
+            max_utterance_s=config.STT_MAX_UTTERANCE_S
+        )
+        texts = []
+        if decoder:
+            capture.add_listener(decoder)
+            capture.start()
+            capture.wait()
+            ended += capture.segments_emitted
+            while decoder.utterances < ended:
+                time.sleep(0.005)
+            while True:
+                result = decoder.get_result(timeout=0)
+                if result is None:
+                    break
+                texts.append(result.text)
+        else:
+            capture.start()
+            while capture.is_running() or not capture.segments.empty():
+                segment = capture.get_segment(timeout=0.05)
+                if segment is None:
+                    continue
+                try:
+                    result = timed.recognize(segment)
+                except Exception as e:
+                    print(f"[WARNING] {backend.name}: {e}")
+                    errors += 1
+                    continue
+                metrics.observe('finalize', time.perf_counter() - segment.endpoint_at, backend.name)
+                if result:
+                    texts.append(result.text)
+        
+        audio_seconds += sum(end - start for _, start, end in source.spans)
+        item_edits, item_words = word_errors(item['text'], ' '.join(texts))
+        edits += item_edits
+        words += item_words
+    
+    return {
+        'files': len(items),
+        'audio_seconds': round(audio_seconds, 1),
+        'wer': round(edits / words, 4) if words else None,
+        'rtf': round(timed.busy / audio_seconds, 4) if audio_seconds else None,
+        'endpoint_to_text': metrics.snapshot().get('finalize', {}).get(backend.name),
+        'errors': errors,
+    }
+
+
+def benchmark(corpus, backends=('google', 'vosk'), realtime=False, standin=None, standin_latency=0.0):
+    """
+    Run a labelled corpus through each recognizer backend
+    
+    Args:
+        corpus: Directory or .jsonl manifest (see load_corpus)
+        backends: Names among 'google', 'vosk' and 'grammar' (the
+            Actions command grammar with open-vocabulary Vosk fallback)
+        realtime: Play recordings at real-time speed (needed for honest
+            streaming latencies; otherwise audio is fed as fast as possible)
+        standin: Serve 'google' from a local stand-in instead of the network:
+            'echo' (answers with the reference text) or 'vosk'
+        standin_latency: Seconds the stand-in adds to each response
+        
+    Returns:
+        dict: backend -> files, audio_seconds, wer, rtf (recognizer time /
+        audio time), endpoint_to_text (p50/p95/p99 ms), errors
+    """
+    config = Config()
+    items = load_corpus(corpus)
+    vosk = VoskBackend(config.STT_OFFLINE_MODEL)
+    report = {}
+    
+    for name in backends:
+        server = None
+        before_item = None
+        if name == 'google':
+            url = config.STT_GOOGLE_URL
+            if standin:
+                from stt_standin import GoogleStandIn
+                server = GoogleStandIn(vosk if standin == 'vosk' else None, latency=standin_latency).start()
+                url = server.url
+                if standin == 'echo':
+                    before_item = lambda item: server.expect(item['text'])
+            backend = GoogleBackend(sr.Recognizer(), config.LANGUAGE, url=url)
+        elif name in ('vosk', 'grammar'):
+            if not vosk.load():
+                report[name] = {'error': 'unavailable'}
+                continue
+            backend = vosk
+            if name == 'grammar':
+                from actions import Actions
+                grammar = Actions().grammar() + [config.WAKE_WORD, '[unk]']
+                constrained = VoskBackend(vosk.model_path, grammar=grammar, shared=vosk, name='vosk-grammar')
+                backend = GrammarBackend(constrained, vosk, config.STT_GRAMMAR_MIN_CONFIDENCE)
+        else:
+            report[name] = {'error': 'unknown backend'}
+            continue
+        
+        try:
+            report[name] = _bench_backend(backend, items, config, realtime, before_item)
+            if isinstance(backend, GrammarBackend):
+                report[name].update(backend.stats())
+        finally:
+            if server:
+                server.stop()
+    return report
+
+
+def main(argv=None):
+    """Command line entry point: python -m jarvis.stt bench <corpus>"""
+    parser = argparse.ArgumentParser(prog='python -m jarvis.stt', description='Jarvis STT tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    bench = commands.add_parser('bench', help='Measure WER, real-time factor and latency on a labelled corpus')
+    bench.add_argument('corpus', help='Directory of audio + .txt transcripts, or a .jsonl manifest')
+    bench.add_argument('-b', '--backend', action='append', choices=['google', 'vosk', 'grammar'],
+                       help='Backend to measure (repeatable; default: google and vosk)')
+    bench.add_argument('--standin', choices=['echo', 'vosk'],
+                       help='Answer google requests from a local stand-in server')
+    bench.add_argument('--standin-latency', type=float, default=0.0, help='Seconds added per stand-in response')
+    bench.add_argument('--realtime', action='store_true', help='Feed audio at real-time speed')
+    
+    args = parser.parse_args(argv)
+    report = benchmark(args.corpus, args.backend or ('google', 'vosk'), realtime=args.realtime,
+                       standin=args.standin, standin_latency=args.standin_latency)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
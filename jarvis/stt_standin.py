@@ -0,0 +1,177 @@
+"""
+STT Stand-in Module
+Local HTTP server speaking the Google Speech API v2 protocol used by
+recognize_google, so recognition can be exercised and benchmarked offline,
+and a scripted streaming backend for testing frame-by-frame decoding
+"""
+
+import io
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import speech_recognition as sr
+
+from recognizers import RecognitionResult, STTBackend
+
+
+class GoogleStandIn:
+    """
+    Answers recognition requests from GoogleBackend(url=standin.url)
+    
+    With a backend (e.g. VoskBackend), each request's FLAC body is decoded
+    and recognized locally. Without one it runs in echo mode: requests are
+    answered with the transcripts given to expect(), in order, which
+    measures the pipeline and protocol overhead independent of accuracy.
+    """
+    
+    def __init__(self, backend=None, latency=0.0, host='127.0.0.1', port=0):
+        """
+        Args:
+            backend: STTBackend answering requests (None = echo mode)
+            latency: Seconds added to every response to simulate the network
+            host: Interface to bind
+            port: Port to bind (0 = any free port)
+        """
+        self.backend = backend
+        self.latency = latency
+        self.requests = 0
+        self._expected = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/recognize"
+    
+    def expect(self, text):
+        """Echo mode: answer the next request with text (later ones hear nothing)"""
+        with self._lock:
+            self._expected = [text]
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def answer(self, flac):
+        """
+        Transcript for one request body
+        
+        Returns:
+            tuple: (text, confidence), or (None, None) for no speech
+        """
+        with self._lock:
+            self.requests += 1
+            if self.backend is None:
+                return (self._expected.pop(0), 0.9) if self._expected else (None, None)
+        
+        with sr.AudioFile(io.BytesIO(flac)) as source:
+            audio = sr.Recognizer().record(source)
+        result = self.backend.recognize(audio)
+        return (result.text, result.confidence) if result else (None, None)
+    
+    def _handler(self):
+        standin = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                try:
+                    text, confidence = standin.answer(body)
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                if standin.latency:
+                    time.sleep(standin.latency)
+                
+                lines = [json.dumps({'result': []})]
+                if text:
+                    alternative = {'transcript': text}
+                    if confidence is not None:
+                        alternative['confidence'] = confidence
+                    lines.append(json.dumps({'result': [{'alternative': [alternative], 'final': True}],
+                                             'result_index': 0}))
+                payload = ('\n'.join(lines) + '\n').encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+
+
+class ScriptedBackend(STTBackend):
+    """
+    Streaming backend replaying canned transcripts, one per utterance
+    
+    Each session takes the next transcript and reveals it a word at a
+    time as frames arrive (one more word every frames_per_word frames),
+    returning the growing text as partial results; finish() returns the
+    whole transcript. Once the script runs out, sessions hear nothing.
+    """
+    
+    name = 'scripted'
+    streaming = True
+    
+    def __init__(self, transcripts, frames_per_word=3, confidence=0.9, name='scripted'):
+        """
+        Args:
+            transcripts: Texts of the utterances, in order
+            frames_per_word: Frames fed before each further partial word
+            confidence: Confidence of the final results
+            name: Backend name in results and metrics
+        """
+        self.transcripts = list(transcripts)
+        self.frames_per_word = frames_per_word
+        self.confidence = confidence
+        self.name = name
+        self.sessions = []  # every session started, in order
+        self._lock = threading.Lock()
+    
+    def session(self, sample_rate):
+        with self._lock:
+            text = self.transcripts.pop(0) if self.transcripts else None
+            session = _ScriptedSession(self, text, sample_rate)
+            self.sessions.append(session)
+        return session
+
+
+class _ScriptedSession:
+    """One utterance of a ScriptedBackend"""
+    
+    def __init__(self, backend, text, sample_rate):
+        self.backend = backend
+        self.text = text
+        self.sample_rate = sample_rate
+        self.words = text.split() if text else []
+        self.frames = 0
+        self.revealed = 0
+        self.finished = False
+    
+    def accept(self, frame):
+        self.frames += 1
+        revealed = min(len(self.words), self.frames // self.backend.frames_per_word)
+        if revealed > self.revealed:
+            self.revealed = revealed
+            return ' '.join(self.words[:revealed])
+        return None
+    
+    def finish(self):
+        self.finished = True
+        if not self.text:
+            return None
+        return RecognitionResult(self.text.lower(), self.backend.confidence, self.backend.name)
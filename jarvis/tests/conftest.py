@@ -0,0 +1,9 @@
+"""
+Test setup: the jarvis modules use flat imports (from config import Config),
+so their directory goes on sys.path, as when running them from jarvis/
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,17 @@
+"""Tests for fuzzy intent lookup"""
+
+from actions import IntentIndex
+
+PHRASES = [('open browser', 'open browser'), ('open the browser', 'open browser'),
+           ('play music', 'play music'), ('take a screenshot', 'screenshot')]
+
+
+def test_misheard_command_is_found():
+    assert IntentIndex(PHRASES).search('open brouser')[0].command == 'open browser'
+    assert IntentIndex(PHRASES).search('plate music')[0].command == 'play music'
+
+
+def test_opposite_verb_does_not_match():
+    index = IntentIndex(PHRASES)
+    assert index.search('close browser') == []
+    assert index.search('stop the music') == []
@@ -0,0 +1,95 @@
+"""Tests for the application index behind "open <app>" """
+
+import os
+import stat
+import threading
+
+from app_index import AppIndex, DESKTOP, PATH
+
+
+def _executable(directory, name):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write('#!/bin/sh\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def _desktop(directory, stem, name, exec_line):
+    with open(os.path.join(directory, stem + '.desktop'), 'w') as f:
+        f.write(f"[Desktop Entry]\nType=Application\nName={name}\nExec={exec_line}\n")
+
+
+def _index(tmp_path):
+    bin_dir = tmp_path / 'bin'
+    apps_dir = tmp_path / 'applications'
+    bin_dir.mkdir()
+    apps_dir.mkdir()
+    for name in ['shutdown', 'reboot', 'poweroff', 'halt', 'rm', 'dd', 'mkfs.ext4', 'killall',
+                 'python3', 'bash', 'rhythmbox', 'gimp']:
+        _executable(str(bin_dir), name)
+    _desktop(str(apps_dir), 'org.mozilla.firefox', 'Firefox Web Browser', 'firefox %u')
+    _desktop(str(apps_dir), 'org.gnome.Calculator', 'Calculator', 'gnome-calculator')
+    _desktop(str(apps_dir), 'power', 'Power Off', 'systemctl poweroff')
+    return AppIndex(cache_path=None, desktop=[str(apps_dir)], path=[str(bin_dir)])
+
+
+def test_power_and_destructive_binaries_are_never_found(tmp_path):
+    index = _index(tmp_path)
+    for spoken in ['shut down', 'shutdown', 'reboot', 'rebook', 'power of', 'poweroff', 'power off',
+                   'halt', 'rm', 'dd', 'mkfs ext4', 'kill all', 'python three', 'python3', 'bash']:
+        assert index.find(spoken) is None, spoken
+
+
+def test_path_executables_match_exactly_only(tmp_path):
+    index = _index(tmp_path)
+    assert index.find('gimp').source == PATH
+    assert index.find('gim') is None
+    assert index.find('rhythm box').name == 'rhythmbox'
+    assert index.find('rhythmbux') is None
+
+
+def test_desktop_entries_match_by_prefix_and_fuzzily(tmp_path):
+    index = _index(tmp_path)
+    assert index.find('fire fox').source == DESKTOP
+    assert index.find('calc').name == 'Calculator'
+    assert index.find('calculater').name == 'Calculator'
+
+
+def test_short_keys_need_an_exact_match(tmp_path):
+    index = _index(tmp_path)
+    assert index.find('r') is None
+    assert index.find('ca') is None
+
+
+def test_lookups_stay_consistent_while_other_threads_refresh(tmp_path):
+    index = _index(tmp_path)
+    index.cache_path = str(tmp_path / 'cache' / 'apps.json')
+    index.refresh_interval = 0
+    bin_dir = str(tmp_path / 'bin')
+    errors = []
+    stop = threading.Event()
+    
+    def look_up():
+        while not stop.is_set():
+            try:
+                assert index.find('fire fox').source == DESKTOP
+                assert index.find('gimp').source == PATH
+            except Exception as e:
+                errors.append(e)
+                return
+    
+    threads = [threading.Thread(target=look_up) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for number in range(30):
+        path = _executable(bin_dir, f'tool{number}')
+        index.refresh(force=True)
+        if number % 2:
+            os.remove(path)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert index.stats()['rescans'] > 0
@@ -0,0 +1,83 @@
+"""Tests for noise-floor tracking and segmentation under steady background noise"""
+
+import array
+import random
+
+import pytest
+
+sr = pytest.importorskip('speech_recognition')
+
+from capture import AudioCapture, EnergyVAD, NoiseFloorTracker, frame_rms  # noqa: E402
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 480  # 30 ms
+
+
+def _frames(seconds, rms, rng):
+    """Gaussian noise frames with roughly the given RMS"""
+    for _ in range(int(seconds * 1000 // 30)):
+        yield array.array('h', (max(-32768, min(32767, int(rng.gauss(0, rms))))
+                                for _ in range(FRAME_SAMPLES))).tobytes()
+
+
+class _Stream:
+    def __init__(self, frames):
+        self._frames = iter(frames)
+    
+    def read(self, samples):
+        return next(self._frames, b'')
+
+
+def _capture(recognizer, frames):
+    capture = AudioCapture(source=None, vad=EnergyVAD(recognizer),
+                           noise=NoiseFloorTracker(recognizer), max_segments=100)
+    capture.sample_rate = SAMPLE_RATE
+    capture.sample_width = 2
+    capture._running.set()
+    capture._capture_loop(_Stream(frames), FRAME_SAMPLES)
+    return capture
+
+
+def test_tracker_adapts_to_noise_above_the_initial_threshold():
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 300
+    vad = EnergyVAD(recognizer)
+    tracker = NoiseFloorTracker(recognizer)
+    rng = random.Random(1)
+    
+    speech = []
+    for frame in _frames(5, 600, rng):
+        speech.append(vad.is_speech(frame, SAMPLE_RATE, 2))
+        tracker.update(frame)
+    
+    assert tracker.floor == pytest.approx(600, rel=0.1)
+    assert recognizer.energy_threshold == pytest.approx(900, rel=0.1)
+    assert not any(speech[-100:])
+
+
+def test_tracker_follows_a_step_up_in_noise():
+    recognizer = sr.Recognizer()
+    tracker = NoiseFloorTracker(recognizer)
+    rng = random.Random(2)
+    for frame in _frames(5, 300, rng):
+        tracker.update(frame)
+    for frame in _frames(10, 1200, rng):
+        tracker.update(frame)
+    
+    assert recognizer.energy_threshold == pytest.approx(1800, rel=0.1)
+
+
+def test_steady_noise_is_not_segmented_but_speech_still_is():
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 300
+    rng = random.Random(3)
+    noise = list(_frames(20, 600, rng))
+    burst = list(_frames(1, 6000, rng))
+    tail = list(_frames(2, 600, rng))
+    
+    capture = _capture(recognizer, noise + burst + tail)
+    
+    assert capture.segments_emitted == 1
+    segment = capture.get_segment(timeout=0)
+    assert max(frame_rms(segment.frame_data[i:i + FRAME_SAMPLES * 2])
+               for i in range(0, len(segment.frame_data), FRAME_SAMPLES * 2)) > 3000
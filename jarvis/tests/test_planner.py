@@ -0,0 +1,80 @@
+"""Tests for running command plans on the action executor"""
+
+from executor import ActionExecutor, DONE, FAILED
+from planner import CommandPlanner, SKIPPED, UNRECOGNIZED
+
+
+class _Actions:
+    """Knows 'open browser' and 'take screenshot'; anything else is unrecognized"""
+    
+    COMMANDS = ('open browser', 'take screenshot', 'play music')
+    
+    def __init__(self):
+        self.exclusive = set()
+        self.timeouts = {}
+        self.ran = []
+    
+    def resolve(self, text):
+        text = text.strip().lower()
+        return (text if text in self.COMMANDS else None), None
+    
+    def process_command(self, text):
+        command = self.resolve(text)[0]
+        if command == 'play music':
+            raise ImportError('No module named pygame', name='pygame')  # like Actions._run_plugin
+        if command:
+            self.ran.append(command)
+        return command
+
+
+def _run(text):
+    actions = _Actions()
+    executor = ActionExecutor(workers=2)
+    planner = CommandPlanner(actions, executor)
+    plan = planner.run(planner.plan(text))
+    plan.wait(5)
+    executor.shutdown()
+    return plan, actions
+
+
+def test_recognized_steps_finish_done():
+    plan, actions = _run('open browser and take screenshot')
+    
+    assert plan.succeeded
+    assert [step.state for step in plan.steps] == [DONE, DONE]
+    assert sorted(actions.ran) == ['open browser', 'take screenshot']
+
+
+def test_unrecognized_command_is_not_reported_done():
+    plan, actions = _run('make me a sandwich')
+    
+    assert not plan.succeeded
+    assert plan.steps[0].state == UNRECOGNIZED
+    assert actions.ran == []
+
+
+def test_plugin_missing_a_module_is_reported_failed():
+    plan, _ = _run('play music')
+    
+    assert not plan.succeeded
+    assert plan.steps[0].state == FAILED
+
+
+def test_steps_after_an_unrecognized_one_are_skipped():
+    actions = _Actions()
+    executor = ActionExecutor(workers=2)
+    planner = CommandPlanner(actions, executor)
+    plan = planner.plan('open browser then take screenshot')
+    plan.steps[0].text = 'open the bowser'  # misheard after planning
+    planner.run(plan).wait(5)
+    executor.shutdown()
+    
+    assert [step.state for step in plan.steps] == [UNRECOGNIZED, SKIPPED]
+
+
+def test_report_step_starts_are_relative_to_the_plan():
+    plan, _ = _run('open browser and take screenshot')
+    report = plan.report()
+    
+    for step in report['steps']:
+        assert 0 <= step['start_ms'] <= report['total_ms']
@@ -0,0 +1,154 @@
+"""Tests for hedged and streaming recognition"""
+
+import time
+import array
+from types import SimpleNamespace
+
+import pytest
+
+from recognizers import GrammarBackend, RecognitionCoordinator, RecognitionResult, STTBackend, StreamingDecoder
+
+FRAME = b'\x00\x00' * 480  # 30 ms of silence at 16 kHz
+
+
+class _Backend(STTBackend):
+    def __init__(self, name, delay=0.0, result=None, error=None, available=True):
+        self.name = name
+        self.delay = delay
+        self.result = result
+        self.error = error
+        self.available = available
+        self.calls = 0
+    
+    def is_available(self):
+        return self.available
+    
+    def recognize(self, audio):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_single_available_backend_is_called_without_a_deadline():
+    slow = _Backend('google', delay=0.2, result=RecognitionResult('hello', None, 'google'))
+    offline = _Backend('vosk', available=False)
+    coordinator = RecognitionCoordinator([slow, offline], deadline=0.05)
+    
+    assert coordinator.recognize(object()).text == 'hello'
+    assert offline.calls == 0
+    assert coordinator.stats()['google']['wins'] == 1
+
+
+def test_waits_past_the_deadline_for_the_first_answer():
+    first = _Backend('google', delay=0.15, result=RecognitionResult('hello', 0.3, 'google'))
+    second = _Backend('vosk', delay=0.6, result=RecognitionResult('yellow', 0.9, 'vosk'))
+    coordinator = RecognitionCoordinator([first, second], deadline=0.05)
+    
+    started = time.perf_counter()
+    result = coordinator.recognize(object())
+    
+    assert result.text == 'hello'  # below min_confidence, but the only answer
+    assert time.perf_counter() - started < 0.5
+
+
+def test_all_backends_failing_raises():
+    coordinator = RecognitionCoordinator([_Backend('google', error=OSError('offline')),
+                                          _Backend('vosk', error=OSError('no model'))],
+                                         deadline=1.0)
+    with pytest.raises(OSError):
+        coordinator.recognize(object())
+
+
+def _scripted(*transcripts, **kwargs):
+    pytest.importorskip('speech_recognition')
+    from stt_standin import ScriptedBackend
+    return ScriptedBackend(transcripts, **kwargs)
+
+
+def _utterance(decoder, frames):
+    decoder.speech_started(FRAME, 16000, 2)
+    for _ in range(frames - 1):
+        decoder.speech_frame(FRAME)
+    decoder.speech_ended()
+
+
+def test_partials_are_delivered_while_speaking():
+    partials = []
+    decoder = StreamingDecoder(_scripted('turn the volume up'), on_partial=partials.append)
+    
+    _utterance(decoder, 12)
+    
+    assert decoder.get_result(timeout=2).text == 'turn the volume up'
+    assert partials == ['turn', 'turn the', 'turn the volume', 'turn the volume up']
+
+
+def test_final_result_follows_end_of_speech_silence():
+    backend = _scripted('open browser')
+    from capture import AudioCapture, EnergyVAD
+    
+    loud = array.array('h', [4000, -4000] * 240).tobytes()
+    frames = iter([FRAME] * 10 + [loud] * 20 + [FRAME] * 60)
+    capture = AudioCapture(source=None, vad=EnergyVAD(SimpleNamespace(energy_threshold=300)))
+    decoder = StreamingDecoder(backend)
+    capture.add_listener(decoder)
+    capture.sample_rate = 16000
+    capture.sample_width = 2
+    capture._running.set()
+    capture._capture_loop(SimpleNamespace(read=lambda samples: next(frames, b'')), 480)
+    
+    assert decoder.get_result(timeout=2).text == 'open browser'
+    session = backend.sessions[0]
+    assert session.finished
+    assert session.frames < 20 + 60  # cut at the endpoint, not at the end of the stream
+
+
+def test_each_utterance_gets_a_fresh_session():
+    partials = []
+    backend = _scripted('take a screenshot', 'play music')
+    decoder = StreamingDecoder(backend, on_partial=partials.append)
+    
+    _utterance(decoder, 9)
+    first = decoder.get_result(timeout=2)
+    _utterance(decoder, 6)
+    second = decoder.get_result(timeout=2)
+    
+    assert (first.text, second.text) == ('take a screenshot', 'play music')
+    assert partials[3:] == ['play', 'play music']
+    assert [s.frames for s in backend.sessions] == [9, 6]
+    assert decoder.utterances == 2
+
+
+def test_confident_grammar_result_is_used():
+    grammar = _Backend('grammar-vosk', result=RecognitionResult('open browser', 0.9, 'grammar-vosk'))
+    open_vocabulary = _Backend('google', result=RecognitionResult('open browser please', None, 'google'))
+    backend = GrammarBackend(grammar, open_vocabulary, min_confidence=0.7)
+    
+    assert backend.recognize(object()).backend == 'grammar-vosk'
+    assert open_vocabulary.calls == 0
+    assert backend.stats() == {'accepted': 1, 'fallbacks': 0}
+
+
+def test_unsure_grammar_result_falls_back_to_open_vocabulary():
+    open_vocabulary = _Backend('google', result=RecognitionResult('what time is it', None, 'google'))
+    for unsure in [RecognitionResult('open browser', 0.4, 'grammar-vosk'),
+                   RecognitionResult('[unk] browser', 0.9, 'grammar-vosk'), None]:
+        backend = GrammarBackend(_Backend('grammar-vosk', result=unsure), open_vocabulary, min_confidence=0.7)
+        assert backend.recognize(object()).text == 'what time is it'
+        assert backend.stats() == {'accepted': 0, 'fallbacks': 1}
+
+
+def test_streaming_grammar_session_falls_back_to_the_parallel_session():
+    grammar = _scripted('open browser', confidence=0.3)
+    from stt_standin import ScriptedBackend
+    open_vocabulary = ScriptedBackend(['open the bowser'], name='open')
+    backend = GrammarBackend(grammar, open_vocabulary, min_confidence=0.7)
+    
+    session = backend.session(16000)
+    for _ in range(6):
+        session.accept(FRAME)
+    result = session.finish()
+    
+    assert result.backend == 'open'
+    assert open_vocabulary.sessions[0].frames == 6  # fed alongside, not replayed
@@ -0,0 +1,45 @@
+"""Tests for the speech scheduler's preemption and outcome counters"""
+
+import threading
+
+from speech_queue import ALERT, CHATTER, SpeechScheduler
+
+
+def test_failed_speech_is_not_counted_as_spoken():
+    def speak(text, cancelled):
+        raise RuntimeError('no engine')
+    
+    scheduler = SpeechScheduler(speak)
+    scheduler.submit('hello').wait(2)
+    
+    stats = scheduler.stats()
+    assert stats['failed'] == 1
+    assert stats['spoken'] == 0
+
+
+def test_preempted_request_is_not_played_after_synthesis():
+    synthesizing = threading.Event()
+    synthesized = threading.Event()
+    played = []
+    
+    def speak(text, cancelled):
+        if text == 'long chatter':
+            synthesizing.set()
+            synthesized.wait(2)  # still rendering when the alert arrives
+        if not cancelled():
+            played.append(text)
+    
+    interrupts = []
+    scheduler = SpeechScheduler(speak, interrupt=lambda: interrupts.append(True))
+    chatter = scheduler.submit('long chatter', priority=CHATTER)
+    assert synthesizing.wait(2)
+    alert = scheduler.submit('battery low', priority=ALERT)
+    synthesized.set()
+    
+    assert alert.wait(2)
+    chatter.wait(2)
+    assert played == ['battery low']
+    assert interrupts == [True]
+    stats = scheduler.stats()
+    assert stats['interrupted'] == 1
+    assert stats['spoken'] == 1
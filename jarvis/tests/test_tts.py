@@ -0,0 +1,138 @@
+"""Tests for TTS backend failover and circuit breaking against a local HTTP stand-in"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('gtts')
+
+from tts import BackendRegistry, HTTPBackend, PiperBackend, TTSBackend, TextToSpeech, _read_batch_items  # noqa: E402
+from tts_standin import TTSStandIn  # noqa: E402
+from metrics import Metrics  # noqa: E402
+
+
+class _Offline(TTSBackend):
+    name = 'offline'
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+    
+    def render(self, text, language='en', speed=1.0):
+        self.calls += 1
+        time.sleep(self.delay)
+        return b'RIFF offline'
+
+
+@pytest.fixture
+def standin():
+    server = TTSStandIn().start()
+    yield server
+    server.stop()
+
+
+def _tts(registry, hedge_after=None):
+    """TextToSpeech over a given registry, without loading voices, cache or player"""
+    tts = TextToSpeech.__new__(TextToSpeech)
+    tts.backends = registry
+    tts.cache = None
+    tts.hedge_after = hedge_after
+    tts.metrics = Metrics('test')
+    return tts
+
+
+def _registry(standin, cooldown=30.0, offline=None):
+    registry = BackendRegistry(failure_threshold=2, cooldown=cooldown)
+    remote = registry.register(HTTPBackend(standin.url, timeout=2.0))
+    registry.register(offline or _Offline())
+    return registry, remote
+
+
+def test_fails_over_when_the_server_errors(standin):
+    registry, _ = _registry(standin)
+    tts = _tts(registry)
+    
+    assert tts.synthesize('hello').engine == 'http'
+    standin.failing = True
+    assert tts.synthesize('hello again').engine == 'offline'
+    assert registry.stats()['http']['errors'] == 1
+
+
+def test_circuit_opens_and_skips_the_server(standin):
+    registry, _ = _registry(standin)
+    tts = _tts(registry)
+    standin.failing = True
+    
+    for _ in range(2):
+        tts.synthesize('hello')
+    assert registry.stats()['http']['state'] == 'open'
+    
+    requests = standin.requests
+    assert tts.synthesize('hello').engine == 'offline'
+    assert standin.requests == requests
+
+
+def test_half_open_trial_closes_the_circuit_on_recovery(standin):
+    registry, _ = _registry(standin, cooldown=0.1)
+    tts = _tts(registry)
+    standin.failing = True
+    for _ in range(2):
+        tts.synthesize('hello')
+    
+    time.sleep(0.15)
+    assert registry.stats()['http']['state'] == 'half-open'
+    standin.failing = False
+    assert tts.synthesize('hello').engine == 'http'
+    assert registry.stats()['http']['state'] == 'closed'
+
+
+def test_hedging_leaves_an_unused_half_open_trial(standin):
+    offline = _Offline()
+    registry = BackendRegistry(failure_threshold=1, cooldown=0.05)
+    registry.register(HTTPBackend(standin.url, timeout=2.0))
+    registry.register(offline)
+    registry._health['offline'].record(0.0, False)  # trip the fallback's breaker
+    time.sleep(0.1)
+    assert registry.stats()['offline']['state'] == 'half-open'
+    
+    clip = _tts(registry, hedge_after=1.0).synthesize('hello')
+    
+    assert clip.engine == 'http'
+    assert registry.stats()['offline']['state'] == 'half-open'
+
+
+def test_speak_without_cache_returns_the_clip(standin, tmp_path):
+    registry, _ = _registry(standin)
+    tts = _tts(registry)
+    
+    clip = tts.speak('hello', auto_play=False)
+    assert clip and clip.path is None and clip.data
+    
+    saved = tts.speak('hello', auto_play=False, output_file=str(tmp_path / 'hello.mp3'))
+    assert saved.path == str(tmp_path / 'hello.wav')  # the engine's real format
+    
+    assert _tts(BackendRegistry()).speak('hello', auto_play=False) is None
+
+
+def test_not_ready_after_the_piper_voice_fails_to_load(tmp_path):
+    tts = _tts(BackendRegistry())
+    tts._model_loaded = threading.Event()
+    tts.piper = PiperBackend(str(tmp_path / 'missing.onnx'))
+    assert not tts.is_ready()
+    
+    tts._load_piper()
+    
+    assert tts.wait_for_model(timeout=0)
+    assert not tts.is_ready()
+
+
+def test_batch_lines_without_text_are_reported_and_skipped(tmp_path, capsys):
+    path = tmp_path / 'lines.jsonl'
+    path.write_text('{"text": "hello"}\n{"id": "x"}\nnot json\n{"text": "bye", "id": "b"}\n')
+    
+    items = _read_batch_items(str(path))
+    
+    assert [(item['id'], item['text']) for item in items] == [('1', 'hello'), ('b', 'bye')]
+    out = capsys.readouterr().out
+    assert 'lines.jsonl:2: no "text"' in out and 'lines.jsonl:3: invalid JSON' in out
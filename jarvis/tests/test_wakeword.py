@@ -0,0 +1,138 @@
+"""Tests for the wake word gate and detector selection"""
+
+import sys
+import time
+import types
+from types import SimpleNamespace
+
+from recognizers import VoskBackend
+from wakeword import KeywordDetector, PorcupineDetector, VoskKeywordDetector, WakeWordGate, make_detector
+
+WAKE = b'jarvis'
+
+
+class _Detector(KeywordDetector):
+    """Hears the wake word in any chunk containing b'jarvis'"""
+    
+    name = 'fake'
+    
+    def process(self, pcm):
+        return WAKE in pcm
+
+
+class _Listener:
+    def __init__(self):
+        self.events = []
+    
+    def speech_started(self, audio, sample_rate, sample_width):
+        self.events.append(('started', audio))
+    
+    def speech_frame(self, frame):
+        self.events.append(('frame', frame))
+    
+    def speech_ended(self):
+        self.events.append(('ended', None))
+
+
+def _say(gate, *frames):
+    """One capture segment: the first frame opens it, the rest follow"""
+    gate.speech_started(frames[0], 16000, 2)
+    for frame in frames[1:]:
+        gate.speech_frame(frame)
+    gate.speech_ended()
+    return gate.passes_utterance()
+
+
+def _gate(window=5.0):
+    gate = WakeWordGate(_Detector(), window=window)
+    listener = _Listener()
+    gate.add_listener(listener)
+    return gate, listener
+
+
+def test_wake_word_and_command_in_one_segment_pass():
+    gate, listener = _gate()
+    
+    assert _say(gate, b'hey ', WAKE, b' open browser')
+    
+    # What was said before the wake word is replayed, then the rest streams
+    assert listener.events == [('started', b'hey ' + WAKE), ('frame', b' open browser'), ('ended', None)]
+    assert gate.stats()['passed'] == 1
+
+
+def test_segment_without_wake_word_is_dropped():
+    gate, listener = _gate()
+    
+    assert not _say(gate, b'open ', b'browser')
+    assert listener.events == []
+    assert gate.stats()['rejected'] == 1
+
+
+def test_bare_wake_word_opens_the_window_for_one_command():
+    gate, listener = _gate()
+    
+    _say(gate, WAKE)
+    assert gate.is_open()
+    assert _say(gate, b'open ', b'browser')
+    assert listener.events[-3:] == [('started', b'open '), ('frame', b'browser'), ('ended', None)]
+    
+    assert not gate.is_open()  # one command per wake word
+    assert not _say(gate, b'take a screenshot')
+
+
+def test_window_expires():
+    gate, _ = _gate(window=0.05)
+    
+    _say(gate, WAKE)
+    time.sleep(0.1)
+    
+    assert not gate.is_open()
+    assert not _say(gate, b'open browser')
+
+
+def _config(access_key='key'):
+    return SimpleNamespace(WAKE_WORD='jarvis', WAKE_WORD_ACCESS_KEY=access_key, WAKE_WORD_SENSITIVITY=0.5,
+                           STT_OFFLINE_MODEL=None, STT_SAMPLE_RATE=16000)
+
+
+def _loaded_vosk(monkeypatch):
+    vosk = types.ModuleType('vosk')
+    vosk.KaldiRecognizer = lambda model, rate, grammar=None: SimpleNamespace(model=model, grammar=grammar)
+    monkeypatch.setitem(sys.modules, 'vosk', vosk)
+    backend = VoskBackend(None)
+    backend.model = object()
+    return backend
+
+
+def test_porcupine_is_used_when_configured(monkeypatch):
+    porcupine = types.ModuleType('pvporcupine')
+    porcupine.create = lambda **kwargs: SimpleNamespace(frame_length=512, process=lambda frame: -1)
+    monkeypatch.setitem(sys.modules, 'pvporcupine', porcupine)
+    
+    assert isinstance(make_detector(_config(), _loaded_vosk(monkeypatch)), PorcupineDetector)
+
+
+def test_falls_back_to_vosk_without_porcupine(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pvporcupine', None)  # import raises ImportError
+    
+    detector = make_detector(_config(), _loaded_vosk(monkeypatch))
+    
+    assert isinstance(detector, VoskKeywordDetector)
+    assert detector.keyword == 'jarvis'
+
+
+def test_falls_back_to_vosk_when_porcupine_fails(monkeypatch):
+    def create(**kwargs):
+        raise RuntimeError('invalid access key')
+    
+    porcupine = types.ModuleType('pvporcupine')
+    porcupine.create = create
+    monkeypatch.setitem(sys.modules, 'pvporcupine', porcupine)
+    
+    assert isinstance(make_detector(_config(), _loaded_vosk(monkeypatch)), VoskKeywordDetector)
+
+
+def test_no_detector_without_any_engine(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pvporcupine', None)
+    
+    assert make_detector(_config(), VoskBackend(None)) is None
@@ -1,17 +1,35 @@
 """
-Jarvis TTS Module - Simple gTTS Implementation
-Generates speech from text using Google Text-to-Speech or espeak
+Jarvis TTS Module
+Generates speech from text using a resident Piper voice, with
+Google Text-to-Speech or espeak as fallbacks
 """
 
 import os
+import io
+import re
 import sys
+import json
+import argparse
+import queue
 import time
+import wave
+import struct
+import threading
 import subprocess
+import urllib.parse
+import urllib.request
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from speech_cache import SpeechCache
+from playback import get_player
+from speech_queue import SpeechScheduler, ALERT, RESPONSE, CHATTER
+from metrics import Metrics
+
 try:
     from config import Config
 except ImportError:
@@ -19,113 +37,1024 @@ except ImportError:
         pass
 
 
+# Synthesized audio held in memory: encoded bytes, container extension,
+# producing engine, cached file path and cache key (both None when not cached)
+Clip = namedtuple('Clip', ['data', 'ext', 'engine', 'path', 'key'])
+
+
+def _fix_wav_sizes(data):
+    """
+    Patch RIFF/data chunk sizes in a WAV streamed to a pipe
+    
+    espeak cannot seek back when writing to stdout, so it leaves
+    placeholder sizes that some decoders reject.
+    """
+    pos = data.find(b'data', 12)
+    if data[:4] != b'RIFF' or pos < 0:
+        return data
+    header = bytearray(data[:pos + 8])
+    struct.pack_into('<I', header, 4, len(data) - 8)
+    struct.pack_into('<I', header, pos + 4, len(data) - pos - 8)
+    return bytes(header) + data[pos + 8:]
+
+
+# MPEG audio frame header tables (Layer III only; gTTS emits MPEG-2 L3)
+_MP3_BITRATES = {
+    3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],  # MPEG-1
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],  # MPEG-2/2.5
+}
+_MP3_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def clip_duration(data, ext):
+    """
+    Duration in seconds of an encoded WAV or MP3 clip, without decoding audio
+    
+    Returns:
+        float: Seconds, or None if the format is not understood
+    """
+    if ext == '.wav':
+        try:
+            with wave.open(io.BytesIO(data), 'rb') as wav_file:
+                return wav_file.getnframes() / float(wav_file.getframerate())
+        except (wave.Error, EOFError):
+            return None
+    
+    if ext != '.mp3':
+        return None
+    
+    pos = 0
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = data[6] << 21 | data[7] << 14 | data[8] << 7 | data[9]
+        pos = 10 + size
+    
+    seconds = 0.0
+    while pos + 4 <= len(data):
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        version = (b1 >> 3) & 0x3  # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+        if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0 or version == 1 or (b1 >> 1) & 0x3 != 1:
+            pos += 1  # not a Layer III frame sync; resync
+            continue
+        bitrate_idx, rate_idx = b2 >> 4, (b2 >> 2) & 0x3
+        if bitrate_idx in (0, 15) or rate_idx == 3:
+            pos += 1
+            continue
+        bitrate = _MP3_BITRATES[3 if version == 3 else 2][bitrate_idx] * 1000
+        rate = _MP3_RATES[version][rate_idx]
+        samples = 1152 if version == 3 else 576
+        seconds += samples / rate
+        pos += samples // 8 * bitrate // rate + ((b2 >> 1) & 0x1)
+    return seconds or None
+
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+
+def split_sentences(text, min_chars=20, max_chars=200):
+    """
+    Split text into sentence-sized chunks for streaming synthesis
+    
+    Fragments shorter than min_chars are merged into the next chunk so
+    playback is not choppy; sentences longer than max_chars are split
+    again at clause punctuation.
+    
+    Returns:
+        list: Non-empty text chunks in speaking order
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if len(sentence) > max_chars:
+            pieces.extend(_CLAUSE_END.split(sentence))
+        elif sentence:
+            pieces.append(sentence)
+    
+    chunks = []
+    pending = ''
+    for piece in pieces:
+        pending = f"{pending} {piece}" if pending else piece
+        if len(pending) >= min_chars:
+            chunks.append(pending)
+            pending = ''
+    if pending:
+        if chunks:
+            chunks[-1] = f"{chunks[-1]} {pending}"
+        else:
+            chunks.append(pending)
+    return chunks
+
+
+class TTSBackend:
+    """A speech synthesis engine that renders text to encoded audio bytes"""
+    
+    name = None
+    ext = '.wav'
+    offline = True  # no network round trip
+    
+    def is_available(self):
+        """False while the engine cannot be used at all (e.g. model not loaded)"""
+        return True
+    
+    def voice_id(self):
+        """Voice component of the cache key (None = engine default voice)"""
+        return None
+    
+    def render(self, text, language='en', speed=1.0):
+        """
+        Synthesize text
+        
+        Returns:
+            bytes: Encoded audio; raises or returns None on failure
+        """
+        raise NotImplementedError
+
+
+class PiperBackend(TTSBackend):
+    """Piper voice loaded once and kept resident in-process"""
+    
+    name = 'piper'
+    
+    def __init__(self, model_path, use_gpu=False):
+        self.model_path = model_path
+        self.use_gpu = use_gpu
+        self.voice = None
+    
+    def load(self):
+        """Load the ONNX voice (slow; call from a background thread)"""
+        try:
+            if not self.model_path or not os.path.exists(self.model_path):
+                print(f"[TTS] Piper voice not found ({self.model_path}), using fallbacks")
+                return False
+            
+            from piper import PiperVoice
+            started = time.perf_counter()
+            self.voice = PiperVoice.load(self.model_path, use_cuda=self.use_gpu)
+            elapsed = time.perf_counter() - started
+            print(f"[TTS] ✅ Ready (Piper: {os.path.basename(self.model_path)}, loaded in {elapsed:.1f}s)")
+            return True
+            
+        except ImportError:
+            print(f"[TTS] piper-tts not installed, using fallbacks")
+        except Exception as e:
+            print(f"[WARNING] Piper voice failed to load: {e}, using fallbacks")
+        return False
+    
+    def is_available(self):
+        return self.voice is not None
+    
+    def voice_id(self):
+        return self.model_path
+    
+    def render(self, text, language='en', speed=1.0):
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            self.voice.synthesize(text, wav_file, length_scale=1.0 / speed)
+        return buffer.getvalue()
+
+
+class GTTSBackend(TTSBackend):
+    """Google Text-to-Speech (network); speed is not supported"""
+    
+    name = 'gtts'
+    ext = '.mp3'
+    offline = False
+    
+    def __init__(self, timeout=5.0):
+        self.timeout = timeout
+    
+    def render(self, text, language='en', speed=1.0):
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=language, slow=False, timeout=self.timeout).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """espeak subprocess writing WAV to stdout"""
+    
+    name = 'espeak'
+    
+    def render(self, text, language='en', speed=1.0):
+        result = subprocess.run(
+            ['espeak', '--stdout', '-s', str(int(175 * speed)), text],
+            capture_output=True,
+            timeout=10
+        )
+        if result.returncode != 0 or not result.stdout:
+            raise RuntimeError(result.stderr.decode(errors='replace').strip() or 'no audio')
+        return _fix_wav_sizes(result.stdout)
+
+
+class HTTPBackend(TTSBackend):
+    """
+    Remote TTS server answering GET <url>?text=... with a WAV body
+    
+    Matches `python -m piper.http_server`, and doubles as the hook for
+    exercising the registry against a local stand-in server
+    (tts_standin.TTSStandIn).
+    """
+    
+    offline = False
+    
+    def __init__(self, url, timeout=5.0, name='http', ext='.wav'):
+        self.url = url
+        self.timeout = timeout
+        self.name = name
+        self.ext = ext
+    
+    def voice_id(self):
+        return self.url
+    
+    def render(self, text, language='en', speed=1.0):
+        query = urllib.parse.urlencode({'text': text})
+        with urllib.request.urlopen(f"{self.url}?{query}", timeout=self.timeout) as response:
+            return response.read()
+
+
+class BackendHealth:
+    """Rolling latency/error window plus circuit-breaker state for one backend"""
+    
+    def __init__(self, window=50, failure_threshold=3, cooldown=30.0):
+        self.samples = deque(maxlen=window)  # (latency seconds, ok)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """
+        Decide whether the backend may be called now
+        
+        While the circuit is open calls are skipped; once the cool-down
+        has passed a single trial call is let through (half-open).
+        """
+        with self._lock:
+            if self.consecutive_failures < self.failure_threshold:
+                return True
+            now = time.monotonic()
+            if now < self.open_until:
+                return False
+            self.open_until = now + self.cooldown  # one trial at a time
+            return True
+    
+    def record(self, latency, ok):
+        with self._lock:
+            self.samples.append((latency, ok))
+            if ok:
+                self.consecutive_failures = 0
+                self.open_until = 0.0
+            else:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.failure_threshold:
+                    self.open_until = time.monotonic() + self.cooldown
+    
+    def state(self):
+        """'closed' (healthy), 'open' (skipped) or 'half-open' (trial allowed)"""
+        with self._lock:
+            if self.consecutive_failures < self.failure_threshold:
+                return 'closed'
+            return 'open' if time.monotonic() < self.open_until else 'half-open'
+    
+    def summary(self):
+        with self._lock:
+            samples = list(self.samples)
+        latencies = sorted(latency for latency, ok in samples if ok)
+        errors = sum(1 for _, ok in samples if not ok)
+        
+        def pct(q):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1)
+        
+        return {
+            'calls': len(samples),
+            'errors': errors,
+            'error_rate': errors / len(samples) if samples else 0.0,
+            'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95),
+            'state': self.state(),
+        }
+
+
+class BackendRegistry:
+    """Ordered TTS backends with per-backend health tracking and circuit breaking"""
+    
+    def __init__(self, failure_threshold=3, cooldown=30.0, window=50, metrics=None):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.window = window
+        self.metrics = metrics
+        self._backends = []
+        self._health = {}
+    
+    def register(self, backend, position=None):
+        """Add a backend; position None appends it as the last fallback"""
+        if position is None:
+            self._backends.append(backend)
+        else:
+            self._backends.insert(position, backend)
+        self._health[backend.name] = BackendHealth(
+            self.window, self.failure_threshold, self.cooldown
+        )
+        return backend
+    
+    def get(self, name):
+        for backend in self._backends:
+            if backend.name == name:
+                return backend
+        return None
+    
+    def __iter__(self):
+        return iter(list(self._backends))
+    
+    def allow(self, backend):
+        """False while the backend's circuit is open"""
+        return self._health[backend.name].allow()
+    
+    def call(self, backend, text, language='en', speed=1.0):
+        """
+        Render through a backend, recording latency and outcome
+        
+        Returns:
+            bytes: Encoded audio, or None on failure
+        """
+        started = time.perf_counter()
+        try:
+            data = backend.render(text, language, speed)
+        except Exception as e:
+            print(f"[WARNING] {backend.name} failed: {e}")
+            data = None
+        ok = bool(data)
+        elapsed = time.perf_counter() - started
+        self._health[backend.name].record(elapsed, ok)
+        if self.metrics and ok:
+            self.metrics.observe('synthesis', elapsed, backend.name)
+        if not ok and self._health[backend.name].state() == 'open':
+            print(f"[TTS] {backend.name} circuit open for {self.cooldown:g}s")
+        return data
+    
+    def stats(self):
+        """
+        Per-backend rolling stats
+        
+        Returns:
+            dict: name -> calls, errors, error_rate, p50_ms, p95_ms, state
+        """
+        return {b.name: self._health[b.name].summary() for b in self._backends}
+
+
 class TextToSpeech:
-    """Simple TTS using gTTS"""
+    """TTS over a registry of backends: resident Piper, then gTTS, then espeak"""
+    
+    # Rendered sentences buffered ahead of playback in streaming mode
+    STREAM_QUEUE_SIZE = 3
     
-    def __init__(self, voice_sample_path=None, use_gpu=None):
-        """Initialize TTS"""
+    def __init__(self, voice_sample_path=None, use_gpu=None, piper_model=None, use_cache=None):
+        """
+        Initialize TTS
+        
+        The Piper voice is loaded once in a background thread and stays
+        resident; until it is ready, speech falls back to gTTS/espeak.
+        
+        Args:
+            voice_sample_path: Reference voice file (cache key component)
+            use_gpu: Run Piper inference on CUDA
+            piper_model: Piper .onnx voice (defaults to Config.PIPER_MODEL)
+            use_cache: Use the shared speech cache (defaults to Config.TTS_CACHE_ENABLED)
+        """
         self.config = Config()
         self.voice_sample_path = voice_sample_path
-        print(f"[TTS] ✅ Ready (gTTS)")
+        self._model_loaded = threading.Event()
+        self._phrase_bank = []
+        self._prerender_generation = 0
+        
+        # Per-stage latency histograms, dumped periodically to Config.LOG_DIR
+        self.metrics = Metrics('tts')
+        self.metrics.start_periodic_dump(
+            getattr(self.config, 'LOG_DIR', None),
+            getattr(self.config, 'METRICS_DUMP_INTERVAL', 60.0)
+        )
+        
+        # Latency budget (seconds) before hedging with an offline engine
+        self.hedge_after = getattr(self.config, 'TTS_HEDGE_AFTER', None)
+        timeout = getattr(self.config, 'TTS_NETWORK_TIMEOUT', 5.0)
+        
+        self.backends = BackendRegistry(
+            failure_threshold=getattr(self.config, 'TTS_BREAKER_FAILURES', 3),
+            cooldown=getattr(self.config, 'TTS_BREAKER_COOLDOWN', 30.0),
+            metrics=self.metrics
+        )
+        self.piper = self.backends.register(PiperBackend(
+            piper_model or getattr(self.config, 'PIPER_MODEL', None),
+            use_gpu=bool(use_gpu)
+        ))
+        http_url = getattr(self.config, 'TTS_HTTP_URL', None)
+        if http_url:
+            self.backends.register(HTTPBackend(http_url, timeout=timeout))
+        self.backends.register(GTTSBackend(timeout=timeout))
+        self.backends.register(EspeakBackend())
+        
+        # Serializes say() calls from any thread
+        self.scheduler = SpeechScheduler(
+            self.speak,
+            interrupt=lambda: get_player().stop(),
+            max_pending=getattr(self.config, 'TTS_QUEUE_MAX_PENDING', 8),
+            stale_after=getattr(self.config, 'TTS_QUEUE_STALE_AFTER', 10.0),
+            metrics=self.metrics
+        )
+        
+        self.cache = None
+        if use_cache is None:
+            use_cache = getattr(self.config, 'TTS_CACHE_ENABLED', True)
+        if use_cache:
+            self.cache = SpeechCache(
+                getattr(self.config, 'TTS_CACHE_DIR', '/tmp/jarvis_speech_cache'),
+                max_bytes=getattr(self.config, 'TTS_CACHE_MAX_MB', 200) * 1024 * 1024
+            )
+        
+        threading.Thread(target=self._load_piper, daemon=True).start()
+    
+    def _load_piper(self):
+        """Load the Piper ONNX voice once; runs on a background thread"""
+        try:
+            self.piper.load()
+        finally:
+            self._model_loaded.set()
     
     def wait_for_model(self, timeout=300):
-        """No waiting needed"""
-        pass
+        """
+        Wait for the Piper voice to finish loading
+        
+        Returns:
+            bool: True once loading has finished, successfully or not;
+                  is_ready() tells which
+        """
+        return self._model_loaded.wait(timeout)
     
     def speak(self, text, speaker_wav=None, language='en', speed=1.0, 
-              output_file=None, auto_play=True):
+              output_file=None, auto_play=True, stream=False, cancelled=None):
         """
-        Generate speech using gTTS (or espeak as fallback)
+        Generate speech using Piper (gTTS, then espeak as fallbacks)
+        
+        Identical requests are served from the speech cache without
+        re-synthesizing. With stream=True (and no output_file) the text
+        is spoken sentence by sentence: playback starts as soon as the
+        first sentence is rendered while the rest render in the background.
         
         Args:
             text: Text to speak
-            speaker_wav: Ignored (gTTS doesn't need voice file)
+            speaker_wav: Ignored (voices are chosen at construction)
             language: Language code
-            speed: Ignored (gTTS doesn't support speed control)
-            output_file: Save audio to file
+            speed: Speaking rate (Piper and espeak; gTTS and the HTTP backend ignore it)
+            output_file: Also write the audio to this file (opt-in)
             auto_play: Play after generation
+            stream: Pipeline synthesis and playback per sentence
+            cancelled: Optional callable; once it returns True nothing more
+                is played (set by the speech scheduler on preemption)
             
         Returns:
-            Path to generated audio file
+            Clip on success, whose path is output_file, else the cached
+            clip, else None (spoken from memory with the cache disabled);
+            None on failure. A list of the played Clips when streaming.
         """
+        if stream and auto_play and not output_file:
+            return self.speak_streaming(text, language=language, speed=speed, cancelled=cancelled)
+        
         try:
-            if not output_file:
-                output_file = f"/tmp/jarvis_speech_{int(time.time() * 1000)}.mp3"
-            
+            started = time.perf_counter()
             text_preview = text[:50] + "..." if len(text) > 50 else text
             print(f"[TTS] Generating: '{text_preview}'")
             
-            # Try gTTS first
-            try:
-                tts = gTTS(text=text, lang='en', slow=False)
-                tts.save(output_file)
-                print(f"[TTS] ✅ Generated: {output_file}")
-                
-                if auto_play:
-                    self.play_audio(output_file)
-                
-                return output_file
-                
-            except Exception as e:
-                print(f"[WARNING] gTTS failed: {e}, trying espeak...")
+            clip = self.synthesize(text, language=language, speed=speed)
             
-            # Fallback to espeak (offline)
-            import subprocess
-            wav_output = output_file.replace('.mp3', '.wav')
-            result = subprocess.run(
-                ['espeak', '-w', wav_output, text],
-                capture_output=True,
-                timeout=10
-            )
+            if clip is None:
+                print(f"[ERROR] All TTS engines failed")
+                return None
             
-            if result.returncode == 0 and os.path.exists(wav_output):
-                print(f"[TTS] ✅ Generated (espeak): {wav_output}")
-                
-                if auto_play:
-                    self.play_audio(wav_output)
-                
-                return wav_output
+            if output_file:
+                # Keep the caller's name but the engine's real container format
+                output_file = os.path.splitext(output_file)[0] + clip.ext
+                with self.metrics.timer('file_write', clip.engine):
+                    with open(output_file, 'wb') as f:
+                        f.write(clip.data)
+                clip = clip._replace(path=output_file)
             
-            print(f"[ERROR] Both gTTS and espeak failed")
-            return None
+            if auto_play and cancelled and cancelled():
+                print("[TTS] Preempted before playback")
+            elif auto_play:
+                self.play_audio(
+                    clip.data, key=clip.key,
+                    on_done=lambda u: self._observe_playback(u, started, clip.engine)
+                )
+            
+            return clip
             
         except Exception as e:
             print(f"[ERROR] TTS error: {e}")
             return None
     
-    @staticmethod
-    def play_audio(file_path, blocking=True):
-        """Play audio file"""
-        if not os.path.exists(file_path):
-            print(f"[ERROR] Audio file not found: {file_path}")
+    def speak_streaming(self, text, language='en', speed=1.0, cancelled=None):
+        """
+        Speak text with sentence-level pipelining
+        
+        The first sentence is synthesized on the calling thread and played
+        immediately; a producer thread renders the remaining sentences into
+        a bounded queue so time-to-first-sound is roughly the cost of the
+        first sentence. Once cancelled() returns True no further sentence
+        is played.
+        
+        Returns:
+            list: Clips that were played
+        """
+        sentences = split_sentences(text)
+        if not sentences:
+            return []
+        
+        print(f"[TTS] Streaming {len(sentences)} sentence(s)")
+        started = time.perf_counter()
+        rendered = queue.Queue(maxsize=self.STREAM_QUEUE_SIZE)
+        done = object()
+        
+        aborted = threading.Event()
+        
+        def produce():
+            try:
+                for sentence in sentences[1:]:
+                    if aborted.is_set():
+                        break
+                    rendered.put(self.synthesize(sentence, language=language, speed=speed))
+            finally:
+                rendered.put(done)
+        
+        first_clip = self.synthesize(sentences[0], language=language, speed=speed)
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        
+        played = []
+        handles = []
+        clip = first_clip
+        while clip is not done:
+            if clip is None:
+                print(f"[WARNING] Skipping a sentence that failed to synthesize")
+            elif cancelled and cancelled():
+                aborted.set()
+            elif not aborted.is_set():
+                # Keep at most one clip queued behind the one playing;
+                # a stop() on the player cancels the rest of the response
+                if len(handles) >= 2 and not handles[-2].wait():
+                    aborted.set()
+                else:
+                    handle = self.play_audio(
+                        clip.data, blocking=False, key=clip.key,
+                        on_done=lambda u, engine=clip.engine, first=not handles:
+                            self._observe_playback(u, started if first else None, engine)
+                    )
+                    if handle is None:
+                        aborted.set()
+                    else:
+                        handles.append(handle)
+                        played.append(clip)
+            clip = rendered.get()
+        
+        if handles and not aborted.is_set():
+            handles[-1].wait()
+        producer.join()
+        return played
+    
+    def synthesize(self, text, language='en', speed=1.0):
+        """
+        Render text to audio bytes in memory without playing it
+        
+        Cached clips from any backend are used before trying the network.
+        Otherwise backends are tried in registry order, skipping those whose
+        circuit is open; with a hedge_after budget, a slow primary is raced
+        against an offline backend. The first success is cached.
+        
+        Returns:
+            Clip: (data, ext, engine, path, key) or None if every backend
+            failed; path and key are None when the cache is disabled
+        """
+        backends = list(self.backends)
+        
+        if self.cache:
+            for backend in backends:
+                key = self._cache_key(backend, text, language, speed)
+                if self.cache.contains(key):
+                    with self.metrics.timer('cache_load', backend.name):
+                        path, data = self.cache.load(key)
+                    if path:
+                        print(f"[TTS] ✅ Cache hit ({backend.name}): {os.path.basename(path)}")
+                        return Clip(data, backend.ext, backend.name, path, key)
+        
+        usable = [b for b in backends if b.is_available()]
+        if self.hedge_after and len(usable) > 1:
+            return self._synthesize_hedged(usable, text, language, speed)
+        
+        for backend in usable:
+            if not self.backends.allow(backend):
+                continue
+            clip = self._render(backend, text, language, speed)
+            if clip:
+                return clip
+        
+        return None
+    
+    def _synthesize_hedged(self, usable, text, language, speed):
+        """
+        Start the primary backend; if it hasn't answered within hedge_after
+        seconds, also start the first offline fallback and take whichever
+        succeeds first. The loser keeps running and still fills the cache.
+        
+        A backend's circuit is only consulted when it is about to be
+        called, so a half-open backend's single trial isn't used up by a
+        request that never reaches it.
+        """
+        def dispatch(candidates):
+            return next((b for b in candidates if self.backends.allow(b)), None)
+        
+        primary = dispatch(usable)
+        if primary is None:
+            return None
+        rest = usable[usable.index(primary) + 1:]
+        hedges = [b for b in rest if b.offline] + [b for b in rest if not b.offline]
+        
+        results = queue.Queue()
+        
+        def run(backend):
+            results.put(self._render(backend, text, language, speed))
+        
+        threading.Thread(target=run, args=(primary,), daemon=True).start()
+        pending = 1
+        try:
+            clip = results.get(timeout=self.hedge_after)
+            pending = 0
+            if clip:
+                return clip
+        except queue.Empty:
+            pass
+        
+        hedge = dispatch(hedges)
+        if pending:
+            print(f"[TTS] {primary.name} over {self.hedge_after}s budget, hedging with {hedge.name if hedge else 'nothing'}")
+        if hedge:
+            threading.Thread(target=run, args=(hedge,), daemon=True).start()
+            pending += 1
+        while pending:
+            clip = results.get()
+            pending -= 1
+            if clip:
+                return clip
+        
+        for backend in rest:
+            if backend is not hedge and self.backends.allow(backend):
+                clip = self._render(backend, text, language, speed)
+                if clip:
+                    return clip
+        return None
+    
+    def _cache_key(self, backend, text, language, speed):
+        voice = backend.voice_id() or self.voice_sample_path
+        return SpeechCache.make_key(text, language, voice, backend.name, speed)
+    
+    def _render(self, backend, text, language, speed):
+        """Render through one backend (via the cache when enabled)"""
+        render = lambda: self.backends.call(backend, text, language, speed)
+        if self.cache:
+            key = self._cache_key(backend, text, language, speed)
+            path, data = self.cache.get_or_create(key, render, backend.ext)
+        else:
+            key, path, data = None, None, render()
+        
+        if not data:
+            return None
+        print(f"[TTS] ✅ Generated ({backend.name}): {len(data)} bytes")
+        return Clip(data, backend.ext, backend.name, path, key)
+    
+    def _observe_playback(self, utterance, requested_at, engine):
+        """
+        Record decode, time-to-first-audio and playback stages for a clip
+        
+        Args:
+            utterance: Finished playback handle carrying the player's timings
+            requested_at: perf_counter() when speech was requested, or None
+                for clips after the first of a streamed response
+            engine: Backend that produced the clip
+        """
+        if utterance.decode_seconds is not None:
+            self.metrics.observe('decode', utterance.decode_seconds, engine)
+        if utterance.started_at is None:
+            return
+        if requested_at is not None:
+            self.metrics.observe('time_to_first_audio', utterance.started_at - requested_at, engine)
+        if not utterance.cancelled:
+            self.metrics.observe('playback', utterance.finished_at - utterance.started_at, engine)
+    
+    def latency_stats(self):
+        """
+        Per-stage latency histograms (queue_wait, synthesis, cache_load,
+        decode, time_to_first_audio, playback, file_write)
+        
+        Returns:
+            dict: stage -> backend -> count/mean/p50/p95/p99/max in ms
+        """
+        return self.metrics.snapshot()
+    
+    def backend_stats(self):
+        """Rolling latency/error stats and circuit state per backend"""
+        return self.backends.stats()
+    
+    def prerender(self, phrases, language='en', speed=1.0):
+        """
+        Render a bank of fixed phrases into the speech cache in the background
+        
+        Runs on a low-priority daemon thread after the Piper voice has
+        loaded, so canned phrases play straight from the cache later (already
+        decoded to the player's canonical PCM). Each
+        phrase is rendered whole and, if longer than one sentence, per
+        sentence for streaming playback. A later call (e.g. after a voice
+        change) supersedes a run still in progress.
+        
+        Args:
+            phrases: Iterable of phrase strings
+            
+        Returns:
+            threading.Thread: The worker (already started), or None when
+            the speech cache is disabled
+        """
+        self._phrase_bank = list(phrases)
+        if not self.cache:
+            print(f"[WARNING] Speech cache disabled, skipping phrase pre-rendering")
+            return None
+        
+        self._prerender_generation += 1
+        generation = self._prerender_generation
+        
+        texts = []
+        for phrase in self._phrase_bank:
+            texts.append(phrase)
+            chunks = split_sentences(phrase)
+            if len(chunks) > 1:
+                texts.extend(chunks)
+        
+        def work():
+            try:
+                # Linux schedules threads individually; a no-op elsewhere
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+            except (AttributeError, OSError):
+                pass
+            
+            self.wait_for_model()
+            rendered = 0
+            for text in texts:
+                if generation != self._prerender_generation:
+                    return  # superseded by a newer voice/bank
+                clip = self.synthesize(text, language=language, speed=speed)
+                if clip:
+                    rendered += 1
+                    self._preload(clip)
+            print(f"[TTS] ✅ Phrase bank ready ({rendered}/{len(texts)} clips)")
+        
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+        return worker
+    
+    def _preload(self, clip):
+        """Decode a clip into the player's PCM store ahead of its first playback"""
+        if not clip.key:
             return
+        try:
+            get_player().preload(clip.data, clip.key)
+        except Exception as e:
+            print(f"[WARNING] PCM preload failed: {e}")
+    
+    def playback_stats(self):
+        """Decode vs zero-decode (PCM store) playback counters"""
+        return get_player().stats()
+    
+    def cache_stats(self):
+        """Speech cache hit/miss counters (empty when the cache is disabled)"""
+        return self.cache.stats() if self.cache else {}
+    
+    @staticmethod
+    def play_audio(source, blocking=True, key=None, on_done=None):
+        """
+        Play an audio file or in-memory encoded clip on the shared playback engine
+        
+        Args:
+            source: File path or encoded audio bytes
+            blocking: Wait for playback to finish
+            key: Clip cache key; keyed clips are decoded once and replayed as PCM
+            on_done: Optional callback(utterance) when playback ends
+        
+        Returns:
+            Utterance handle to wait on, or None if playback is unavailable
+        """
+        if isinstance(source, str) and not os.path.exists(source):
+            print(f"[ERROR] Audio file not found: {source}")
+            return None
         
         try:
-            import pygame
-            pygame.mixer.init()
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
+            utterance = get_player().enqueue(source, on_done=on_done, key=key)
             
-            if blocking:
-                while pygame.mixer.music.get_busy():
-                    time.sleep(0.1)
+            if blocking and utterance.wait():
+                print(f"[TTS] ✅ Playback finished")
             
-            print(f"[TTS] ✅ Playback finished")
+            return utterance
             
         except Exception as e:
             print(f"[ERROR] Playback error: {e}")
+            return None
+    
+    def say(self, text, priority=RESPONSE, timeout=None, **kwargs):
+        """
+        Queue text on the speech scheduler instead of speaking on this thread
+        
+        Args:
+            text: Text to speak
+            priority: ALERT, RESPONSE or CHATTER (alerts interrupt lower priorities)
+            timeout: Max seconds to block when the queue is full
+            **kwargs: Passed through to speak()
+            
+        Returns:
+            SpeechRequest: Handle to wait on
+        """
+        return self.scheduler.submit(text, priority=priority, timeout=timeout, **kwargs)
+    
+    def stop(self):
+        """Interrupt the current utterance and drop queued speech"""
+        self.scheduler.clear()
+        get_player().stop()
     
     def set_voice_sample(self, voice_path):
-        """Set voice file (not used with gTTS)"""
+        """Set voice file; the phrase bank is re-rendered for the new voice"""
         if os.path.exists(voice_path):
             self.voice_sample_path = voice_path
             print(f"[TTS] Voice set: {os.path.basename(voice_path)}")
+            if self._phrase_bank:
+                self.prerender(self._phrase_bank)
             return True
         else:
             print(f"[ERROR] Voice file not found: {voice_path}")
             return False
     
     def is_ready(self):
-        """Always ready"""
+        """
+        True once the Piper voice has loaded
+        
+        False while it is still loading and after it failed to load; speech
+        then goes to the fallback engines (see wait_for_model).
+        """
+        return self._model_loaded.is_set() and self.piper_ready()
+    
+    def piper_ready(self):
+        """True when the resident Piper voice is loaded and used for synthesis"""
+        return self.piper.is_available()
+
+
+def _read_batch_items(path):
+    """
+    Load utterances from a text file (one per line) or JSONL
+    
+    JSONL lines are objects with "text" and optional "id", "language", "speed";
+    lines that aren't are reported with their line number and skipped.
+    """
+    items = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith('.jsonl'):
+                try:
+                    item = json.loads(line)
+                except ValueError as e:
+                    print(f"[WARNING] {path}:{number}: invalid JSON ({e}), skipped")
+                    continue
+                if not isinstance(item, dict) or not item.get('text'):
+                    print(f"[WARNING] {path}:{number}: no \"text\", skipped")
+                    continue
+            else:
+                item = {'text': line}
+            item.setdefault('id', str(number))
+            items.append(item)
+    return items
+
+
+def _load_manifest(path):
+    """Manifest records by text hash; skips a torn final line"""
+    records = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                records[record['hash']] = record
+    return records
+
+
+def render_batch(input_path, output_dir, jobs=None, language='en', speed=1.0, use_cache=False):
+    """
+    Render many utterances into output_dir in parallel
+    
+    Each clip is written as <hash><ext>, and manifest.jsonl records
+    hash -> file, engine, duration and render time. The hash covers the
+    primary engine and its voice model, so switching either re-renders.
+    Repeated utterances are rendered once. Items already in the manifest
+    (with their file present, from the same engine) are skipped, so an
+    interrupted run resumes where it stopped.
+    
+    Args:
+        use_cache: Read and fill the shared speech cache; off by default so
+            a large batch doesn't evict the interactive phrases
+    
+    Returns:
+        dict: rendered, skipped, duplicates, failed counts
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, 'manifest.jsonl')
+    done = _load_manifest(manifest_path)
+    
+    tts = TextToSpeech(use_cache=use_cache)
+    tts.wait_for_model()
+    primary = next(backend for backend in tts.backends if backend.is_available())
+    
+    todo = []
+    seen = set()
+    skipped = duplicates = 0
+    for item in _read_batch_items(input_path):
+        item.setdefault('language', language)
+        item.setdefault('speed', speed)
+        item['hash'] = tts._cache_key(primary, item['text'], item['language'], item['speed'])[:16]
+        if item['hash'] in seen:
+            duplicates += 1
+            continue
+        seen.add(item['hash'])
+        record = done.get(item['hash'])
+        if (record and record.get('engine') == primary.name
+                and os.path.exists(os.path.join(output_dir, record['file']))):
+            skipped += 1
+        else:
+            todo.append(item)
+    
+    print(f"[TTS] Batch: {len(todo)} to render, {skipped} already done, {duplicates} duplicates")
+    manifest_lock = threading.Lock()
+    
+    def render(item):
+        started = time.perf_counter()
+        clip = tts.synthesize(item['text'], language=item['language'], speed=item['speed'])
+        if clip is None:
+            return False
+        render_ms = (time.perf_counter() - started) * 1000
+        
+        file_name = item['hash'] + clip.ext
+        with open(os.path.join(output_dir, file_name), 'wb') as f:
+            f.write(clip.data)
+        
+        record = {
+            'id': item['id'],
+            'hash': item['hash'],
+            'text': item['text'],
+            'file': file_name,
+            'engine': clip.engine,
+            'duration': clip_duration(clip.data, clip.ext),
+            'render_ms': round(render_ms, 1),
+        }
+        with manifest_lock:
+            with open(manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
         return True
+    
+    with ThreadPoolExecutor(max_workers=jobs or min(8, (os.cpu_count() or 1) * 2)) as pool:
+        results = list(pool.map(render, todo))
+    
+    rendered = sum(results)
+    summary = {'rendered': rendered, 'skipped': skipped, 'duplicates': duplicates,
+               'failed': len(results) - rendered}
+    print(f"[TTS] ✅ Batch finished: {summary}")
+    return summary
+
+
+def main(argv=None):
+    """Command line entry point: python -m jarvis.tts batch <input> -o <dir>"""
+    parser = argparse.ArgumentParser(prog='python -m jarvis.tts', description='Jarvis TTS tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    batch = commands.add_parser('batch', help='Render a text/JSONL file of utterances to a directory')
+    batch.add_argument('input', help='Text file (one utterance per line) or .jsonl')
+    batch.add_argument('-o', '--output-dir', required=True, help='Directory for clips and manifest.jsonl')
+    batch.add_argument('-j', '--jobs', type=int, default=None, help='Parallel renders')
+    batch.add_argument('--language', default='en')
+    batch.add_argument('--speed', type=float, default=1.0)
+    batch.add_argument('--use-cache', action='store_true',
+                       help='Read and fill the shared speech cache (default: bypass it)')
+    
+    args = parser.parse_args(argv)
+    summary = render_batch(args.input, args.output_dir, jobs=args.jobs,
+                           language=args.language, speed=args.speed, use_cache=args.use_cache)
+    return 1 if summary['failed'] else 0
+
 
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+TTS Stand-in Module
+Local HTTP server answering HTTPBackend requests (GET ?text=...) with a
+WAV body, so failover and circuit breaking can be exercised offline
+"""
+
+import io
+import time
+import wave
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class TTSStandIn:
+    """
+    Answers synthesis requests from HTTPBackend(standin.url)
+    
+    Each request gets a short silent WAV (50 ms per character), or an
+    HTTP 500 while failing is set, which stands in for a remote voice
+    server going down and coming back.
+    """
+    
+    def __init__(self, latency=0.0, sample_rate=16000, host='127.0.0.1', port=0):
+        """
+        Args:
+            latency: Seconds added to every response to simulate the network
+            sample_rate: Sample rate of the returned audio
+            host: Interface to bind
+            port: Port to bind (0 = any free port)
+        """
+        self.latency = latency
+        self.sample_rate = sample_rate
+        self.failing = False
+        self.requests = 0
+        self.texts = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/synthesize"
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def answer(self, text):
+        """
+        WAV body for one request
+        
+        Raises:
+            RuntimeError: While failing is set
+        """
+        with self._lock:
+            self.requests += 1
+            self.texts.append(text)
+            if self.failing:
+                raise RuntimeError('stand-in is failing')
+        
+        frames = int(self.sample_rate * 0.05 * max(1, len(text)))
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b'\x00\x00' * frames)
+        return buffer.getvalue()
+    
+    def _handler(self):
+        standin = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                if standin.latency:
+                    time.sleep(standin.latency)
+                try:
+                    payload = standin.answer(query.get('text', [''])[0])
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/wav')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
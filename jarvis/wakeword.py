@@ -0,0 +1,334 @@
+"""
+Wake Word Module
+Low-cost keyword spotting ("Jarvis") on the capture stream, gating the
+full recognizer so it only runs on audio addressed to the assistant
+"""
+
+import os
+import sys
+import array
+import json
+import time
+import argparse
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class KeywordDetector:
+    """Spots a wake word in a stream of int16 mono PCM"""
+    
+    name = None
+    
+    def reset(self):
+        """Start a new utterance"""
+    
+    def process(self, pcm):
+        """
+        Feed audio
+        
+        Returns:
+            bool: True if the wake word was heard in this audio
+        """
+        raise NotImplementedError
+    
+    def finish(self):
+        """
+        Flush at the end of an utterance
+        
+        Returns:
+            bool: True if the wake word was heard in the flushed tail
+        """
+        return False
+
+
+class PorcupineDetector(KeywordDetector):
+    """Picovoice Porcupine built-in keyword (a few % of one core)"""
+    
+    name = 'porcupine'
+    
+    def __init__(self, access_key, keyword='jarvis', sensitivity=0.5):
+        import pvporcupine
+        self.porcupine = pvporcupine.create(
+            access_key=access_key, keywords=[keyword], sensitivities=[sensitivity]
+        )
+        self.frame_bytes = self.porcupine.frame_length * 2
+        self._pending = b''
+    
+    def reset(self):
+        self._pending = b''
+    
+    def process(self, pcm):
+        data = self._pending + pcm
+        heard = False
+        usable = len(data) - len(data) % self.frame_bytes
+        for offset in range(0, usable, self.frame_bytes):
+            frame = array.array('h', data[offset:offset + self.frame_bytes])
+            if self.porcupine.process(frame) >= 0:
+                heard = True
+        self._pending = data[usable:]
+        return heard
+
+
+class VoskKeywordDetector(KeywordDetector):
+    """Vosk recognizer restricted to the wake word (grammar: keyword or unknown)"""
+    
+    name = 'vosk-keyword'
+    
+    def __init__(self, model, keyword='jarvis', sample_rate=16000):
+        """
+        Args:
+            model: Loaded vosk.Model (e.g. VoskBackend.model, shared with listen_offline)
+        """
+        self.model = model
+        self.keyword = keyword.lower()
+        self.sample_rate = sample_rate
+        self.recognizer = None
+        self.reset()
+    
+    def reset(self):
+        import vosk
+        self.recognizer = vosk.KaldiRecognizer(
+            self.model, self.sample_rate, json.dumps([self.keyword, '[unk]'])
+        )
+    
+    def process(self, pcm):
+        if self.recognizer.AcceptWaveform(pcm):
+            return self._heard(json.loads(self.recognizer.Result()).get('text', ''))
+        return self._heard(json.loads(self.recognizer.PartialResult()).get('partial', ''))
+    
+    def finish(self):
+        return self._heard(json.loads(self.recognizer.FinalResult()).get('text', ''))
+    
+    def _heard(self, text):
+        return self.keyword in text.split()
+
+
+def make_detector(config, vosk_backend=None):
+    """
+    Best available detector: Porcupine when an access key is configured,
+    else a keyword grammar on the Vosk model
+    
+    Args:
+        config: Config
+        vosk_backend: VoskBackend whose model is shared (loaded if needed)
+    
+    Returns:
+        KeywordDetector, or None if no engine is available
+    """
+    keyword = config.WAKE_WORD
+    if config.WAKE_WORD_ACCESS_KEY:
+        try:
+            return PorcupineDetector(config.WAKE_WORD_ACCESS_KEY, keyword, config.WAKE_WORD_SENSITIVITY)
+        except ImportError:
+            print("[STT] pvporcupine not installed, trying Vosk for the wake word")
+        except Exception as e:
+            print(f"[WARNING] Porcupine failed to start: {e}")
+    
+    from recognizers import VoskBackend
+    if not isinstance(vosk_backend, VoskBackend):
+        vosk_backend = VoskBackend(config.STT_OFFLINE_MODEL)
+    if not vosk_backend.load():
+        return None
+    return VoskKeywordDetector(vosk_backend.model, keyword, config.STT_SAMPLE_RATE)
+
+
+class WakeWordGate:
+    """
+    Capture listener that only lets utterances addressed to Jarvis through
+    
+    The detector only sees audio inside utterances the VAD has opened, so
+    silence costs nothing beyond the VAD. An utterance passes if it contains the
+    wake word ("Jarvis, open browser"), or if it starts within `window`
+    seconds after a bare "Jarvis". Passing utterances are forwarded to
+    the gate's own listeners (e.g. a StreamingDecoder) and their capture
+    segments are kept; everything else is dropped before recognition.
+    """
+    
+    def __init__(self, detector, window=5.0):
+        """
+        Args:
+            detector: KeywordDetector
+            window: Seconds after a detection during which the next
+                utterance passes without the wake word
+        """
+        self.detector = detector
+        self.window = window
+        self.listeners = []
+        
+        self.detections = 0
+        self.passed = 0
+        self.rejected = 0
+        self.detect_seconds = 0.0  # CPU time spent in the detector
+        
+        self._open_until = 0.0
+        self._passing = False
+        self._heard = False
+        self._last_passed = False
+        self._buffer = []
+        self._format = None
+    
+    def add_listener(self, listener):
+        """Forward passing utterances to listener (same interface as AudioCapture's)"""
+        self.listeners.append(listener)
+    
+    def is_open(self):
+        """True while a bare wake word is waiting for its command"""
+        return time.monotonic() < self._open_until
+    
+    def passes_utterance(self):
+        """Whether the utterance that just ended should be recognized"""
+        return self._last_passed
+    
+    # Capture listener interface
+    
+    def speech_started(self, audio, sample_rate, sample_width):
+        self._format = (sample_rate, sample_width)
+        self._heard = False
+        self._buffer = [audio]
+        self._passing = self.is_open()
+        if self._passing:
+            self._open_until = 0.0  # one command per wake word
+            self._forward('speech_started', audio, sample_rate, sample_width)
+        else:
+            self.detector.reset()
+            self._detect(self.detector.process, audio)
+    
+    def speech_frame(self, frame):
+        if self._passing:
+            self._forward('speech_frame', frame)
+            return
+        self._buffer.append(frame)
+        self._detect(self.detector.process, frame)
+    
+    def speech_ended(self):
+        if not self._passing:
+            self._detect(self.detector.finish)
+        if self._heard:
+            self.detections += 1
+            self._open_until = time.monotonic() + self.window
+        if self._passing:
+            self._forward('speech_ended')
+            self.passed += 1
+        else:
+            self.rejected += 1
+        self._last_passed = self._passing
+        self._passing = False
+        self._buffer = []
+    
+    def stats(self):
+        """
+        Gate counters and detector cost
+        
+        Returns:
+            dict: detections, passed, rejected, detector_cpu_ms
+        """
+        return {
+            'detections': self.detections,
+            'passed': self.passed,
+            'rejected': self.rejected,
+            'detector_cpu_ms': round(self.detect_seconds * 1000, 1),
+        }
+    
+    def _detect(self, step, *args):
+        started = time.process_time()
+        heard = step(*args)
+        self.detect_seconds += time.process_time() - started
+        if heard and not self._heard:
+            self._heard = True
+            self._passing = True
+            # Replay what was said so far, then stream the rest
+            self._forward('speech_started', b''.join(self._buffer), *self._format)
+            self._buffer = []
+    
+    def _forward(self, event, *args):
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(*args)
+            except Exception as e:
+                print(f"[ERROR] Wake word listener error: {e}")
+
+
+def _fixture_paths(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path)
+                      if name.lower().endswith('.wav'))
+    return [path]
+
+
+def benchmark(positive=None, negative=None, detector=None):
+    """
+    Run recorded fixtures through the capture VAD and wake word gate
+    
+    Positives should contain "Jarvis"; negatives are background audio and
+    speech without it. Fixtures are 16 kHz mono 16-bit WAV files.
+    
+    Returns:
+        dict: per-set files, seconds of audio, detections, and for
+        negatives false accepts per hour; cpu_percent is gate + VAD CPU
+        time as a share of one core while listening in real time
+    """
+    import speech_recognition as sr
+    from capture import AudioCapture, make_vad
+    from config import Config
+    
+    config = Config()
+    detector = detector or make_detector(config)
+    if detector is None:
+        raise RuntimeError("No wake word engine available")
+    
+    report = {'detector': detector.name}
+    for label, path in (('positive', positive), ('negative', negative)):
+        if not path:
+            continue
+        files = _fixture_paths(path)
+        audio_seconds = 0.0
+        cpu_seconds = 0.0
+        detected_files = 0
+        detections = 0
+        for file_path in files:
+            gate = WakeWordGate(detector, window=config.WAKE_WORD_WINDOW)
+            capture = AudioCapture(sr.AudioFile(file_path), make_vad(sr.Recognizer()),
+                                   frame_ms=config.STT_FRAME_MS,
+                                   end_silence_ms=config.STT_END_SILENCE_MS,
+                                   gate=gate)
+            started = time.process_time()
+            capture.start()
+            capture.wait()
+            cpu_seconds += time.process_time() - started
+            audio_seconds += capture.frames_read * config.STT_FRAME_MS / 1000
+            detections += gate.detections
+            detected_files += 1 if gate.detections else 0
+        
+        stats = {
+            'files': len(files),
+            'audio_seconds': round(audio_seconds, 1),
+            'detections': detections,
+            'cpu_percent': round(100 * cpu_seconds / audio_seconds, 2) if audio_seconds else None,
+        }
+        if label == 'positive':
+            stats['detection_rate'] = round(detected_files / len(files), 3) if files else None
+        else:
+            stats['false_accepts_per_hour'] = round(detections * 3600 / audio_seconds, 2) if audio_seconds else None
+        report[label] = stats
+    return report
+
+
+def main(argv=None):
+    """Command line entry point: python -m jarvis.wakeword bench --positive <dir> --negative <dir>"""
+    parser = argparse.ArgumentParser(prog='python -m jarvis.wakeword', description='Jarvis wake word tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    bench = commands.add_parser('bench', help='Measure CPU use and false accepts on WAV fixtures')
+    bench.add_argument('--positive', help='WAV file or directory of clips containing the wake word')
+    bench.add_argument('--negative', help='WAV file or directory of clips without it')
+    
+    args = parser.parse_args(argv)
+    if not args.positive and not args.negative:
+        parser.error('give --positive and/or --negative fixtures')
+    print(json.dumps(benchmark(args.positive, args.negative), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())